@@ -0,0 +1,152 @@
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BENCH_TENANT = "bench"
+SECTIONS = ["skills", "experience", "education", "languages"]
+HTTP_PATHS = ["/api/portfolio", "/api/personal-info", "/api/skills", "/api/experience"]
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+def report(label, samples, elapsed):
+    print(
+        f"📈 {label}: {len(samples)} ops in {elapsed:.2f}s = {len(samples) / elapsed:.0f} ops/s | "
+        f"p50 {percentile(samples, 50):.2f}ms p95 {percentile(samples, 95):.2f}ms "
+        f"p99 {percentile(samples, 99):.2f}ms mean {statistics.mean(samples):.2f}ms"
+    )
+
+async def seed(db):
+    """Load the default portfolio into the bench tenant"""
+    from seed_data import build_seed_documents
+    for collection, docs in build_seed_documents(BENCH_TENANT).items():
+        await db[collection].delete_many({"tenant": BENCH_TENANT})
+        await db[collection].insert_many(docs)
+
+async def read_paths(db):
+    """The queries behind one page load: personal info plus every ordered section"""
+    await db.personal_info.find_one({"tenant": BENCH_TENANT})
+    for section in SECTIONS:
+        await db[section].find({"tenant": BENCH_TENANT}, sort=[("order", 1)], limit=1000)
+
+async def run(backend, requests, concurrency):
+    """Time concurrent page-load read paths against one storage backend"""
+    os.environ["STORAGE_BACKEND"] = backend
+    from repositories.base import create_repository
+    db = create_repository()
+    print(f"🏁 Benchmarking {backend}: {requests} page loads, concurrency {concurrency}")
+    try:
+        await seed(db)
+        samples = []
+        queue = asyncio.Queue()
+        for _ in range(requests):
+            queue.put_nowait(None)
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                await read_paths(db)
+                samples.append((time.perf_counter() - started) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        report(backend, samples, time.perf_counter() - started)
+        for collection in ["personal_info"] + SECTIONS:
+            await db[collection].delete_many({"tenant": BENCH_TENANT})
+    finally:
+        db.close()
+
+async def read_response(reader):
+    """Read one HTTP/1.1 response (Content-Length or chunked); returns (status, keep_alive)"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("connection closed")
+    version, status = status_line.split()[:2]
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip().lower()
+    if headers.get("transfer-encoding") == "chunked":
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif status != b"304":
+        await reader.readexactly(int(headers.get("content-length", 0)))
+    if version == b"HTTP/1.0":
+        return int(status), headers.get("connection") == "keep-alive"
+    return int(status), headers.get("connection") != "close"
+
+async def run_http(url, paths, connections, duration):
+    """Keep-alive load test against a running server (see serve.py --bench)"""
+    target = urlsplit(url)
+    host, port = target.hostname, target.port or 80
+    samples, statuses = [], Counter()
+    deadline = time.perf_counter() + duration
+    print(f"🏁 {connections} keep-alive connections for {duration}s against {url} over {', '.join(paths)}")
+
+    async def connection(index):
+        reader = writer = None
+        sent = index
+        while time.perf_counter() < deadline:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            path = paths[sent % len(paths)]
+            sent += 1
+            request = f"GET {path} HTTP/1.1\r\nHost: {target.netloc}\r\nAccept: application/json\r\n\r\n"
+            started = time.perf_counter()
+            try:
+                writer.write(request.encode())
+                status, keep_alive = await read_response(reader)
+            except (ConnectionError, asyncio.IncompleteReadError, ValueError, IndexError):
+                statuses["error"] += 1
+                writer.close()
+                writer = None
+                continue
+            samples.append((time.perf_counter() - started) * 1000)
+            statuses[status] += 1
+            if not keep_alive:
+                writer.close()
+                writer = None
+        if writer is not None:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connection(i) for i in range(connections)))
+    if samples:
+        report("http", samples, time.perf_counter() - started)
+    print("📊 Responses: " + ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items(), key=str)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark storage backends, or a running server with --url")
+    parser.add_argument("--backend", choices=["mongo", "sqlite", "both"], default="both")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--url", help="Load test a running server over HTTP instead, e.g. http://127.0.0.1:8001")
+    parser.add_argument("--paths", default=",".join(HTTP_PATHS), help="Comma-separated paths for --url")
+    parser.add_argument("--connections", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+
+    if args.url:
+        asyncio.run(run_http(args.url, args.paths.split(","), args.connections, args.duration))
+        return
+    backends = ["mongo", "sqlite"] if args.backend == "both" else [args.backend]
+    for backend in backends:
+        asyncio.run(run(backend, args.requests, args.concurrency))
+
+if __name__ == "__main__":
+    main()
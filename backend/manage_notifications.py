@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import json
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from repositories.base import create_repository
+from services.notifications import NotificationDispatcher
+import threading
+from dotenv import load_dotenv
+
+load_dotenv()
+
+class SinkHandler(BaseHTTPRequestHandler):
+    """Local webhook sink: prints every POST body; paths starting /fail answer 500"""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        print(f"🪝 HTTP {self.path}: {body.decode('utf-8', 'replace')}", flush=True)
+        self.send_response(500 if self.path.startswith("/fail") else 204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+async def handle_smtp(reader, writer):
+    """Just enough of SMTP for smtplib.send_message; prints each delivered message"""
+    async def reply(line):
+        writer.write(f"{line}\r\n".encode())
+        await writer.drain()
+
+    await reply("220 localhost notification sink")
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        command = line.decode("utf-8", "replace").strip().upper()
+        if command.startswith("EHLO"):
+            await reply("250 localhost")
+        elif command == "DATA":
+            await reply("354 End data with <CR><LF>.<CR><LF>")
+            data = await reader.readuntil(b"\r\n.\r\n")
+            print(f"📧 SMTP message:\n{data[:-5].decode('utf-8', 'replace')}\n", flush=True)
+            await reply("250 OK")
+        elif command == "QUIT":
+            await reply("221 Bye")
+            break
+        else:
+            # HELO, MAIL FROM, RCPT TO, RSET, NOOP
+            await reply("250 OK")
+    writer.close()
+
+async def sinks(smtp_port: int, http_port: int):
+    """Run a local SMTP stand-in and HTTP sink for end-to-end notification testing"""
+    http = ThreadingHTTPServer(("127.0.0.1", http_port), SinkHandler)
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+    smtp = await asyncio.start_server(handle_smtp, "127.0.0.1", smtp_port)
+    print(f"📮 SMTP stand-in on 127.0.0.1:{smtp_port}, HTTP sink on http://127.0.0.1:{http_port}/")
+    print(f"   NOTIFY_SMTP_HOST=127.0.0.1 NOTIFY_SMTP_PORT={smtp_port} NOTIFY_EMAIL_TO=owner@localhost")
+    print(f"   NOTIFY_WEBHOOK_URL=http://127.0.0.1:{http_port}/hook  (use /fail to exercise retries)")
+    try:
+        async with smtp:
+            await smtp.serve_forever()
+    finally:
+        http.shutdown()
+
+async def dead_letters(tenant):
+    """Print dead-lettered notification jobs as NDJSON"""
+    db = create_repository()
+    try:
+        query = {"tenant": tenant} if tenant else {}
+        for job in await db.notification_dead_letters.find(query, sort=[("failed_at", 1)]):
+            print(json.dumps(job, default=str))
+    finally:
+        db.close()
+
+async def replay(tenant):
+    """Put dead-lettered jobs back on the queue"""
+    db = create_repository()
+    try:
+        replayed = await NotificationDispatcher.from_env(db).replay_dead_letters(tenant)
+        print(f"✅ Re-queued {replayed} notification jobs")
+    except Exception as e:
+        print(f"❌ Error replaying dead letters: {str(e)}")
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Contact notification tooling")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sink_parser = sub.add_parser("sinks", help="Run local SMTP and HTTP sinks")
+    sink_parser.add_argument("--smtp-port", type=int, default=1025)
+    sink_parser.add_argument("--http-port", type=int, default=8025)
+
+    for name, help_text in (("dead-letters", "List dead-lettered jobs"), ("replay", "Re-queue dead-lettered jobs")):
+        command_parser = sub.add_parser(name, help=help_text)
+        command_parser.add_argument("--tenant")
+
+    args = parser.parse_args()
+    if args.command == "sinks":
+        try:
+            asyncio.run(sinks(args.smtp_port, args.http_port))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "dead-letters":
+        asyncio.run(dead_letters(args.tenant))
+    else:
+        asyncio.run(replay(args.tenant))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import asyncio
+import sys
+from repositories.base import create_repository
+from services.sections import offline_read_model
+from services.tenancy import DEFAULT_TENANT
+from dotenv import load_dotenv
+
+load_dotenv()
+
+async def tenant_slugs(db, tenant):
+    """The requested tenant, or every provisioned tenant plus the default one"""
+    if tenant:
+        return [tenant]
+    slugs = {doc["slug"] for doc in await db.tenants.find({}, {"_id": 0, "slug": 1})}
+    return sorted(slugs | {DEFAULT_TENANT})
+
+async def rebuild(tenant):
+    """Recompute portfolio views from the source collections, e.g. after manual edits"""
+    db = create_repository()
+    read_model = offline_read_model(db)
+    try:
+        await read_model.ensure_indexes()
+        slugs = await tenant_slugs(db, tenant)
+        for slug in slugs:
+            view = await read_model.rebuild(slug)
+            print(f"✅ Rebuilt portfolio view for '{slug}' at version {view['version']}")
+        print(f"🎉 Rebuilt {len(slugs)} portfolio views")
+    except Exception as e:
+        print(f"❌ Error rebuilding portfolio views: {str(e)}")
+    finally:
+        db.close()
+
+async def check(tenant) -> bool:
+    """Compare stored views against the source collections; returns True when all match"""
+    db = create_repository()
+    read_model = offline_read_model(db)
+    consistent = True
+    try:
+        for slug in await tenant_slugs(db, tenant):
+            problems = await read_model.check(slug)
+            if problems:
+                consistent = False
+                print(f"❌ '{slug}': " + "; ".join(problems))
+            else:
+                print(f"✅ '{slug}' is consistent")
+    finally:
+        db.close()
+    return consistent
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the denormalized portfolio_view read model")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--tenant", help="Only this tenant (default: all tenants)")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        asyncio.run(rebuild(args.tenant))
+    elif not asyncio.run(check(args.tenant)):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import argparse
+import asyncio
+import json
+from datetime import date
+from motor.motor_asyncio import AsyncIOMotorClient
+from services.retention import RetentionPolicy, ensure_indexes, read_archive, run_retention
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+async def run(policy: RetentionPolicy):
+    """Run a single retention pass against the configured database"""
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    print("🗄️ Starting contact message retention pass...")
+    try:
+        await ensure_indexes(db)
+        summary = await run_retention(db, policy)
+        print(f"✅ {summary['spam_expiring']} spam messages stamped for TTL expiry")
+        print(f"✅ {summary['archived']} messages archived to {policy.archive_dir}")
+    except Exception as e:
+        print(f"❌ Error during retention pass: {str(e)}")
+    finally:
+        client.close()
+
+def query(policy: RetentionPolicy, args):
+    """Print archived messages as NDJSON"""
+    records = read_archive(
+        policy.archive_dir,
+        start=date.fromisoformat(args.start) if args.start else None,
+        end=date.fromisoformat(args.end) if args.end else None,
+        email=args.email,
+        status=args.status,
+        tenant=args.tenant,
+    )
+    for record in records:
+        print(json.dumps(record))
+
+def main():
+    parser = argparse.ArgumentParser(description="Contact message retention and archive tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("run", help="Expire spam and archive old messages")
+    query_parser = commands.add_parser("query", help="Query archived messages")
+    query_parser.add_argument("--start", help="First day (YYYY-MM-DD)")
+    query_parser.add_argument("--end", help="Last day (YYYY-MM-DD)")
+    query_parser.add_argument("--email")
+    query_parser.add_argument("--status")
+    query_parser.add_argument("--tenant")
+    args = parser.parse_args()
+
+    policy = RetentionPolicy.from_env()
+    if args.command == "run":
+        asyncio.run(run(policy))
+    else:
+        query(policy, args)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import argparse
+import asyncio
+from pymongo.errors import BulkWriteError
+from repositories.mongo import MongoRepository
+from services.changelog import ChangeLog
+from services.ids import ensure_legacy_id_indexes, id_for_legacy
+from services.tenancy import TENANT_COLLECTIONS
+import os
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DUPLICATE_KEY = 11000
+COLLECTIONS = TENANT_COLLECTIONS + ["tenants"]
+
+def compact_document(doc):
+    """Rewrite a UUID-keyed document onto a time-ordered binary _id"""
+    migrated = {k: v for k, v in doc.items() if k not in ("_id", "id")}
+    created_at = doc.get("created_at") or doc["_id"].generation_time
+    migrated["_id"] = id_for_legacy(created_at, doc["id"])
+    migrated["legacy_id"] = doc["id"]
+    return migrated
+
+async def insert_ignoring_duplicates(collection, docs):
+    try:
+        await collection.insert_many(docs, ordered=False)
+    except BulkWriteError as e:
+        if any(err.get("code") != DUPLICATE_KEY for err in e.details.get("writeErrors", [])):
+            raise
+
+async def flush_staging(db, name):
+    """Finish a batch interrupted between delete and insert"""
+    staging = db[f"_migrate_ids_{name}"]
+    leftovers = await staging.find().to_list(None)
+    if leftovers:
+        await insert_ignoring_duplicates(db[name], leftovers)
+        await staging.delete_many({"_id": {"$in": [doc["_id"] for doc in leftovers]}})
+    await staging.drop()
+    return len(leftovers)
+
+async def migrate_collection(repository, name, batch_size, dry_run):
+    """Move UUID-keyed documents of one collection to compact ids, one batch at a time
+
+    Each batch is staged first and ids are deterministic, so the command can be
+    interrupted at any point and simply re-run. Unique indexes such as
+    personal_info's one-per-tenant are why old documents are removed before
+    their replacements are inserted.
+    """
+    db = repository.database
+    collection = db[name]
+    staging = db[f"_migrate_ids_{name}"]
+    if not dry_run:
+        await ensure_legacy_id_indexes(repository[name])
+        recovered = await flush_staging(db, name)
+        if recovered:
+            print(f"♻️ Recovered {recovered} staged {name} documents")
+
+    migrated, tenants = 0, set()
+    while True:
+        batch = await collection.find(
+            {"id": {"$type": "string"}}, sort=[("_id", 1)]
+        ).limit(batch_size).to_list(batch_size)
+        if not batch:
+            break
+        tenants.update(doc.get("tenant") for doc in batch if doc.get("tenant"))
+        migrated += len(batch)
+        if dry_run:
+            break
+        replacements = [compact_document(doc) for doc in batch]
+        await insert_ignoring_duplicates(staging, replacements)
+        await collection.delete_many({"_id": {"$in": [doc["_id"] for doc in batch]}})
+        await insert_ignoring_duplicates(collection, replacements)
+        await staging.delete_many({"_id": {"$in": [doc["_id"] for doc in replacements]}})
+        if len(batch) < batch_size:
+            break
+    if not dry_run:
+        await staging.drop()
+    return migrated, tenants
+
+async def migrate(batch_size: int, dry_run: bool):
+    """Migrate every portfolio collection to compact, time-ordered ids"""
+    # Rewrites MongoDB's binary _id in place, so this command is MongoDB-only
+    repository = MongoRepository(os.environ['MONGO_URL'], os.environ['DB_NAME'])
+    print("🆔 Migrating UUID ids to compact ids" + (" (dry run)" if dry_run else "") + "...")
+
+    try:
+        touched = set()
+        for name in COLLECTIONS:
+            migrated, tenants = await migrate_collection(repository, name, batch_size, dry_run)
+            touched |= tenants
+            verb = "would migrate at least" if dry_run and migrated else "migrated"
+            print(f"✅ {name}: {verb} {migrated} documents")
+
+        if touched and not dry_run:
+            # Ids changed, so cursors into the old change log are meaningless
+            change_log = ChangeLog(repository)
+            for tenant in touched:
+                await change_log.reset(tenant)
+            print(f"✅ Reset change log for {len(touched)} tenants")
+        print("🎉 Id migration completed successfully!")
+    except Exception as e:
+        print(f"❌ Error during id migration: {str(e)}")
+    finally:
+        repository.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate UUID ids to compact, time-ordered ids")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(migrate(args.batch_size, args.dry_run))
+
+if __name__ == "__main__":
+    main()
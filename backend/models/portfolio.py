@@ -1,7 +1,8 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Literal, Optional
 from datetime import datetime
-import uuid
+from services.ids import new_id
+from services.tenancy import get_tenant
 
 # Personal Information Model
 class PersonalInfoCreate(BaseModel):
@@ -16,7 +17,8 @@ class PersonalInfoCreate(BaseModel):
     about_summary: str
 
 class PersonalInfo(PersonalInfoCreate):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
+    tenant: str = Field(default_factory=get_tenant)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -27,7 +29,8 @@ class SkillCreate(BaseModel):
     order: int = 0
 
 class Skill(SkillCreate):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
+    tenant: str = Field(default_factory=get_tenant)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -43,7 +46,8 @@ class ExperienceCreate(BaseModel):
     order: int = 0
 
 class Experience(ExperienceCreate):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
+    tenant: str = Field(default_factory=get_tenant)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -56,7 +60,8 @@ class EducationCreate(BaseModel):
     order: int = 0
 
 class Education(EducationCreate):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
+    tenant: str = Field(default_factory=get_tenant)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -67,7 +72,8 @@ class LanguageCreate(BaseModel):
     order: int = 0
 
 class Language(LanguageCreate):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
+    tenant: str = Field(default_factory=get_tenant)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     updated_at: datetime = Field(default_factory=datetime.utcnow)
 
@@ -78,6 +84,44 @@ class ContactMessageCreate(BaseModel):
     message: str
 
 class ContactMessage(ContactMessageCreate):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    status: str = "unread"  # unread, read, replied
-    created_at: datetime = Field(default_factory=datetime.utcnow)
\ No newline at end of file
+    id: str = Field(default_factory=new_id)
+    tenant: str = Field(default_factory=get_tenant)
+    status: str = "unread"  # unread, read, replied, spam
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ContactStatusUpdate(BaseModel):
+    status: Literal["unread", "read", "replied", "spam"]
+
+# Tenant Model
+class TenantCreate(BaseModel):
+    slug: str = Field(pattern=r"^[a-z0-9][a-z0-9-]{0,62}$")
+    name: str
+    hosts: List[str] = []
+
+class Tenant(TenantCreate):
+    id: str = Field(default_factory=new_id)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+# Change Feed Models
+class ChangeEntry(BaseModel):
+    seq: int
+    collection: str
+    op: Literal["create", "update", "delete"]
+    id: str
+    fields: Dict[str, Any] = {}
+
+class ChangeFeed(BaseModel):
+    cursor: int
+    has_more: bool = False
+    changes: List[ChangeEntry] = []
+    snapshot: Optional[Dict[str, List[Dict[str, Any]]]] = None
+
+# Pre-assembled read model served by GET /api/portfolio
+class PortfolioView(BaseModel):
+    version: int
+    built_at: datetime
+    personal_info: Optional[PersonalInfo] = None
+    skills: List[Skill] = []
+    experience: List[Experience] = []
+    education: List[Education] = []
+    languages: List[Language] = []
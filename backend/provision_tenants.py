@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import json
+from models.portfolio import Tenant, TenantCreate
+from repositories.base import create_repository
+from seed_data import build_seed_documents
+from services.ids import to_document
+from services.tenancy import backfill_default_tenant, ensure_indexes
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def load_tenants(path: str):
+    """Read tenants from a JSON array or an NDJSON file"""
+    with open(path) as fh:
+        text = fh.read().strip()
+    if text.startswith("["):
+        rows = json.loads(text)
+    else:
+        rows = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [Tenant(**TenantCreate(**row).dict()) for row in rows]
+
+async def provision(path: str, seed: bool, batch_size: int):
+    """Create tenants in bulk, optionally seeding each with the default portfolio"""
+    db = create_repository()
+    tenants = load_tenants(path)
+    print(f"🏗️ Provisioning {len(tenants)} tenants...")
+
+    try:
+        await ensure_indexes(db)
+        created = 0
+        for start in range(0, len(tenants), batch_size):
+            batch = tenants[start:start + batch_size]
+            existing = {
+                doc["slug"] for doc in await db.tenants.find(
+                    {"slug": {"$in": [t.slug for t in batch]}}, {"_id": 0, "slug": 1}
+                )
+            }
+            new_tenants = [t for t in batch if t.slug not in existing]
+            if not new_tenants:
+                continue
+            tenant_docs = [to_document(t.dict()) for t in new_tenants]
+            # Unordered inserts skip documents that already exist and return the inserted count
+            created += await db.tenants.insert_many(tenant_docs, ordered=False)
+
+            if seed:
+                # One insert_many per collection per batch instead of one round trip per document
+                per_collection = {}
+                for tenant in new_tenants:
+                    for collection, docs in build_seed_documents(tenant.slug).items():
+                        per_collection.setdefault(collection, []).extend(docs)
+                for collection, docs in per_collection.items():
+                    await db[collection].insert_many(docs, ordered=False)
+            print(f"✅ Provisioned tenants {start + 1}-{start + len(batch)}")
+
+        print(f"🎉 Created {created} tenants ({len(tenants) - created} already existed)")
+    except Exception as e:
+        print(f"❌ Error during provisioning: {str(e)}")
+    finally:
+        db.close()
+
+async def backfill():
+    """Assign pre-tenancy documents to the default tenant"""
+    db = create_repository()
+    try:
+        assigned = await backfill_default_tenant(db)
+        await ensure_indexes(db)
+        print(f"✅ Assigned {assigned} documents to the default tenant")
+    finally:
+        db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk tenant provisioning")
+    parser.add_argument("file", nargs="?", help="JSON array or NDJSON of {slug, name, hosts}")
+    parser.add_argument("--seed", action="store_true", help="Seed new tenants with the default portfolio")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--backfill", action="store_true", help="Assign legacy documents to the default tenant")
+    args = parser.parse_args()
+
+    if args.backfill:
+        asyncio.run(backfill())
+    elif args.file:
+        asyncio.run(provision(args.file, args.seed, args.batch_size))
+    else:
+        parser.error("a tenants file or --backfill is required")
+
+if __name__ == "__main__":
+    main()
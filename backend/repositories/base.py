@@ -0,0 +1,124 @@
+"""Storage-agnostic repository interface.
+
+Routes, the CRUD engine, the change log and seeding talk to a ``Repository``
+instead of Motor directly, so the same code runs against MongoDB or an
+embedded SQLite file. The query language is the MongoDB subset this API
+actually uses:
+
+* filters: equality, ``$in``, ``$ne``, ``$gt``/``$gte``/``$lt``/``$lte``,
+  ``$exists``, ``$type: "string"`` and top-level ``$or``
+* updates: ``$set``, ``$unset``, ``$inc``
+* projections: inclusion or exclusion dicts; sorts: ``[(field, ±1), ...]``
+"""
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+Document = Dict[str, Any]
+Filter = Dict[str, Any]
+Projection = Optional[Dict[str, int]]
+Sort = Optional[Sequence[Tuple[str, int]]]
+
+
+class RepositoryError(Exception):
+    """Storage failure the resilience layer should count against the backend"""
+
+
+class DuplicateKeyError(RepositoryError):
+    pass
+
+
+class CollectionRepository(ABC):
+    @abstractmethod
+    async def find(
+        self, filter: Filter, projection: Projection = None, sort: Sort = None,
+        skip: int = 0, limit: int = 0, max_time_ms: Optional[int] = None,
+    ) -> List[Document]:
+        ...
+
+    @abstractmethod
+    async def find_one(
+        self, filter: Filter, projection: Projection = None, sort: Sort = None,
+        max_time_ms: Optional[int] = None,
+    ) -> Optional[Document]:
+        ...
+
+    @abstractmethod
+    async def insert_one(self, document: Document):
+        ...
+
+    @abstractmethod
+    async def insert_many(self, documents: List[Document], ordered: bool = True) -> int:
+        """Insert documents; with ``ordered=False`` duplicates are skipped. Returns the inserted count"""
+
+    @abstractmethod
+    async def find_one_and_update(
+        self, filter: Filter, update: Dict[str, Any], projection: Projection = None,
+        return_after: bool = False, upsert: bool = False, max_time_ms: Optional[int] = None,
+        sort: Sort = None,
+    ) -> Optional[Document]:
+        """Atomically update the first match (in ``sort`` order) and return it before or after"""
+
+    @abstractmethod
+    async def update_one(self, filter: Filter, update: Dict[str, Any]) -> int:
+        """Returns the matched count"""
+
+    @abstractmethod
+    async def update_many(self, filter: Filter, update: Dict[str, Any]) -> int:
+        """Returns the modified count"""
+
+    @abstractmethod
+    async def find_one_and_delete(
+        self, filter: Filter, projection: Projection = None, max_time_ms: Optional[int] = None,
+    ) -> Optional[Document]:
+        ...
+
+    @abstractmethod
+    async def delete_many(self, filter: Filter) -> int:
+        ...
+
+    @abstractmethod
+    async def count(self, filter: Filter) -> int:
+        ...
+
+    @abstractmethod
+    async def create_index(
+        self, keys: Sequence[Tuple[str, int]], unique: bool = False, name: Optional[str] = None,
+        expire_after_seconds: Optional[int] = None, partial_filter: Optional[Filter] = None,
+    ):
+        """Create an index, replacing one on the same keys whose options changed"""
+
+
+class Repository(ABC):
+    backend = "abstract"
+
+    @abstractmethod
+    def collection(self, name: str) -> CollectionRepository:
+        ...
+
+    def __getitem__(self, name: str) -> CollectionRepository:
+        return self.collection(name)
+
+    def __getattr__(self, name: str) -> CollectionRepository:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self.collection(name)
+
+    def close(self):
+        pass
+
+
+def create_repository(timeout_ms: Optional[int] = None) -> Repository:
+    """Build the repository selected by ``STORAGE_BACKEND`` (mongo or sqlite)"""
+    backend = os.environ.get("STORAGE_BACKEND", "mongo").lower()
+    if backend == "sqlite":
+        from repositories.sqlite import SqliteRepository
+        default_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "portfolio.db")
+        return SqliteRepository(
+            os.environ.get("SQLITE_PATH", default_path),
+            readers=int(os.environ.get("SQLITE_READERS", 4)),
+        )
+    if backend == "mongo":
+        from repositories.mongo import MongoRepository
+        return MongoRepository(os.environ['MONGO_URL'], os.environ['DB_NAME'], timeout_ms=timeout_ms)
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
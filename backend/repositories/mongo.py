@@ -0,0 +1,138 @@
+"""MongoDB repository backed by Motor."""
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError, OperationFailure
+from pymongo.errors import DuplicateKeyError as MongoDuplicateKeyError
+
+from repositories.base import (
+    CollectionRepository, Document, DuplicateKeyError, Filter, Projection, Repository, Sort
+)
+
+DUPLICATE_KEY = 11000
+INDEX_CONFLICT_CODES = (85, 86)  # IndexOptionsConflict, IndexKeySpecsConflict
+
+
+def _max_time(max_time_ms: Optional[int]) -> Dict[str, Any]:
+    return {"max_time_ms": max_time_ms} if max_time_ms else {}
+
+
+class MongoCollection(CollectionRepository):
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def find(self, filter: Filter, projection: Projection = None, sort: Sort = None,
+                   skip: int = 0, limit: int = 0, max_time_ms: Optional[int] = None) -> List[Document]:
+        cursor = self.collection.find(filter, projection)
+        if sort:
+            cursor = cursor.sort(list(sort))
+        if skip:
+            cursor = cursor.skip(skip)
+        if limit:
+            cursor = cursor.limit(limit)
+        if max_time_ms:
+            cursor = cursor.max_time_ms(max_time_ms)
+        return await cursor.to_list(limit or None)
+
+    async def find_one(self, filter: Filter, projection: Projection = None, sort: Sort = None,
+                       max_time_ms: Optional[int] = None) -> Optional[Document]:
+        return await self.collection.find_one(
+            filter, projection, sort=list(sort) if sort else None, **_max_time(max_time_ms)
+        )
+
+    async def insert_one(self, document: Document):
+        try:
+            await self.collection.insert_one(document)
+        except MongoDuplicateKeyError as exc:
+            raise DuplicateKeyError(str(exc)) from exc
+
+    async def insert_many(self, documents: List[Document], ordered: bool = True) -> int:
+        if not documents:
+            return 0
+        try:
+            result = await self.collection.insert_many(documents, ordered=ordered)
+            return len(result.inserted_ids)
+        except BulkWriteError as exc:
+            errors = exc.details.get("writeErrors", [])
+            if ordered or any(err.get("code") != DUPLICATE_KEY for err in errors):
+                raise
+            return exc.details.get("nInserted", 0)
+
+    async def find_one_and_update(self, filter: Filter, update: Dict[str, Any], projection: Projection = None,
+                                  return_after: bool = False, upsert: bool = False,
+                                  max_time_ms: Optional[int] = None, sort: Sort = None) -> Optional[Document]:
+        extra = {"maxTimeMS": max_time_ms} if max_time_ms else {}
+        try:
+            return await self.collection.find_one_and_update(
+                filter, update, projection=projection, upsert=upsert, sort=list(sort) if sort else None,
+                return_document=ReturnDocument.AFTER if return_after else ReturnDocument.BEFORE,
+                **extra,
+            )
+        except MongoDuplicateKeyError as exc:
+            raise DuplicateKeyError(str(exc)) from exc
+
+    async def update_one(self, filter: Filter, update: Dict[str, Any]) -> int:
+        try:
+            return (await self.collection.update_one(filter, update)).matched_count
+        except MongoDuplicateKeyError as exc:
+            raise DuplicateKeyError(str(exc)) from exc
+
+    async def update_many(self, filter: Filter, update: Dict[str, Any]) -> int:
+        try:
+            return (await self.collection.update_many(filter, update)).modified_count
+        except MongoDuplicateKeyError as exc:
+            raise DuplicateKeyError(str(exc)) from exc
+
+    async def find_one_and_delete(self, filter: Filter, projection: Projection = None,
+                                  max_time_ms: Optional[int] = None) -> Optional[Document]:
+        extra = {"maxTimeMS": max_time_ms} if max_time_ms else {}
+        return await self.collection.find_one_and_delete(filter, projection=projection, **extra)
+
+    async def delete_many(self, filter: Filter) -> int:
+        return (await self.collection.delete_many(filter)).deleted_count
+
+    async def count(self, filter: Filter) -> int:
+        return await self.collection.count_documents(filter)
+
+    async def create_index(self, keys: Sequence[Tuple[str, int]], unique: bool = False,
+                           name: Optional[str] = None, expire_after_seconds: Optional[int] = None,
+                           partial_filter: Optional[Filter] = None):
+        options: Dict[str, Any] = {}
+        if unique:
+            options["unique"] = True
+        if name:
+            options["name"] = name
+        if expire_after_seconds is not None:
+            options["expireAfterSeconds"] = expire_after_seconds
+        if partial_filter:
+            options["partialFilterExpression"] = partial_filter
+        keys = list(keys)
+        try:
+            await self.collection.create_index(keys, **options)
+        except OperationFailure as exc:
+            if exc.code not in INDEX_CONFLICT_CODES:
+                raise
+            await self.collection.drop_index(keys)
+            await self.collection.create_index(keys, **options)
+
+
+class MongoRepository(Repository):
+    backend = "mongo"
+
+    def __init__(self, mongo_url: str, db_name: str, timeout_ms: Optional[int] = None):
+        options = {}
+        if timeout_ms:
+            options = {"serverSelectionTimeoutMS": timeout_ms, "connectTimeoutMS": timeout_ms}
+        self.client = AsyncIOMotorClient(mongo_url, **options)
+        # Raw Motor database for Mongo-only subsystems (TTL retention, id migration)
+        self.database = self.client[db_name]
+        self._collections: Dict[str, MongoCollection] = {}
+
+    def collection(self, name: str) -> MongoCollection:
+        if name not in self._collections:
+            self._collections[name] = MongoCollection(self.database[name])
+        return self._collections[name]
+
+    def close(self):
+        self.client.close()
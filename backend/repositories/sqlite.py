@@ -0,0 +1,446 @@
+"""Embedded SQLite repository for single-node installs and fast CI.
+
+Each collection is a ``(_id TEXT PRIMARY KEY, doc TEXT)`` table holding the
+document as JSON; filters, sorts and indexes are expressed over
+``json_extract`` so MongoDB-style index specs become expression indexes.
+Datetimes are stored tagged as ``{"$date": "<fixed-width ISO string>"}`` so
+they round-trip without guessing from a string's shape, and field
+expressions unwrap the tag so they still compare and sort chronologically.
+The database runs in WAL mode: writes are serialized on one dedicated
+thread (so read-modify-write operations are atomic) while a small pool of
+reader threads, each with its own connection, serves queries concurrently.
+All statements are parameterized and go through sqlite3's per-connection
+statement cache, so repeated queries are prepared once.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from bson import ObjectId
+
+from repositories.base import (
+    CollectionRepository, Document, DuplicateKeyError, Filter, Projection,
+    Repository, RepositoryError, Sort,
+)
+
+NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+FIELD_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z0-9_]+)*$")
+DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+DATE_TAG = "$date"
+COMPARISONS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+TTL_PURGE_INTERVAL = 60.0
+
+
+def _encode_scalar(value: Any) -> Any:
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value.strftime(DATETIME_FORMAT)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {DATE_TAG: _encode_scalar(value)}
+    encoded = _encode_scalar(value)
+    if encoded is value:
+        raise TypeError(f"Cannot store {type(value).__name__} in SQLite")
+    return encoded
+
+
+def _decode(value: Any) -> Any:
+    """Restore datetimes from their ``{"$date": ...}`` tags"""
+    if isinstance(value, dict):
+        if len(value) == 1 and isinstance(value.get(DATE_TAG), str):
+            return datetime.strptime(value[DATE_TAG], DATETIME_FORMAT)
+        return {k: _decode(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    return value
+
+
+def _field(name: str) -> str:
+    if name == "_id":
+        return "_id"
+    if not FIELD_RE.match(name):
+        raise RepositoryError(f"Unsupported field name: {name!r}")
+    # Tagged datetimes compare as their ISO string; every other value as itself
+    return f"COALESCE(json_extract(doc, '$.{name}.\"{DATE_TAG}\"'), json_extract(doc, '$.{name}'))"
+
+
+def _exists(name: str) -> str:
+    return "1" if name == "_id" else f"json_type(doc, '$.{name}') IS NOT NULL"
+
+
+def _compile_condition(name: str, condition: Any, params: List[Any]) -> str:
+    expr = _field(name)
+    if not isinstance(condition, dict):
+        if condition is None:
+            return f"{expr} IS NULL"
+        params.append(_encode_scalar(condition))
+        return f"{expr} = ?"
+    clauses = []
+    for op, value in condition.items():
+        if op in COMPARISONS:
+            params.append(_encode_scalar(value))
+            clauses.append(f"{expr} {COMPARISONS[op]} ?")
+        elif op == "$in":
+            if not value:
+                clauses.append("0")
+                continue
+            params.extend(_encode_scalar(v) for v in value)
+            clauses.append(f"{expr} IN ({', '.join('?' for _ in value)})")
+        elif op == "$ne":
+            if value is None:
+                clauses.append(f"{expr} IS NOT NULL")
+            else:
+                params.append(_encode_scalar(value))
+                clauses.append(f"({expr} IS NULL OR {expr} != ?)")
+        elif op == "$exists":
+            clauses.append(_exists(name) if value else f"NOT ({_exists(name)})")
+        elif op == "$type" and value == "string":
+            clauses.append("1" if name == "_id" else f"json_type(doc, '$.{name}') = 'text'")
+        else:
+            raise RepositoryError(f"Unsupported query operator: {op}")
+    return " AND ".join(clauses) or "1"
+
+
+def compile_filter(filter: Filter, params: List[Any]) -> str:
+    clauses = []
+    for key, condition in (filter or {}).items():
+        if key == "$or":
+            clauses.append("(" + " OR ".join(f"({compile_filter(f, params)})" for f in condition) + ")")
+        else:
+            clauses.append(_compile_condition(key, condition, params))
+    return " AND ".join(clauses) or "1"
+
+
+def _compile_partial(filter: Filter) -> str:
+    """Index WHERE clauses cannot take parameters, so only $exists partials are supported"""
+    params: List[Any] = []
+    sql = compile_filter(filter, params)
+    if params:
+        raise RepositoryError("Partial index filters may only use $exists")
+    return sql
+
+
+def _order_by(sort: Sort) -> str:
+    if not sort:
+        return ""
+    return " ORDER BY " + ", ".join(
+        f"{_field(name)} {'DESC' if direction < 0 else 'ASC'}" for name, direction in sort
+    )
+
+
+def _project(doc: Document, projection: Projection) -> Document:
+    if not projection:
+        return doc
+    include = [k for k, v in projection.items() if v and k != "_id"]
+    if include:
+        result = {k: doc[k] for k in include if k in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            result["_id"] = doc["_id"]
+        return result
+    return {k: v for k, v in doc.items() if projection.get(k, 1)}
+
+
+def _set_path(doc: Document, path: str, value: Any):
+    *parents, leaf = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[leaf] = value
+
+
+def _get_path(doc: Document, path: str) -> Any:
+    for part in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+
+def _unset_path(doc: Document, path: str):
+    *parents, leaf = path.split(".")
+    for part in parents:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(leaf, None)
+
+
+def apply_update(doc: Document, update: Dict[str, Any]) -> Document:
+    updated = json.loads(json.dumps(doc, default=_json_default))
+    updated = _decode(updated)
+    for op, fields in update.items():
+        for path, value in fields.items():
+            if op == "$set":
+                _set_path(updated, path, value)
+            elif op == "$unset":
+                _unset_path(updated, path)
+            elif op == "$inc":
+                _set_path(updated, path, (_get_path(updated, path) or 0) + value)
+            else:
+                raise RepositoryError(f"Unsupported update operator: {op}")
+    return updated
+
+
+def _upsert_seed(filter: Filter) -> Document:
+    """Equality conditions of a filter become the fields of an upserted document"""
+    return {k: v for k, v in filter.items() if not k.startswith("$") and not isinstance(v, dict)}
+
+
+class SqliteCollection(CollectionRepository):
+    def __init__(self, repository: "SqliteRepository", name: str):
+        if not NAME_RE.match(name):
+            raise RepositoryError(f"Unsupported collection name: {name!r}")
+        self.repository = repository
+        self.name = name
+        self.table = f'"{name}"'
+
+    # Statement helpers, executed on repository threads
+
+    def _select(self, conn, filter: Filter, sort: Sort = None, skip: int = 0, limit: int = 0):
+        params: List[Any] = []
+        sql = f"SELECT _id, doc FROM {self.table} WHERE {compile_filter(filter, params)}{_order_by(sort)}"
+        if limit or skip:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit or -1, skip]
+        return [self._load(row) for row in conn.execute(sql, params)]
+
+    @staticmethod
+    def _load(row) -> Document:
+        doc = _decode(json.loads(row[1]))
+        doc["_id"] = row[0]
+        return doc
+
+    @staticmethod
+    def _dump(doc: Document) -> Tuple[str, str]:
+        body = {k: v for k, v in doc.items() if k != "_id"}
+        return str(_encode_scalar(doc["_id"])), json.dumps(body, default=_json_default)
+
+    def _insert(self, conn, doc: Document):
+        doc = dict(doc)
+        doc.setdefault("_id", ObjectId())
+        try:
+            conn.execute(f"INSERT INTO {self.table} (_id, doc) VALUES (?, ?)", self._dump(doc))
+        except sqlite3.IntegrityError as exc:
+            raise DuplicateKeyError(str(exc)) from exc
+
+    def _replace(self, conn, doc: Document):
+        _id, body = self._dump(doc)
+        try:
+            conn.execute(f"UPDATE {self.table} SET doc = ? WHERE _id = ?", (body, _id))
+        except sqlite3.IntegrityError as exc:
+            raise DuplicateKeyError(str(exc)) from exc
+
+    # CollectionRepository
+
+    async def find(self, filter: Filter, projection: Projection = None, sort: Sort = None,
+                   skip: int = 0, limit: int = 0, max_time_ms: Optional[int] = None) -> List[Document]:
+        docs = await self.repository.read(self.name, self._select, filter, sort, skip, limit)
+        return [_project(doc, projection) for doc in docs]
+
+    async def find_one(self, filter: Filter, projection: Projection = None, sort: Sort = None,
+                       max_time_ms: Optional[int] = None) -> Optional[Document]:
+        docs = await self.repository.read(self.name, self._select, filter, sort, 0, 1)
+        return _project(docs[0], projection) if docs else None
+
+    async def insert_one(self, document: Document):
+        await self.repository.write(self.name, self._insert, document)
+
+    async def insert_many(self, documents: List[Document], ordered: bool = True) -> int:
+        def insert_all(conn):
+            inserted = 0
+            for doc in documents:
+                try:
+                    self._insert(conn, doc)
+                    inserted += 1
+                except DuplicateKeyError:
+                    if ordered:
+                        raise
+            return inserted
+        return await self.repository.write(self.name, insert_all)
+
+    async def find_one_and_update(self, filter: Filter, update: Dict[str, Any], projection: Projection = None,
+                                  return_after: bool = False, upsert: bool = False,
+                                  max_time_ms: Optional[int] = None, sort: Sort = None) -> Optional[Document]:
+        def find_and_update(conn):
+            found = self._select(conn, filter, sort, limit=1)
+            if found:
+                before = found[0]
+                after = apply_update(before, update)
+                self._replace(conn, after)
+            elif upsert:
+                before = None
+                after = apply_update(_upsert_seed(filter), update)
+                after.setdefault("_id", ObjectId())
+                self._insert(conn, after)
+            else:
+                return None
+            result = after if return_after else before
+            return _project(result, projection) if result is not None else None
+        return await self.repository.write(self.name, find_and_update)
+
+    async def _update(self, filter: Filter, update: Dict[str, Any], limit: int) -> Tuple[int, int]:
+        def update_rows(conn):
+            matched = self._select(conn, filter, limit=limit)
+            modified = 0
+            for doc in matched:
+                after = apply_update(doc, update)
+                if after != doc:
+                    self._replace(conn, after)
+                    modified += 1
+            return len(matched), modified
+        return await self.repository.write(self.name, update_rows)
+
+    async def update_one(self, filter: Filter, update: Dict[str, Any]) -> int:
+        return (await self._update(filter, update, limit=1))[0]
+
+    async def update_many(self, filter: Filter, update: Dict[str, Any]) -> int:
+        return (await self._update(filter, update, limit=0))[1]
+
+    async def find_one_and_delete(self, filter: Filter, projection: Projection = None,
+                                  max_time_ms: Optional[int] = None) -> Optional[Document]:
+        def find_and_delete(conn):
+            found = self._select(conn, filter, limit=1)
+            if not found:
+                return None
+            conn.execute(f"DELETE FROM {self.table} WHERE _id = ?", (found[0]["_id"],))
+            return _project(found[0], projection)
+        return await self.repository.write(self.name, find_and_delete)
+
+    async def delete_many(self, filter: Filter) -> int:
+        def delete_rows(conn):
+            params: List[Any] = []
+            sql = f"DELETE FROM {self.table} WHERE {compile_filter(filter, params)}"
+            return conn.execute(sql, params).rowcount
+        return await self.repository.write(self.name, delete_rows)
+
+    async def count(self, filter: Filter) -> int:
+        def count_rows(conn):
+            params: List[Any] = []
+            sql = f"SELECT COUNT(*) FROM {self.table} WHERE {compile_filter(filter, params)}"
+            return conn.execute(sql, params).fetchone()[0]
+        return await self.repository.read(self.name, count_rows)
+
+    async def create_index(self, keys: Sequence[Tuple[str, int]], unique: bool = False,
+                           name: Optional[str] = None, expire_after_seconds: Optional[int] = None,
+                           partial_filter: Optional[Filter] = None):
+        columns = ", ".join(f"{_field(k)} {'DESC' if d < 0 else 'ASC'}" for k, d in keys)
+        where = f" WHERE {_compile_partial(partial_filter)}" if partial_filter else ""
+        # Options are part of the name, so changed options build a fresh index
+        digest = hashlib.sha1(f"{columns}|{unique}|{where}".encode()).hexdigest()[:8]
+        index_name = f"{self.name}_{name or '_'.join(k for k, _ in keys).replace('.', '_')}_{digest}"
+        sql = (
+            f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS \"{index_name}\" "
+            f"ON {self.table} ({columns}){where}"
+        )
+        await self.repository.write(self.name, lambda conn: conn.execute(sql))
+        if expire_after_seconds is not None and len(keys) == 1:
+            self.repository.ttl_indexes[self.name] = (keys[0][0], expire_after_seconds)
+
+
+class SqliteRepository(Repository):
+    backend = "sqlite"
+
+    def __init__(self, path: str, readers: int = 4):
+        self.path = path
+        self.ttl_indexes: Dict[str, Tuple[str, int]] = {}
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite-writer")
+        self._readers = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="sqlite-reader")
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._tables = set()
+        self._lock = threading.Lock()
+        self._collections: Dict[str, SqliteCollection] = {}
+        self._last_purge = 0.0
+
+    def collection(self, name: str) -> SqliteCollection:
+        if name not in self._collections:
+            self._collections[name] = SqliteCollection(self, name)
+        return self._collections[name]
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.path, check_same_thread=False, isolation_level=None, cached_statements=256
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _ensure_table(self, conn: sqlite3.Connection, name: str):
+        if name in self._tables:
+            return
+        conn.execute(f'CREATE TABLE IF NOT EXISTS "{name}" (_id TEXT PRIMARY KEY, doc TEXT NOT NULL) WITHOUT ROWID')
+        with self._lock:
+            self._tables.add(name)
+
+    def _run_read(self, name: str, fn: Callable, *args):
+        conn = self._connection()
+        try:
+            self._ensure_table(conn, name)
+            return fn(conn, *args)
+        except sqlite3.Error as exc:
+            raise RepositoryError(str(exc)) from exc
+
+    def _run_write(self, name: str, fn: Callable, *args):
+        conn = self._connection()
+        try:
+            self._ensure_table(conn, name)
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn, *args)
+                self._purge_expired(conn)
+                conn.execute("COMMIT")
+                return result
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as exc:
+            raise RepositoryError(str(exc)) from exc
+
+    def _purge_expired(self, conn: sqlite3.Connection):
+        """Emulate MongoDB TTL indexes, at most once per TTL_PURGE_INTERVAL"""
+        now = time.monotonic()
+        if not self.ttl_indexes or now - self._last_purge < TTL_PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        for name, (field, seconds) in self.ttl_indexes.items():
+            cutoff = _encode_scalar(datetime.utcnow() - timedelta(seconds=seconds))
+            conn.execute(f'DELETE FROM "{name}" WHERE {_field(field)} < ?', (cutoff,))
+
+    async def read(self, name: str, fn: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._readers, partial(self._run_read, name, fn, *args))
+
+    async def write(self, name: str, fn: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._writer, partial(self._run_write, name, fn, *args))
+
+    def close(self):
+        self._writer.shutdown(wait=True)
+        self._readers.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
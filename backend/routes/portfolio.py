@@ -1,15 +1,32 @@
-from fastapi import APIRouter, HTTPException
-from motor.motor_asyncio import AsyncIOMotorClient
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from bson import ObjectId
+from pymongo import DESCENDING
 from models.portfolio import (
     PersonalInfo, PersonalInfoCreate,
-    Skill, SkillCreate,
-    Experience, ExperienceCreate,
-    Education, EducationCreate,
-    Language, LanguageCreate,
-    ContactMessage, ContactMessageCreate
+    ContactMessage, ContactMessageCreate, ContactStatusUpdate,
+    ChangeFeed, PortfolioView
 )
-from typing import List
-from datetime import datetime
+from repositories.base import create_repository
+from services.changelog import CREATE, UPDATE, ChangeLog, changed_fields
+from services.crud import CrudEngine
+from services.export import FORMATS, STREAM_CHUNK_SIZE, ExportService, etag_matches, iter_chunks
+from services.fields import (
+    FIELDS_QUERY, encode, encode_one, json_response, projection, select_fields
+)
+from services.ids import from_document, id_filter, is_compact, to_document
+from services.notifications import NotificationDispatcher
+from services.read_model import ReadModel
+from services.resilience import (
+    STORAGE_ERRORS, BreakerOpenError, QueryGuard, SingleFlight, StaleWhileRevalidateCache, mark_stale, unavailable
+)
+from services.sections import SECTION_RESOURCES, load_snapshot
+from services.tenancy import get_tenant
+from services.retention import RetentionPolicy, read_archive, spam_expiry
+from typing import List, Optional
+from datetime import date, datetime
+from itertools import islice
+import asyncio
 import os
 from dotenv import load_dotenv
 from pathlib import Path
@@ -18,203 +35,260 @@ from pathlib import Path
 ROOT_DIR = Path(__file__).parent.parent
 load_dotenv(ROOT_DIR / '.env')
 
-# Get database connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Get database connection (MongoDB or embedded SQLite, per STORAGE_BACKEND)
+guard = QueryGuard.from_env()
+db = create_repository(timeout_ms=guard.deadline_ms)
+# Concurrent identical reads share one query (section lists, personal info, versions, views)
+flights = SingleFlight.from_env()
+section_cache = StaleWhileRevalidateCache(
+    guard, max_stale_age=float(os.environ.get("STALE_MAX_AGE_SECONDS", 86400)), flights=flights,
+    max_entries=int(os.environ.get("CACHE_MAX_ENTRIES_PER_PARTITION", 64)),
+)
 
 router = APIRouter(prefix="/api")
+crud = CrudEngine(router, db, guard, section_cache)
+change_log = ChangeLog(
+    db,
+    ttl_days=int(os.environ.get("CHANGE_LOG_TTL_DAYS", 30)),
+    gap_seconds=float(os.environ.get("CHANGE_LOG_GAP_SECONDS", 30)),
+)
+crud.on_change(change_log.append)
 
 # Personal Information Endpoints
 @router.get("/personal-info", response_model=PersonalInfo)
-async def get_personal_info():
+async def get_personal_info(
+    response: Response,
+    fields: Optional[str] = FIELDS_QUERY,
+    if_none_match: Optional[str] = Header(None),
+):
     """Get personal information"""
-    personal_info = await db.personal_info.find_one()
+    tenant = get_tenant()
+    selected = select_fields(PersonalInfo, fields)
+    tag = await crud.version_tag(tenant)
+    not_modified = crud.not_modified(tag, if_none_match)
+    if not_modified:
+        return not_modified
+
+    async def fetch():
+        personal_info = await db.personal_info.find_one(
+            {"tenant": tenant}, projection(selected, None), max_time_ms=guard.deadline_ms
+        )
+        if not personal_info:
+            return None
+        personal_info = from_document(personal_info)
+        if selected:
+            return encode_one(PersonalInfo, selected, personal_info)
+        return PersonalInfo(**personal_info)
+
+    personal_info, stale = await section_cache.get(
+        ("personal_info", tenant), selected, fetch, ttl=30, version=tag[0] if tag else None
+    )
     if not personal_info:
         raise HTTPException(status_code=404, detail="Personal information not found")
-    return PersonalInfo(**personal_info)
+    if selected:
+        response = json_response(personal_info)
+    mark_stale(response, stale)
+    if not stale:
+        crud.set_version_headers(response, tag)
+    return response if selected else personal_info
 
 @router.put("/personal-info", response_model=PersonalInfo)
 async def update_personal_info(info: PersonalInfoCreate):
     """Update personal information"""
-    existing = await db.personal_info.find_one()
+    tenant = get_tenant()
+    existing = await guard.run_or_unavailable(
+        lambda: db.personal_info.find_one({"tenant": tenant}, max_time_ms=guard.deadline_ms)
+    )
     if existing:
+        existing = from_document(existing)
         # Update existing record
         update_data = info.dict()
         update_data["updated_at"] = datetime.utcnow()
-        result = await db.personal_info.update_one(
-            {"id": existing["id"]}, 
-            {"$set": update_data}
-        )
-        if result.modified_count:
-            updated = await db.personal_info.find_one({"id": existing["id"]})
-            return PersonalInfo(**updated)
+        updated = await guard.run_or_unavailable(lambda: db.personal_info.find_one_and_update(
+            {"tenant": tenant, **id_filter(existing["id"])},
+            {"$set": update_data},
+            return_after=True,
+            max_time_ms=guard.deadline_ms,
+        ))
+        section_cache.invalidate(("personal_info", tenant))
+        if updated:
+            await crud.notify(
+                tenant, "personal_info", UPDATE, existing["id"], changed_fields(existing, update_data)
+            )
+            return PersonalInfo(**from_document(updated))
         raise HTTPException(status_code=400, detail="Failed to update personal info")
     else:
         # Create new record
         new_info = PersonalInfo(**info.dict())
-        await db.personal_info.insert_one(new_info.dict())
+        document = to_document(new_info.dict())
+        await guard.run_or_unavailable(lambda: db.personal_info.insert_one(document))
+        section_cache.invalidate(("personal_info", tenant))
+        fields = {k: v for k, v in document.items() if k not in ("_id", "tenant")}
+        await crud.notify(tenant, "personal_info", CREATE, new_info.id, fields)
         return new_info
 
-# Skills Endpoints
-@router.get("/skills", response_model=List[Skill])
-async def get_skills():
-    """Get all skill categories ordered by order field"""
-    skills_cursor = db.skills.find().sort("order", 1)
-    skills = await skills_cursor.to_list(1000)
-    return [Skill(**skill) for skill in skills]
-
-@router.post("/skills", response_model=Skill)
-async def create_skill(skill: SkillCreate):
-    """Create new skill category"""
-    new_skill = Skill(**skill.dict())
-    await db.skills.insert_one(new_skill.dict())
-    return new_skill
-
-@router.put("/skills/{skill_id}", response_model=Skill)
-async def update_skill(skill_id: str, skill: SkillCreate):
-    """Update skill category"""
-    update_data = skill.dict()
-    update_data["updated_at"] = datetime.utcnow()
-    result = await db.skills.update_one(
-        {"id": skill_id}, 
-        {"$set": update_data}
-    )
-    if result.modified_count:
-        updated = await db.skills.find_one({"id": skill_id})
-        return Skill(**updated)
-    raise HTTPException(status_code=404, detail="Skill category not found")
-
-@router.delete("/skills/{skill_id}")
-async def delete_skill(skill_id: str):
-    """Delete skill category"""
-    result = await db.skills.delete_one({"id": skill_id})
-    if result.deleted_count:
-        return {"message": "Skill category deleted successfully"}
-    raise HTTPException(status_code=404, detail="Skill category not found")
-
-# Experience Endpoints
-@router.get("/experience", response_model=List[Experience])
-async def get_experience():
-    """Get all work experience ordered by order field"""
-    exp_cursor = db.experience.find().sort("order", 1)
-    experience = await exp_cursor.to_list(1000)
-    return [Experience(**exp) for exp in experience]
-
-@router.post("/experience", response_model=Experience)
-async def create_experience(experience: ExperienceCreate):
-    """Create new experience entry"""
-    new_exp = Experience(**experience.dict())
-    await db.experience.insert_one(new_exp.dict())
-    return new_exp
-
-@router.put("/experience/{exp_id}", response_model=Experience)
-async def update_experience(exp_id: str, experience: ExperienceCreate):
-    """Update experience entry"""
-    update_data = experience.dict()
-    update_data["updated_at"] = datetime.utcnow()
-    result = await db.experience.update_one(
-        {"id": exp_id}, 
-        {"$set": update_data}
-    )
-    if result.modified_count:
-        updated = await db.experience.find_one({"id": exp_id})
-        return Experience(**updated)
-    raise HTTPException(status_code=404, detail="Experience entry not found")
-
-@router.delete("/experience/{exp_id}")
-async def delete_experience(exp_id: str):
-    """Delete experience entry"""
-    result = await db.experience.delete_one({"id": exp_id})
-    if result.deleted_count:
-        return {"message": "Experience entry deleted successfully"}
-    raise HTTPException(status_code=404, detail="Experience entry not found")
-
-# Education Endpoints
-@router.get("/education", response_model=List[Education])
-async def get_education():
-    """Get all education records ordered by order field"""
-    edu_cursor = db.education.find().sort("order", 1)
-    education = await edu_cursor.to_list(1000)
-    return [Education(**edu) for edu in education]
-
-@router.post("/education", response_model=Education)
-async def create_education(education: EducationCreate):
-    """Create new education record"""
-    new_edu = Education(**education.dict())
-    await db.education.insert_one(new_edu.dict())
-    return new_edu
-
-@router.put("/education/{edu_id}", response_model=Education)
-async def update_education(edu_id: str, education: EducationCreate):
-    """Update education record"""
-    update_data = education.dict()
-    update_data["updated_at"] = datetime.utcnow()
-    result = await db.education.update_one(
-        {"id": edu_id}, 
-        {"$set": update_data}
-    )
-    if result.modified_count:
-        updated = await db.education.find_one({"id": edu_id})
-        return Education(**updated)
-    raise HTTPException(status_code=404, detail="Education record not found")
-
-@router.delete("/education/{edu_id}")
-async def delete_education(edu_id: str):
-    """Delete education record"""
-    result = await db.education.delete_one({"id": edu_id})
-    if result.deleted_count:
-        return {"message": "Education record deleted successfully"}
-    raise HTTPException(status_code=404, detail="Education record not found")
-
-# Languages Endpoints
-@router.get("/languages", response_model=List[Language])
-async def get_languages():
-    """Get all languages ordered by order field"""
-    lang_cursor = db.languages.find().sort("order", 1)
-    languages = await lang_cursor.to_list(1000)
-    return [Language(**lang) for lang in languages]
-
-@router.post("/languages", response_model=Language)
-async def create_language(language: LanguageCreate):
-    """Create new language record"""
-    new_lang = Language(**language.dict())
-    await db.languages.insert_one(new_lang.dict())
-    return new_lang
-
-@router.put("/languages/{lang_id}", response_model=Language)
-async def update_language(lang_id: str, language: LanguageCreate):
-    """Update language record"""
-    update_data = language.dict()
-    update_data["updated_at"] = datetime.utcnow()
-    result = await db.languages.update_one(
-        {"id": lang_id}, 
-        {"$set": update_data}
+# Ordered portfolio sections, served by the generic CRUD engine
+for resource in SECTION_RESOURCES:
+    crud.register(resource)
+
+# Incremental Sync Endpoint
+async def build_snapshot(tenant: str):
+    """Read every portfolio section for a tenant in one pass"""
+    return await load_snapshot(db, tenant, max_time_ms=guard.deadline_ms)
+
+@router.get("/portfolio/changes", response_model=ChangeFeed)
+async def get_changes(since: int = Query(0, ge=0), limit: int = Query(500, ge=1, le=5000)):
+    """Get compacted changes after a cursor, or a full snapshot if the cursor is too old"""
+    tenant = get_tenant()
+
+    async def read_feed():
+        # Read the cursor before the snapshot so writes racing the snapshot are replayed, not lost
+        feed = await change_log.changes_since(tenant, since, limit)
+        if feed is None:
+            cursor = await change_log.current_seq(tenant)
+            feed = {"cursor": cursor, "has_more": False, "changes": [], "snapshot": await build_snapshot(tenant)}
+        return feed
+
+    return await guard.run_or_unavailable(read_feed)
+
+# Résumé Export Endpoints
+exports = ExportService(build_snapshot, change_log.current_seq, flights=flights, guard=guard)
+crud.on_change(exports.on_change)
+# Section GETs share the export's cached content version for ETags and 304s
+crud.content_version = exports.version
+
+@router.get("/export/{export_format}")
+async def export_resume(export_format: str, if_none_match: Optional[str] = Header(None)):
+    """Download the portfolio as JSON Resume, Markdown, vCard or print-ready HTML"""
+    if export_format not in FORMATS:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Unknown export format; expected one of: {', '.join(FORMATS)}",
+        )
+    tenant = get_tenant()
+    try:
+        # The service guards its own storage reads; memoized artifacts never touch the breaker
+        artifact = await exports.render(tenant, export_format)
+    except (BreakerOpenError, *STORAGE_ERRORS) as exc:
+        raise unavailable(exc)
+    _, media_type, extension = FORMATS[export_format]
+    headers = {"ETag": artifact.etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, artifact.etag):
+        return Response(status_code=304, headers=headers)
+    headers["Content-Disposition"] = f'attachment; filename="resume.{extension}"'
+    if len(artifact.body) > STREAM_CHUNK_SIZE:
+        headers["Content-Length"] = str(len(artifact.body))
+        return StreamingResponse(iter_chunks(artifact.body), media_type=media_type, headers=headers)
+    return Response(content=artifact.body, media_type=media_type, headers=headers)
+
+# Portfolio Read Model Endpoint
+read_model = ReadModel(db, build_snapshot, change_log.current_seq)
+crud.on_change(read_model.on_change)
+
+@router.get("/portfolio", response_model=PortfolioView)
+async def get_portfolio(response: Response, if_none_match: Optional[str] = Header(None)):
+    """Get every portfolio section in one pre-assembled document"""
+    tenant = get_tenant()
+    tag = await crud.version_tag(tenant)
+    not_modified = crud.not_modified(tag, if_none_match)
+    if not_modified:
+        return not_modified
+
+    async def fetch():
+        view = await read_model.get(tenant, max_time_ms=guard.deadline_ms)
+        if view is None or (tag and view["version"] < tag[0]):
+            # Never built (new tenant) or behind a change-log reset: rebuild on read
+            await read_model.refresh(tenant)
+            view = await read_model.get(tenant, max_time_ms=guard.deadline_ms)
+            if view is None:
+                raise HTTPException(
+                    status_code=503, detail="Portfolio view is being rebuilt", headers={"Retry-After": "1"}
+                )
+        return view
+
+    # Versioned like the sections, and the last materialized view is served stale while the breaker is open
+    view, stale = await section_cache.get(
+        ("portfolio_view", tenant), None, fetch, ttl=30, version=tag[0] if tag else None
     )
-    if result.modified_count:
-        updated = await db.languages.find_one({"id": lang_id})
-        return Language(**updated)
-    raise HTTPException(status_code=404, detail="Language record not found")
-
-@router.delete("/languages/{lang_id}")
-async def delete_language(lang_id: str):
-    """Delete language record"""
-    result = await db.languages.delete_one({"id": lang_id})
-    if result.deleted_count:
-        return {"message": "Language record deleted successfully"}
-    raise HTTPException(status_code=404, detail="Language record not found")
-
-# Contact Form Endpoint
+    mark_stale(response, stale)
+    if not stale:
+        crud.set_version_headers(response, (view["version"], f'W/"v{view["version"]}"'))
+    return PortfolioView(**view)
+
+# Contact Form Endpoints
+notifications = NotificationDispatcher.from_env(db)
+
 @router.post("/contact", response_model=ContactMessage)
 async def submit_contact(contact: ContactMessageCreate):
     """Submit contact form message"""
     new_message = ContactMessage(**contact.dict())
-    await db.contact_messages.insert_one(new_message.dict())
+    document = to_document(new_message.dict())
+    await guard.run_or_unavailable(lambda: db.contact_messages.insert_one(document))
+    # Email/webhook delivery happens in the background dispatcher, never on the request path
+    await notifications.enqueue(new_message.tenant, new_message.dict())
     return new_message
 
 @router.get("/contact", response_model=List[ContactMessage])
-async def get_contact_messages():
-    """Get all contact messages (admin endpoint)"""
-    messages_cursor = db.contact_messages.find().sort("created_at", -1)
-    messages = await messages_cursor.to_list(1000)
-    return [ContactMessage(**msg) for msg in messages]
\ No newline at end of file
+async def get_contact_messages(
+    fields: Optional[str] = FIELDS_QUERY,
+    before: Optional[str] = Query(None, description="Keyset cursor: return messages older than this id"),
+    limit: int = Query(1000, ge=1, le=1000),
+):
+    """Get all contact messages, newest first (admin endpoint)"""
+    selected = select_fields(ContactMessage, fields)
+    query = {"tenant": get_tenant()}
+    if before:
+        if not is_compact(before):
+            raise HTTPException(status_code=400, detail="before must be a message id")
+        query["_id"] = {"$lt": ObjectId(before)}
+    # _id is time-ordered, so the newest-first walk follows the (tenant, _id) index
+    messages = await guard.run_or_unavailable(lambda: db.contact_messages.find(
+        query, projection(selected, None), sort=[("_id", DESCENDING)],
+        limit=limit, max_time_ms=guard.deadline_ms,
+    ))
+    messages = [from_document(msg) for msg in messages]
+    if selected:
+        return json_response(encode(ContactMessage, selected, messages))
+    return [ContactMessage(**msg) for msg in messages]
+
+@router.get("/contact/archive", response_model=List[ContactMessage])
+async def get_archived_contact_messages(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    email: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=1000),
+    fields: Optional[str] = FIELDS_QUERY,
+):
+    """Query archived contact messages without restoring them (admin endpoint)"""
+    selected = select_fields(ContactMessage, fields)
+    policy = RetentionPolicy.from_env()
+    tenant = get_tenant()
+    records = await asyncio.to_thread(
+        lambda: list(islice(read_archive(policy.archive_dir, start, end, email, status, tenant), limit))
+    )
+    if selected:
+        return json_response(encode(ContactMessage, selected, records))
+    return [ContactMessage(**record) for record in records]
+
+@router.put("/contact/{message_id}/status", response_model=ContactMessage)
+async def update_contact_status(message_id: str, update: ContactStatusUpdate):
+    """Update contact message status (admin endpoint)"""
+    existing = await guard.run_or_unavailable(lambda: db.contact_messages.find_one(
+        {"tenant": get_tenant(), **id_filter(message_id)}, max_time_ms=guard.deadline_ms
+    ))
+    if not existing:
+        raise HTTPException(status_code=404, detail="Contact message not found")
+    query = {"_id": existing["_id"]}
+    update_data = {"status": update.status}
+    unset_data = {}
+    if update.status == "spam":
+        update_data["expire_at"] = spam_expiry(existing["created_at"], RetentionPolicy.from_env())
+    elif "expire_at" in existing and "archived_at" not in existing:
+        unset_data["expire_at"] = ""
+    changes = {"$set": update_data}
+    if unset_data:
+        changes["$unset"] = unset_data
+    await guard.run_or_unavailable(lambda: db.contact_messages.update_one(query, changes))
+    existing.update(update_data)
+    return ContactMessage(**from_document(existing))
@@ -1,16 +1,15 @@
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
+import sys
 from models.portfolio import PersonalInfo, Skill, Experience, Education, Language
-import os
+from repositories.base import create_repository
+from services.changelog import ChangeLog
+from services.ids import to_document
+from services.sections import offline_read_model
+from services.tenancy import DEFAULT_TENANT
 from dotenv import load_dotenv
 
 load_dotenv()
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
 # Mock data from frontend
 SEED_DATA = {
     "personal_info": {
@@ -161,52 +160,53 @@ SEED_DATA = {
     ]
 }
 
-async def seed_database():
+def build_seed_documents(tenant: str = DEFAULT_TENANT):
+    """Build the seed documents for one tenant, keyed by collection"""
+    def documents(model, rows):
+        return [to_document(model(**row, tenant=tenant).dict()) for row in rows]
+
+    return {
+        "personal_info": documents(PersonalInfo, [SEED_DATA["personal_info"]]),
+        "skills": documents(Skill, SEED_DATA["skills"]),
+        "experience": documents(Experience, SEED_DATA["experience"]),
+        "education": documents(Education, SEED_DATA["education"]),
+        "languages": documents(Language, SEED_DATA["languages"]),
+    }
+
+async def seed_database(tenant: str = DEFAULT_TENANT):
     """Seed the database with initial portfolio data"""
-    print("🌱 Starting database seeding...")
+    print(f"🌱 Starting database seeding for tenant '{tenant}'...")
+    db = create_repository()
     
     try:
-        # Clear existing data
-        collections = ['personal_info', 'skills', 'experience', 'education', 'languages']
-        for collection in collections:
-            await db[collection].delete_many({})
+        # Clear existing data for this tenant only
+        documents = build_seed_documents(tenant)
+        for collection in documents:
+            await db[collection].delete_many({"tenant": tenant})
             print(f"✅ Cleared {collection} collection")
         
-        # Seed Personal Info
-        personal_info = PersonalInfo(**SEED_DATA["personal_info"])
-        await db.personal_info.insert_one(personal_info.dict())
-        print("✅ Seeded personal information")
-        
-        # Seed Skills
-        for skill_data in SEED_DATA["skills"]:
-            skill = Skill(**skill_data)
-            await db.skills.insert_one(skill.dict())
-        print(f"✅ Seeded {len(SEED_DATA['skills'])} skill categories")
-        
-        # Seed Experience
-        for exp_data in SEED_DATA["experience"]:
-            experience = Experience(**exp_data)
-            await db.experience.insert_one(experience.dict())
-        print(f"✅ Seeded {len(SEED_DATA['experience'])} experience entries")
-        
-        # Seed Education
-        for edu_data in SEED_DATA["education"]:
-            education = Education(**edu_data)
-            await db.education.insert_one(education.dict())
-        print(f"✅ Seeded {len(SEED_DATA['education'])} education records")
+        labels = {
+            "personal_info": "personal information records",
+            "skills": "skill categories",
+            "experience": "experience entries",
+            "education": "education records",
+            "languages": "language records",
+        }
+        for collection, docs in documents.items():
+            await db[collection].insert_many(docs)
+            print(f"✅ Seeded {len(docs)} {labels[collection]}")
         
-        # Seed Languages
-        for lang_data in SEED_DATA["languages"]:
-            language = Language(**lang_data)
-            await db.languages.insert_one(language.dict())
-        print(f"✅ Seeded {len(SEED_DATA['languages'])} language records")
+        # Advance the content version so sync clients and export caches pick up the new data
+        await ChangeLog(db).reset(tenant)
+        await offline_read_model(db).rebuild(tenant)
+        print("✅ Rebuilt portfolio view")
         
         print("🎉 Database seeding completed successfully!")
         
     except Exception as e:
         print(f"❌ Error during seeding: {str(e)}")
     finally:
-        client.close()
+        db.close()
 
 if __name__ == "__main__":
-    asyncio.run(seed_database())
\ No newline at end of file
+    asyncio.run(seed_database(sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TENANT))
@@ -0,0 +1,223 @@
+import argparse
+import logging
+import os
+import random
+import signal
+import socket
+import sys
+import threading
+import time
+from dotenv import load_dotenv
+from pathlib import Path
+
+import uvicorn
+
+from services.structured_logging import log_formatter, log_level
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+logger = logging.getLogger("serve")
+
+APP = "server:app"
+
+def available(module: str) -> bool:
+    try:
+        __import__(module)
+        return True
+    except ImportError:
+        return False
+
+def rss_mb() -> float:
+    """Current resident set size of this process in MiB"""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except (OSError, ValueError):
+        # No procfs (macOS): fall back to the peak RSS, which still catches runaway growth
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+def watch_rss(server: uvicorn.Server, max_rss_mb: float, interval: float):
+    """Ask the worker to drain and exit once it grows past max_rss_mb; the supervisor replaces it"""
+    while not server.should_exit:
+        time.sleep(interval)
+        current = rss_mb()
+        if current > max_rss_mb:
+            logger.warning(f"♻️ Worker {os.getpid()} at {current:.0f} MiB RSS (limit {max_rss_mb:.0f}), recycling")
+            server.should_exit = True
+
+def listen_socket(host: str, port: int, backlog: int) -> socket.socket:
+    """Listening TCP socket shared by every worker
+
+    Created with an explicit IPPROTO_TCP: asyncio only sets TCP_NODELAY on
+    accepted sockets whose proto says TCP, and without it Nagle plus delayed
+    ACKs stall every keep-alive request after the first by ~40 ms.
+    """
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM, socket.IPPROTO_TCP)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+def run_worker(args, sock: socket.socket):
+    """Child process: serve the app on the inherited socket until recycled or told to stop"""
+    max_requests = None
+    if args.max_requests:
+        # Jitter so workers started together don't all recycle at the same moment
+        max_requests = args.max_requests + random.randint(0, args.max_requests_jitter)
+    config = uvicorn.Config(
+        APP,
+        loop=args.loop,
+        http=args.http,
+        timeout_keep_alive=args.keep_alive,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        backlog=args.backlog,
+        limit_max_requests=max_requests,
+        limit_concurrency=args.limit_concurrency or None,
+        log_config=None,  # the app installs its own queue-based logging
+        access_log=False,  # replaced by the app's sampled access log
+        proxy_headers=True,
+        forwarded_allow_ips=args.forwarded_allow_ips,
+    )
+    server = uvicorn.Server(config)
+    if args.max_rss_mb:
+        threading.Thread(
+            target=watch_rss, args=(server, args.max_rss_mb, args.rss_check_seconds), daemon=True
+        ).start()
+    server.run(sockets=[sock])
+
+class Supervisor:
+    """Pre-fork supervisor: workers share one listening socket and are replaced when they exit"""
+
+    def __init__(self, args):
+        self.args = args
+        self.workers = {}
+        self.stopping = False
+
+    def spawn(self, sock: socket.socket):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            code = 0
+            try:
+                run_worker(self.args, sock)
+            except Exception:
+                logger.exception("Worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.workers[pid] = time.monotonic()
+
+    def stop(self, signum, frame):
+        if not self.stopping:
+            logger.info(f"🛑 Received {signal.Signals(signum).name}, draining workers...")
+        self.stopping = True
+
+    def run(self):
+        args = self.args
+        sock = listen_socket(args.host, args.port, args.backlog)
+        logger.info(
+            f"🚀 Serving {APP} on http://{args.host}:{args.port} with {args.workers} workers "
+            f"(loop={args.loop}, http={args.http}, keep-alive={args.keep_alive}s, backlog={args.backlog})"
+        )
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for _ in range(args.workers):
+            self.spawn(sock)
+
+        while not self.stopping:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                pid = 0
+            if pid and pid in self.workers:
+                uptime = time.monotonic() - self.workers.pop(pid)
+                code = os.waitstatus_to_exitcode(status)
+                logger.info(f"♻️ Worker {pid} exited with {code} after {uptime:.0f}s, starting a replacement")
+                if code != 0 and uptime < 1:
+                    time.sleep(1)  # don't spin if workers die on startup
+                self.spawn(sock)
+            else:
+                time.sleep(0.2)
+
+        self.shutdown()
+        sock.close()
+
+    def shutdown(self):
+        for pid in self.workers:
+            os.kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.args.graceful_timeout + 5
+        while self.workers and time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid:
+                self.workers.pop(pid, None)
+            else:
+                time.sleep(0.1)
+        for pid in self.workers:
+            logger.warning(f"⚠️ Worker {pid} did not drain in time, killing it")
+            os.kill(pid, signal.SIGKILL)
+        logger.info("👋 All workers stopped")
+
+def apply_bench_preset(args):
+    """Settings for reproducible throughput runs with bench.py --url"""
+    args.max_requests = 0
+    args.max_rss_mb = 0
+    args.keep_alive = max(args.keep_alive, 75)
+    args.backlog = max(args.backlog, 4096)
+    # Keep error and slow-request logs, drop routine access logs and rate limits
+    os.environ["ACCESS_LOG_SAMPLE_RATE"] = "0"
+    os.environ["LOG_LEVEL"] = "WARNING"
+    os.environ["TENANT_RATE_LIMIT_RPS"] = "0"
+
+def main():
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="Production launcher for the portfolio API")
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8001)))
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_CONCURRENCY", cpus)),
+                        help="Worker processes (default: CPU count)")
+    parser.add_argument("--loop", choices=["auto", "uvloop", "asyncio"], default="auto")
+    parser.add_argument("--http", choices=["auto", "httptools", "h11"], default="auto")
+    parser.add_argument("--keep-alive", type=int, default=int(os.environ.get("KEEP_ALIVE_SECONDS", 5)))
+    parser.add_argument("--backlog", type=int, default=int(os.environ.get("BACKLOG", 2048)))
+    parser.add_argument("--graceful-timeout", type=int, default=int(os.environ.get("GRACEFUL_TIMEOUT_SECONDS", 30)))
+    parser.add_argument("--limit-concurrency", type=int, default=0,
+                        help="Hard per-worker connection cap (0: rely on admission control)")
+    parser.add_argument("--max-requests", type=int, default=int(os.environ.get("MAX_REQUESTS", 0)),
+                        help="Recycle a worker after this many requests (0: never)")
+    parser.add_argument("--max-requests-jitter", type=int, default=int(os.environ.get("MAX_REQUESTS_JITTER", 0)))
+    parser.add_argument("--max-rss-mb", type=float, default=float(os.environ.get("MAX_RSS_MB", 0)),
+                        help="Recycle a worker whose resident memory exceeds this (0: never)")
+    parser.add_argument("--rss-check-seconds", type=float, default=10.0)
+    parser.add_argument("--forwarded-allow-ips", default=os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1"))
+    parser.add_argument("--bench", action="store_true", help="Preset for load testing with bench.py --url")
+    args = parser.parse_args()
+
+    if args.loop == "auto":
+        args.loop = "uvloop" if available("uvloop") else "asyncio"
+    if args.http == "auto":
+        args.http = "httptools" if available("httptools") else "h11"
+    if args.bench:
+        apply_bench_preset(args)
+    args.workers = max(1, args.workers)
+
+    # Same level and format as the workers; a plain handler since the queue listener thread can't survive fork
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(log_formatter())
+    logging.basicConfig(level=log_level(), handlers=[handler])
+    for name in ("uvicorn", "uvicorn.error"):
+        logging.getLogger(name).setLevel(log_level())
+    if args.bench:
+        print(f"🏁 Bench preset on; load test with: python bench.py --url http://127.0.0.1:{args.port}")
+    Supervisor(args).run()
+
+if __name__ == "__main__":
+    main()
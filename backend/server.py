@@ -1,22 +1,26 @@
 from fastapi import FastAPI
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+import asyncio
 import os
 import logging
 from pathlib import Path
 
 # Import portfolio routes
-from routes.portfolio import router as portfolio_router
+from routes.portfolio import (
+    router as portfolio_router, crud, change_log, db, flights, guard, notifications, read_model
+)
+from services.admission import AdmissionController, AdmissionMiddleware
+from services.structured_logging import AccessLogMiddleware, access_sampler_from_env, configure_logging
+from services.retention import RetentionPolicy, ensure_indexes as ensure_retention_indexes, retention_loop
+from services.tenancy import (
+    TenantDirectory, TenantMiddleware, TenantRateLimiter,
+    backfill_default_tenant, ensure_indexes as ensure_tenant_indexes,
+)
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
-
 # Create the main app
 app = FastAPI(title="Sarath M Warrier Portfolio API", version="1.0.0")
 
@@ -28,27 +32,74 @@ app.include_router(portfolio_router)
 async def root():
     return {"message": "Sarath M Warrier Portfolio API - v1.0.0"}
 
+# Admission control: adaptive per-class concurrency limits with priority shedding
+admission = AdmissionController.from_env()
+
+@app.get("/api/metrics")
+async def metrics():
+    """Runtime counters for admission control, the database circuit breaker and read coalescing"""
+    return {
+        "admission": admission.snapshot(),
+        "breaker": {"state": guard.breaker.state, "trips": guard.breaker.trips},
+        "notifications": vars(notifications.stats),
+        "singleflight": flights.snapshot(),
+    }
+
+# Resolve the tenant (path prefix or Host header) and apply its rate limit
+tenant_directory = TenantDirectory(db, refresh_seconds=float(os.environ.get("TENANT_REFRESH_SECONDS", 60)))
+app.add_middleware(TenantMiddleware, directory=tenant_directory, limiter=TenantRateLimiter.from_env())
+app.add_middleware(AdmissionMiddleware, controller=admission)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=["*"],
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let the frontend's cache read validators and freshness markers cross-origin
+    expose_headers=["ETag", "X-Content-Version", "X-Stale", "X-Request-ID"],
 )
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+# Request ids and sampled access logs, outermost so shed and CORS responses are logged too
+app.add_middleware(AccessLogMiddleware, sampler=access_sampler_from_env())
+
+# Configure logging: records are queued and written by a background thread
+log_listener = configure_logging()
 logger = logging.getLogger(__name__)
 
+background_tasks = []
+
 @app.on_event("startup")
 async def startup_db_client():
     logger.info("🚀 Portfolio API server starting up...")
-    logger.info(f"📊 Connected to MongoDB: {os.environ.get('DB_NAME')}")
+    logger.info(f"📊 Storage backend: {db.backend}")
+    assigned = await backfill_default_tenant(db)
+    if assigned:
+        logger.info(f"🏷️ Assigned {assigned} legacy documents to the default tenant")
+    await ensure_tenant_indexes(db)
+    await crud.ensure_indexes()
+    await change_log.ensure_indexes()
+    await read_model.ensure_indexes()
+    await tenant_directory.load()
+    await notifications.ensure_indexes()
+    notifications.start()
+    if notifications.config.channels:
+        logger.info(f"📬 Contact notifications via {', '.join(notifications.config.channels)}")
+    # Archival and TTL retention use MongoDB bulk writes and TTL indexes
+    retention_policy = RetentionPolicy.from_env()
+    if db.backend == "mongo":
+        await ensure_retention_indexes(db.database)
+        if retention_policy.interval_seconds > 0:
+            background_tasks.append(asyncio.create_task(retention_loop(db.database, retention_policy)))
+            logger.info(f"🗄️ Contact message retention every {retention_policy.interval_seconds}s")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    logger.info("📊 Closing MongoDB connection...")
-    client.close()
\ No newline at end of file
+    for task in background_tasks:
+        task.cancel()
+    # Let the retention loop release its lease before the client closes
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await notifications.stop()
+    logger.info("📊 Closing database connection...")
+    db.close()
+    log_listener.stop()
\ No newline at end of file
@@ -0,0 +1,248 @@
+"""Adaptive concurrency limits and priority load shedding.
+
+Requests are sorted into route classes, each with its own concurrency limit
+that adapts to observed latency (AIMD: grow by roughly one slot per window
+of fast responses, shrink multiplicatively when latency overshoots the
+class target or the backend errors). A global limit of the same kind
+covers the shared event loop and database pool. Requests over either limit
+wait in a single priority queue, so freed capacity goes to cached public
+page loads before admin traffic and contact-form posts. Anything still queued after
+its class's wait budget, or arriving to a full queue, gets a fast 503 with
+``Retry-After`` instead of piling onto the event loop and connection pool.
+"""
+import asyncio
+import bisect
+import itertools
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from services.tenancy import TENANT_PREFIX, send_json
+
+PUBLIC_CACHED = "public_cached"
+PUBLIC = "public"
+ADMIN = "admin"
+CONTACT = "contact"
+
+# Public GETs answered from the stale-while-revalidate or export caches (plus the read model)
+CACHED_PATHS = ("/api/personal-info", "/api/skills", "/api/experience", "/api/education",
+                "/api/languages", "/api/export/")
+ADMIN_READ_PATHS = ("/api/contact",)
+EXEMPT_PATHS = ("/api/metrics",)
+
+
+@dataclass
+class ClassPolicy:
+    priority: int  # lower is served first
+    target_ms: float  # latency above this shrinks the limit
+    queue_budget_ms: float  # longest a request may wait for a slot
+    initial_limit: float = 20
+    min_limit: float = 1
+    max_limit: float = 200
+    max_queue: int = 100
+
+
+class AdaptiveLimit:
+    """AIMD concurrency limit driven by per-request latency"""
+
+    def __init__(self, policy: ClassPolicy, backoff: float = 0.9):
+        self.policy = policy
+        self.backoff = backoff
+        self.limit = policy.initial_limit
+        self.in_flight = 0
+        self._last_decrease = 0.0
+
+    def has_capacity(self) -> bool:
+        return self.in_flight < int(self.limit)
+
+    def record(self, latency_ms: float, overloaded: bool):
+        if overloaded or latency_ms > self.policy.target_ms:
+            # At most one decrease per target latency, so a burst of slow calls counts once
+            now = time.monotonic()
+            if now - self._last_decrease >= self.policy.target_ms / 1000:
+                self._last_decrease = now
+                self.limit = max(self.policy.min_limit, self.limit * self.backoff)
+        elif self.in_flight + 1 >= int(self.limit):
+            # Only grow while the limit is actually the bottleneck
+            self.limit = min(self.policy.max_limit, self.limit + 1 / self.limit)
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    route_class: str = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+@dataclass
+class ClassStats:
+    admitted: int = 0
+    queued: int = 0
+    shed_queue_full: int = 0
+    shed_timeout: int = 0
+
+
+class AdmissionController:
+    def __init__(self, policies: Dict[str, ClassPolicy], total: ClassPolicy):
+        self.limits = {name: AdaptiveLimit(policy) for name, policy in policies.items()}
+        self.total = AdaptiveLimit(total)
+        self.stats = {name: ClassStats() for name in policies}
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        def env(name: str, default: float) -> float:
+            return float(os.environ.get(name, default))
+
+        budget = env("ADMISSION_QUEUE_BUDGET_MS", 250)
+        max_limit = env("ADMISSION_MAX_LIMIT", 200)
+        total = ClassPolicy(0, env("ADMISSION_TARGET_MS", 500), budget, initial_limit=50,
+                            max_limit=env("ADMISSION_MAX_TOTAL_LIMIT", 500))
+        return cls({
+            PUBLIC_CACHED: ClassPolicy(0, env("ADMISSION_CACHED_TARGET_MS", 50), budget * 2, max_limit=max_limit),
+            PUBLIC: ClassPolicy(1, env("ADMISSION_PUBLIC_TARGET_MS", 250), budget, max_limit=max_limit),
+            ADMIN: ClassPolicy(2, env("ADMISSION_ADMIN_TARGET_MS", 500), budget, initial_limit=10,
+                               max_limit=max_limit),
+            CONTACT: ClassPolicy(3, env("ADMISSION_CONTACT_TARGET_MS", 500), budget / 2, initial_limit=5,
+                                 max_limit=max_limit, max_queue=20),
+        }, total)
+
+    async def acquire(self, route_class: str) -> Optional[float]:
+        """Take a slot; returns None when admitted or a Retry-After in seconds when shed"""
+        limit = self.limits[route_class]
+        stats = self.stats[route_class]
+        queued = sum(1 for w in self._waiters if w.route_class == route_class)
+        # Waiters left after _wake() are blocked by their own class, so only same-class FIFO matters here
+        if not queued and self._has_capacity(limit):
+            self._admit(limit)
+            stats.admitted += 1
+            return None
+        if queued >= limit.policy.max_queue:
+            stats.shed_queue_full += 1
+            return self._retry_after(limit)
+
+        waiter = _Waiter(limit.policy.priority, next(self._seq), route_class,
+                         asyncio.get_running_loop().create_future())
+        bisect.insort(self._waiters, waiter)
+        stats.queued += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), limit.policy.queue_budget_ms / 1000)
+        except asyncio.TimeoutError:
+            if not waiter.future.done():
+                self._waiters.remove(waiter)
+                stats.shed_timeout += 1
+                return self._retry_after(limit)
+        except asyncio.CancelledError:
+            if waiter.future.done():
+                # The slot was handed over just as the client went away: pass it on
+                self.release(route_class, 0.0, False, record=False)
+            else:
+                self._waiters.remove(waiter)
+            raise
+        # _wake() already counted the slot against this class
+        stats.admitted += 1
+        return None
+
+    def release(self, route_class: str, latency_ms: float, overloaded: bool, record: bool = True):
+        limit = self.limits[route_class]
+        limit.in_flight -= 1
+        self.total.in_flight -= 1
+        if record:
+            limit.record(latency_ms, overloaded)
+            self.total.record(latency_ms, overloaded)
+        self._wake()
+
+    def _has_capacity(self, limit: AdaptiveLimit) -> bool:
+        return limit.has_capacity() and self.total.has_capacity()
+
+    def _admit(self, limit: AdaptiveLimit):
+        limit.in_flight += 1
+        self.total.in_flight += 1
+
+    def _wake(self):
+        """Hand free slots to waiters in priority order"""
+        for waiter in list(self._waiters):
+            if not self.total.has_capacity():
+                break
+            limit = self.limits[waiter.route_class]
+            if not limit.has_capacity():
+                continue
+            self._waiters.remove(waiter)
+            self._admit(limit)
+            waiter.future.set_result(None)
+
+    def _retry_after(self, limit: AdaptiveLimit) -> float:
+        return max(1.0, limit.policy.queue_budget_ms / 1000)
+
+    def snapshot(self) -> Dict[str, dict]:
+        classes = {
+            name: {
+                "limit": round(limit.limit, 2),
+                "in_flight": limit.in_flight,
+                "waiting": sum(1 for w in self._waiters if w.route_class == name),
+                **vars(self.stats[name]),
+            }
+            for name, limit in self.limits.items()
+        }
+        return {
+            "limit": round(self.total.limit, 2),
+            "in_flight": self.total.in_flight,
+            "waiting": len(self._waiters),
+            "classes": classes,
+        }
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    """Route class for a request, or None if it bypasses admission control"""
+    if path.startswith(TENANT_PREFIX):
+        path = "/" + path[len(TENANT_PREFIX):].partition("/")[2]
+    if method == "OPTIONS" or not path.startswith("/api/") or path.startswith(EXEMPT_PATHS):
+        return None
+    if method == "POST" and path.rstrip("/") == "/api/contact":
+        return CONTACT
+    if method not in ("GET", "HEAD") or path.startswith(ADMIN_READ_PATHS):
+        return ADMIN
+    if path.startswith(CACHED_PATHS) or path.rstrip("/") == "/api/portfolio":
+        return PUBLIC_CACHED
+    return PUBLIC
+
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware: admit, queue by priority, or shed with 503"""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        route_class = classify(scope["method"], scope["path"])
+        if route_class is None:
+            return await self.app(scope, receive, send)
+
+        retry_after = await self.controller.acquire(route_class)
+        if retry_after is not None:
+            return await send_json(
+                send, 503, {"detail": "Server is busy, please retry"},
+                [(b"retry-after", str(int(retry_after + 0.999)).encode())],
+            )
+
+        status: List[int] = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # 503s from the circuit breaker and 5xx in general mean the backend is struggling
+            self.controller.release(
+                route_class, (time.monotonic() - started) * 1000, status[0] >= 500
+            )
@@ -0,0 +1,242 @@
+"""Declarative CRUD engine for the ordered portfolio collections.
+
+Each resource registers its models, collection, sort key and performance
+policy once; the engine generates list/create/update/delete routes with
+projection, stale-while-revalidate caching, per-query deadlines, index
+creation and page-size caps built in.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type
+
+from fastapi import APIRouter, Header, HTTPException, Query, Response
+from pydantic import BaseModel
+from pymongo import ASCENDING
+
+from services.changelog import CREATE, DELETE, UPDATE, changed_fields
+from services.fields import FIELDS_QUERY, encode, json_response, projection, select_fields
+from repositories.base import Repository
+from services.export import etag_matches
+from services.ids import LEGACY_ID_INDEXES, IndexSpec, from_document, id_filter, to_document
+from services.resilience import (
+    STORAGE_ERRORS, BreakerOpenError, QueryGuard, StaleWhileRevalidateCache, mark_stale, unavailable
+)
+from services.tenancy import get_tenant
+
+# (tenant, collection, op, document id, changed fields)
+ChangeListener = Callable[[str, str, str, str, Dict[str, Any]], Awaitable[None]]
+VERSION_HEADER = "X-Content-Version"
+
+
+@dataclass
+class ResourcePolicy:
+    cache_ttl: float = 30.0  # seconds a list stays fresh before background revalidation
+    projection: Optional[Dict[str, int]] = None
+    indexes: List[IndexSpec] = field(default_factory=lambda: [
+        ([("tenant", ASCENDING), ("order", ASCENDING)], {}),
+        *LEGACY_ID_INDEXES,
+    ])
+    max_page_size: int = 1000
+
+
+@dataclass
+class Resource:
+    name: str  # URL segment, e.g. "skills"
+    collection: str
+    create_model: Type[BaseModel]
+    model: Type[BaseModel]
+    label: str  # used in messages, e.g. "Skill category"
+    sort: List[Tuple[str, int]] = field(default_factory=lambda: [("order", ASCENDING)])
+    policy: ResourcePolicy = field(default_factory=ResourcePolicy)
+
+
+class CrudEngine:
+    def __init__(self, router: APIRouter, db: Repository, guard: QueryGuard, cache: StaleWhileRevalidateCache):
+        self.router = router
+        self.db = db
+        self.guard = guard
+        self.cache = cache
+        self.resources: Dict[str, Resource] = {}
+        self.listeners: List[ChangeListener] = []
+        # Tenant content version (bumped by every write) used for conditional GETs
+        self.content_version: Optional[Callable[[str], Awaitable[int]]] = None
+
+    def register(self, resource: Resource) -> Resource:
+        """Generate the list/create/update/delete routes for a resource"""
+        self.resources[resource.name] = resource
+        path = f"/{resource.name}"
+        item_path = f"{path}/{{item_id}}"
+        self.router.add_api_route(
+            path, self._list_endpoint(resource), methods=["GET"],
+            response_model=List[resource.model], name=f"get_{resource.name}",
+            summary=f"Get all {resource.name} ordered by {resource.sort[0][0]}",
+        )
+        self.router.add_api_route(
+            path, self._create_endpoint(resource), methods=["POST"],
+            response_model=resource.model, name=f"create_{resource.name}",
+            summary=f"Create {resource.label.lower()}",
+        )
+        self.router.add_api_route(
+            item_path, self._update_endpoint(resource), methods=["PUT"],
+            response_model=resource.model, name=f"update_{resource.name}",
+            summary=f"Update {resource.label.lower()}",
+        )
+        self.router.add_api_route(
+            item_path, self._delete_endpoint(resource), methods=["DELETE"],
+            name=f"delete_{resource.name}",
+            summary=f"Delete {resource.label.lower()}",
+        )
+        return resource
+
+    async def ensure_indexes(self):
+        """Create the indexes declared by every registered resource"""
+        for resource in self.resources.values():
+            collection = self.db[resource.collection]
+            for keys, options in resource.policy.indexes:
+                await collection.create_index(keys, **options)
+
+    def on_change(self, listener: ChangeListener):
+        """Call ``listener`` after every successful write"""
+        self.listeners.append(listener)
+
+    async def notify(self, tenant: str, collection: str, op: str, doc_id: str, fields: Dict[str, Any]):
+        """Run every listener, then re-raise the first failure so cache invalidation is never skipped"""
+        failure = None
+        for listener in self.listeners:
+            try:
+                await listener(tenant, collection, op, doc_id, fields)
+            except Exception as exc:
+                failure = failure or exc
+        if failure is not None:
+            raise failure
+
+    async def version_tag(self, tenant: str) -> Optional[Tuple[int, str]]:
+        """``(version, weak ETag)`` for the tenant's content, or None if it can't be read right now"""
+        if self.content_version is None:
+            return None
+        try:
+            # Guarded where it queries storage, so cached lookups don't reset the breaker
+            version = await self.content_version(tenant)
+        except (BreakerOpenError, *STORAGE_ERRORS):
+            return None
+        return version, f'W/"v{version}"'
+
+    @staticmethod
+    def not_modified(tag: Optional[Tuple[int, str]], if_none_match: Optional[str]) -> Optional[Response]:
+        """A 304 when the client's ETag still matches the content version"""
+        if tag and etag_matches(if_none_match, tag[1]):
+            response = Response(status_code=304)
+            CrudEngine.set_version_headers(response, tag)
+            return response
+        return None
+
+    @staticmethod
+    def set_version_headers(response: Response, tag: Optional[Tuple[int, str]]):
+        if tag:
+            response.headers["ETag"] = tag[1]
+            response.headers[VERSION_HEADER] = str(tag[0])
+            response.headers["Cache-Control"] = "no-cache"
+
+    async def _changed(self, resource: Resource, tenant: str, op: str, doc_id: str, fields: Dict[str, Any]):
+        self.cache.invalidate((resource.name, tenant))
+        try:
+            await self.notify(tenant, resource.collection, op, doc_id, fields)
+        except STORAGE_ERRORS as exc:
+            # The write landed but its version bump didn't; don't report success with a stale ETag
+            raise unavailable(exc)
+
+    def _list_endpoint(self, resource: Resource):
+        policy = resource.policy
+
+        async def list_items(
+            response: Response,
+            limit: int = Query(policy.max_page_size, ge=1, le=policy.max_page_size),
+            skip: int = Query(0, ge=0),
+            fields: Optional[str] = FIELDS_QUERY,
+            if_none_match: Optional[str] = Header(None),
+        ):
+            tenant = get_tenant()
+            selected = select_fields(resource.model, fields)
+            # Read the version before the data so a racing write can only make the ETag older
+            tag = await self.version_tag(tenant)
+            not_modified = self.not_modified(tag, if_none_match)
+            if not_modified:
+                return not_modified
+
+            async def fetch():
+                docs = await self.db[resource.collection].find(
+                    {"tenant": tenant}, projection(selected, policy.projection),
+                    sort=resource.sort, skip=skip, limit=limit, max_time_ms=self.guard.deadline_ms,
+                )
+                docs = [from_document(doc) for doc in docs]
+                if selected:
+                    # Sparse responses are cached already encoded
+                    return encode(resource.model, selected, docs)
+                return [resource.model(**doc) for doc in docs]
+
+            items, stale = await self.cache.get(
+                (resource.name, tenant), (limit, skip, selected), fetch, policy.cache_ttl,
+                version=tag[0] if tag else None,
+            )
+            if selected:
+                response = json_response(items)
+            mark_stale(response, stale)
+            if not stale:
+                self.set_version_headers(response, tag)
+            return response if selected else items
+
+        return list_items
+
+    def _create_endpoint(self, resource: Resource):
+        create_model = resource.create_model
+
+        async def create_item(item: create_model):
+            new_item = resource.model(**item.dict())
+            collection = self.db[resource.collection]
+            document = to_document(new_item.dict())
+            await self.guard.run_or_unavailable(lambda: collection.insert_one(document))
+            fields = {k: v for k, v in document.items() if k not in ("_id", "tenant")}
+            await self._changed(resource, new_item.tenant, CREATE, new_item.id, fields)
+            return new_item
+
+        return create_item
+
+    def _update_endpoint(self, resource: Resource):
+        create_model = resource.create_model
+
+        async def update_item(item_id: str, item: create_model):
+            tenant = get_tenant()
+            update_data = item.dict()
+            update_data["updated_at"] = datetime.utcnow()
+            collection = self.db[resource.collection]
+            # The pre-image lets the change log record only the fields that actually changed
+            previous = await self.guard.run_or_unavailable(lambda: collection.find_one_and_update(
+                {"tenant": tenant, **id_filter(item_id)},
+                {"$set": update_data},
+                projection=resource.policy.projection,
+                max_time_ms=self.guard.deadline_ms,
+            ))
+            if previous:
+                previous = from_document(previous)
+                changes = changed_fields(previous, update_data)
+                await self._changed(resource, tenant, UPDATE, previous["id"], changes)
+                return resource.model(**{**previous, **update_data})
+            raise HTTPException(status_code=404, detail=f"{resource.label} not found")
+
+        return update_item
+
+    def _delete_endpoint(self, resource: Resource):
+        async def delete_item(item_id: str):
+            tenant = get_tenant()
+            collection = self.db[resource.collection]
+            deleted = await self.guard.run_or_unavailable(lambda: collection.find_one_and_delete(
+                {"tenant": tenant, **id_filter(item_id)},
+                projection={"_id": 1, "id": 1},
+                max_time_ms=self.guard.deadline_ms,
+            ))
+            if deleted:
+                await self._changed(resource, tenant, DELETE, from_document(deleted)["id"], {})
+                return {"message": f"{resource.label} deleted successfully"}
+            raise HTTPException(status_code=404, detail=f"{resource.label} not found")
+
+        return delete_item
@@ -0,0 +1,322 @@
+"""Résumé exports (JSON Resume, Markdown, vCard, print-ready HTML).
+
+Rendered artifacts are memoized per tenant and format, keyed by the tenant's
+change-log sequence number, so any write produces a new version and every
+repeated download in between is a dictionary lookup. The version itself is
+cached for a few seconds (and bumped locally on writes) so serving an
+artifact does not need a database round trip either. Concurrent misses for
+the same version or artifact share a single load.
+"""
+import html
+import json
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+
+from services.resilience import QueryGuard, SingleFlight
+
+Snapshot = Dict[str, List[Dict[str, Any]]]
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class Artifact:
+    version: int
+    body: bytes
+    etag: str
+
+
+def _first(snapshot: Snapshot, collection: str) -> Dict[str, Any]:
+    docs = snapshot.get(collection) or []
+    return docs[0] if docs else {}
+
+
+def _profile_url(value: str) -> str:
+    if not value:
+        return value
+    return value if value.startswith(("http://", "https://")) else f"https://{value}"
+
+
+def _fluency(level: int) -> str:
+    if level >= 95:
+        return "Native or bilingual proficiency"
+    if level >= 80:
+        return "Full professional proficiency"
+    if level >= 60:
+        return "Professional working proficiency"
+    return "Elementary proficiency"
+
+
+def render_json_resume(snapshot: Snapshot) -> bytes:
+    """Render the portfolio as a JSON Resume (https://jsonresume.org/schema) document"""
+    info = _first(snapshot, "personal_info")
+    resume = {
+        "basics": {
+            "name": info.get("name"),
+            "label": info.get("role"),
+            "image": info.get("avatar"),
+            "email": info.get("email"),
+            "phone": info.get("phone"),
+            "summary": info.get("about_summary"),
+            "location": {"address": info.get("location")},
+            "profiles": (
+                [{"network": "LinkedIn", "url": _profile_url(info["linkedin"])}]
+                if info.get("linkedin") else []
+            ),
+        },
+        "work": [
+            {
+                "name": exp.get("company"),
+                "position": exp.get("title"),
+                "startDate": exp.get("start_date"),
+                "endDate": exp.get("end_date"),
+                "highlights": exp.get("highlights", []),
+            }
+            for exp in snapshot.get("experience", [])
+        ],
+        "education": [
+            {
+                "institution": edu.get("institution"),
+                "studyType": edu.get("degree"),
+                "endDate": edu.get("year"),
+                "summary": edu.get("description"),
+            }
+            for edu in snapshot.get("education", [])
+        ],
+        "skills": [
+            {"name": skill.get("category"), "keywords": skill.get("items", [])}
+            for skill in snapshot.get("skills", [])
+        ],
+        "languages": [
+            {"language": lang.get("name"), "fluency": _fluency(lang.get("level", 0))}
+            for lang in snapshot.get("languages", [])
+        ],
+    }
+    return json.dumps(resume, indent=2, ensure_ascii=False).encode("utf-8")
+
+
+def render_markdown(snapshot: Snapshot) -> bytes:
+    """Render the portfolio as a Markdown résumé"""
+    info = _first(snapshot, "personal_info")
+    lines = [f"# {info.get('name', '')}", ""]
+    if info.get("role"):
+        lines += [f"**{info['role']}**" + (f" — {info['sub_role']}" if info.get("sub_role") else ""), ""]
+    contact = [info.get(key) for key in ("location", "email", "phone", "linkedin") if info.get(key)]
+    if contact:
+        lines += [" · ".join(contact), ""]
+    if info.get("about_summary"):
+        lines += ["## About", "", info["about_summary"], ""]
+
+    if snapshot.get("experience"):
+        lines += ["## Experience", ""]
+        for exp in snapshot["experience"]:
+            lines += [f"### {exp.get('title')} — {exp.get('company')}", f"*{exp.get('duration', '')}*", ""]
+            lines += [f"- {highlight}" for highlight in exp.get("highlights", [])]
+            lines.append("")
+    if snapshot.get("skills"):
+        lines += ["## Skills", ""]
+        lines += [f"- **{s.get('category')}:** {', '.join(s.get('items', []))}" for s in snapshot["skills"]]
+        lines.append("")
+    if snapshot.get("education"):
+        lines += ["## Education", ""]
+        for edu in snapshot["education"]:
+            lines += [f"### {edu.get('degree')}", f"{edu.get('institution')} · {edu.get('year')}", ""]
+            if edu.get("description"):
+                lines += [edu["description"], ""]
+    if snapshot.get("languages"):
+        lines += ["## Languages", ""]
+        lines += [f"- {lang.get('name')} ({lang.get('level')}%)" for lang in snapshot["languages"]]
+        lines.append("")
+    return "\n".join(lines).encode("utf-8")
+
+
+def _vcard_escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\").replace(",", "\\,").replace(";", "\\;").replace("\n", "\\n")
+    )
+
+
+def _vcard_fold(line: str) -> str:
+    """Fold content lines at 75 octets as RFC 6350 requires"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    parts, current = [], b""
+    for char in line:
+        piece = char.encode("utf-8")
+        if len(current) + len(piece) > (75 if not parts else 74):
+            parts.append(current.decode("utf-8"))
+            current = b""
+        current += piece
+    parts.append(current.decode("utf-8"))
+    return "\r\n ".join(parts)
+
+
+def render_vcard(snapshot: Snapshot) -> bytes:
+    """Render PersonalInfo as a vCard 4.0 contact"""
+    info = _first(snapshot, "personal_info")
+    name = info.get("name", "")
+    given, _, family = name.rpartition(" ") if " " in name else ("", "", name)
+    lines = [
+        "BEGIN:VCARD",
+        "VERSION:4.0",
+        f"FN:{_vcard_escape(name)}",
+        f"N:{_vcard_escape(family)};{_vcard_escape(given)};;;",
+    ]
+    if info.get("role"):
+        lines.append(f"TITLE:{_vcard_escape(info['role'])}")
+    if info.get("email"):
+        lines.append(f"EMAIL;TYPE=work:{_vcard_escape(info['email'])}")
+    if info.get("phone"):
+        lines.append(f"TEL;TYPE=cell;VALUE=uri:tel:{info['phone']}")
+    if info.get("location"):
+        # Quoted parameter values take no backslash escaping, only no embedded quotes
+        label = info["location"].replace('"', "'").replace("\n", " ")
+        lines.append(f'ADR;LABEL="{label}":;;;;;;')
+    if info.get("linkedin"):
+        lines.append(f"URL;TYPE=linkedin:{_profile_url(info['linkedin'])}")
+    if info.get("avatar"):
+        lines.append(f"PHOTO:{info['avatar']}")
+    if info.get("about_summary"):
+        lines.append(f"NOTE:{_vcard_escape(info['about_summary'])}")
+    lines.append("END:VCARD")
+    return ("\r\n".join(_vcard_fold(line) for line in lines) + "\r\n").encode("utf-8")
+
+
+HTML_STYLE = """
+body{font-family:Georgia,'Times New Roman',serif;max-width:800px;margin:2rem auto;color:#1f2937;line-height:1.45}
+h1{margin:0;font-size:2rem}h2{border-bottom:1px solid #d1d5db;padding-bottom:.2rem;margin-top:1.6rem;font-size:1.2rem}
+h3{margin:.8rem 0 .1rem;font-size:1rem}.muted{color:#6b7280}.contact{margin:.4rem 0 0}ul{margin:.3rem 0 0 1.1rem;padding:0}
+@page{size:A4;margin:15mm}@media print{body{margin:0;max-width:none}a{color:inherit;text-decoration:none}h2,h3{break-after:avoid}section>div{break-inside:avoid}}
+"""
+
+
+def render_html(snapshot: Snapshot) -> bytes:
+    """Render a self-contained, print-ready HTML CV"""
+    e = html.escape
+    info = _first(snapshot, "personal_info")
+    parts = [
+        "<!DOCTYPE html>",
+        f"<html lang=\"en\"><head><meta charset=\"utf-8\"><title>{e(info.get('name', 'CV'))}</title>",
+        f"<style>{HTML_STYLE}</style></head><body>",
+        f"<header><h1>{e(info.get('name', ''))}</h1>",
+        f"<div class=\"muted\">{e(info.get('role', ''))}</div>",
+        "<p class=\"contact\">" + " · ".join(
+            e(info[key]) for key in ("location", "email", "phone", "linkedin") if info.get(key)
+        ) + "</p></header>",
+    ]
+    if info.get("about_summary"):
+        parts.append(f"<section><h2>About</h2><p>{e(info['about_summary'])}</p></section>")
+    if snapshot.get("experience"):
+        parts.append("<section><h2>Experience</h2>")
+        for exp in snapshot["experience"]:
+            items = "".join(f"<li>{e(h)}</li>" for h in exp.get("highlights", []))
+            parts.append(
+                f"<div><h3>{e(exp.get('title', ''))} — {e(exp.get('company', ''))}</h3>"
+                f"<div class=\"muted\">{e(exp.get('duration', ''))}</div><ul>{items}</ul></div>"
+            )
+        parts.append("</section>")
+    if snapshot.get("skills"):
+        parts.append("<section><h2>Skills</h2><ul>")
+        parts += [
+            f"<li><strong>{e(s.get('category', ''))}:</strong> {e(', '.join(s.get('items', [])))}</li>"
+            for s in snapshot["skills"]
+        ]
+        parts.append("</ul></section>")
+    if snapshot.get("education"):
+        parts.append("<section><h2>Education</h2>")
+        parts += [
+            f"<div><h3>{e(edu.get('degree', ''))}</h3><div class=\"muted\">{e(edu.get('institution', ''))}"
+            f" · {e(edu.get('year', ''))}</div><p>{e(edu.get('description', ''))}</p></div>"
+            for edu in snapshot["education"]
+        ]
+        parts.append("</section>")
+    if snapshot.get("languages"):
+        parts.append("<section><h2>Languages</h2><p>" + " · ".join(
+            f"{e(lang.get('name', ''))} ({lang.get('level')}%)" for lang in snapshot["languages"]
+        ) + "</p></section>")
+    parts.append("</body></html>")
+    return "\n".join(parts).encode("utf-8")
+
+
+# format -> (renderer, media type, file extension)
+FORMATS: Dict[str, Tuple[Callable[[Snapshot], bytes], str, str]] = {
+    "json-resume": (render_json_resume, "application/json", "json"),
+    "markdown": (render_markdown, "text/markdown; charset=utf-8", "md"),
+    "vcard": (render_vcard, "text/vcard; charset=utf-8", "vcf"),
+    "html": (render_html, "text/html; charset=utf-8", "html"),
+}
+
+
+class ExportService:
+    """Memoizes rendered artifacts per (tenant, format) at the tenant's content version"""
+
+    def __init__(
+        self,
+        load_snapshot: Callable[[str], Awaitable[Snapshot]],
+        load_version: Callable[[str], Awaitable[int]],
+        version_ttl: float = 5.0,
+        flights: Optional[SingleFlight] = None,
+        guard: Optional[QueryGuard] = None,
+    ):
+        self.load_snapshot = load_snapshot
+        self.load_version = load_version
+        self.version_ttl = version_ttl
+        self.flights = flights or SingleFlight()
+        self.guard = guard
+        self._versions: Dict[str, Tuple[float, int]] = {}
+        self._generations: Dict[str, int] = {}
+        self._artifacts: Dict[str, Dict[str, Artifact]] = {}
+
+    async def _query(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Only real storage reads go through the guard; cache hits say nothing about its health"""
+        return await self.guard.run(call) if self.guard else await call()
+
+    async def version(self, tenant: str) -> int:
+        cached = self._versions.get(tenant)
+        if cached and time.monotonic() - cached[0] < self.version_ttl:
+            return cached[1]
+        generation = self._generations.get(tenant, 0)
+
+        async def load():
+            version = await self._query(lambda: self.load_version(tenant))
+            # A write during the read makes this version suspect: return it but don't cache it
+            if generation == self._generations.get(tenant, 0):
+                self._versions[tenant] = (time.monotonic(), version)
+            return version
+
+        return await self.flights.do(("content_version", tenant, generation), load)
+
+    async def on_change(self, tenant: str, collection: str, op: str, doc_id: str, fields: Dict[str, Any]):
+        """Change listener: forget the tenant's version so the next request re-reads it"""
+        self._versions.pop(tenant, None)
+        self._artifacts.pop(tenant, None)
+        self._generations[tenant] = self._generations.get(tenant, 0) + 1
+
+    async def render(self, tenant: str, fmt: str) -> Artifact:
+        version = await self.version(tenant)
+        artifact = self._artifacts.get(tenant, {}).get(fmt)
+        if artifact and artifact.version == version:
+            return artifact
+
+        async def build():
+            body = FORMATS[fmt][0](await self._query(lambda: self.load_snapshot(tenant)))
+            artifact = Artifact(version, body, f'"{fmt}-{version}"')
+            self._artifacts.setdefault(tenant, {})[fmt] = artifact
+            return artifact
+
+        return await self.flights.do(("export", tenant, fmt, version), build)
+
+
+def iter_chunks(body: bytes, size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    view = memoryview(body)
+    for start in range(0, len(body), size):
+        yield bytes(view[start:start + size])
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
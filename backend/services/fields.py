@@ -0,0 +1,73 @@
+"""Sparse fieldsets: ``?fields=a,b`` pushed down to MongoDB projections.
+
+The requested fields are validated against the model, turned into a
+projection so unneeded fields are never read off disk, and serialized
+through a narrowed model generated (and memoized) per field combination.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Type
+
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel, TypeAdapter, create_model
+
+FieldSet = Tuple[str, ...]
+
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated list of fields to return, e.g. fields=name,role,avatar",
+)
+
+
+def select_fields(model: Type[BaseModel], fields: Optional[str]) -> Optional[FieldSet]:
+    """Validate ``fields`` against ``model``; None means the full document. ``id`` is always selected"""
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(model.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(sorted(unknown))}; "
+                   f"allowed: {', '.join(model.model_fields)}",
+        )
+    if not requested:
+        return None
+    # Clients need the id to address what they fetched, whatever else they asked for
+    requested |= {"id"} & set(model.model_fields)
+    # Canonical order keeps the cache keys and generated models stable
+    return tuple(name for name in model.model_fields if name in requested)
+
+
+def projection(selected: Optional[FieldSet], default: Optional[Dict[str, int]]) -> Optional[Dict[str, int]]:
+    """Projection for ``selected``; ``_id`` is always returned since it carries the compact id"""
+    if selected is None:
+        return default
+    return {name: 1 for name in selected}
+
+
+@lru_cache(maxsize=256)
+def narrowed_model(model: Type[BaseModel], selected: FieldSet) -> Type[BaseModel]:
+    """Build a model holding only ``selected``; fields missing from a document serialize as null"""
+    definitions = {
+        name: (Optional[model.model_fields[name].annotation], None) for name in selected
+    }
+    return create_model(f"{model.__name__}Fields", **definitions)
+
+
+@lru_cache(maxsize=256)
+def _list_adapter(model: Type[BaseModel], selected: FieldSet) -> TypeAdapter:
+    return TypeAdapter(List[narrowed_model(model, selected)])
+
+
+def encode(model: Type[BaseModel], selected: FieldSet, docs: Iterable[Dict[str, Any]]) -> bytes:
+    """Validate and serialize documents through the narrowed model in one pass"""
+    adapter = _list_adapter(model, selected)
+    return adapter.dump_json(adapter.validate_python(list(docs)))
+
+
+def encode_one(model: Type[BaseModel], selected: FieldSet, doc: Dict[str, Any]) -> bytes:
+    return narrowed_model(model, selected)(**doc).model_dump_json().encode("utf-8")
+
+
+def json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
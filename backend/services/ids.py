@@ -0,0 +1,74 @@
+"""Compact, time-ordered identifiers stored as MongoDB's own ``_id``.
+
+New documents get a 12-byte ObjectId (4-byte timestamp, 5 random bytes,
+3-byte counter) stored in binary form as ``_id`` and exposed to clients as
+its 24-character hex string. That removes the second unique index the UUID
+``id`` field needed and keeps inserts right-leaning in the ``_id`` B-tree.
+Documents written before the switch keep working: their UUID is looked up
+through the ``id`` field until migrated, and through ``legacy_id`` after.
+"""
+import hashlib
+import struct
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING
+
+# (keys, CollectionRepository.create_index options)
+IndexSpec = Tuple[List[Tuple[str, int]], Dict[str, Any]]
+
+# UUIDs from before the switch stay unique where present; new documents don't carry them
+LEGACY_ID_INDEXES: List[IndexSpec] = [
+    ([("tenant", ASCENDING), ("id", ASCENDING)],
+     {"unique": True, "partial_filter": {"id": {"$exists": True}}}),
+    ([("tenant", ASCENDING), ("legacy_id", ASCENDING)],
+     {"unique": True, "partial_filter": {"legacy_id": {"$exists": True}}}),
+]
+
+
+def new_id() -> str:
+    return str(ObjectId())
+
+
+def id_for_legacy(moment: datetime, legacy_id: str) -> ObjectId:
+    """Deterministic ObjectId for a migrated document: ordered by ``moment``, unique per legacy id"""
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    digest = hashlib.sha1(legacy_id.encode("utf-8")).digest()
+    return ObjectId(struct.pack(">I", int(moment.timestamp())) + digest[:8])
+
+
+def is_compact(value: str) -> bool:
+    return ObjectId.is_valid(value) and len(value) == 24
+
+
+def id_filter(value: str) -> Dict[str, Any]:
+    """Query fragment matching a compact id or a legacy UUID"""
+    if is_compact(value):
+        return {"_id": ObjectId(value)}
+    return {"$or": [{"id": value}, {"legacy_id": value}]}
+
+
+def to_document(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Model dict -> MongoDB document, storing compact ids as binary ``_id``"""
+    document = dict(data)
+    value = document.get("id")
+    if isinstance(value, str) and is_compact(value):
+        document["_id"] = ObjectId(document.pop("id"))
+    return document
+
+
+def from_document(document: Dict[str, Any]) -> Dict[str, Any]:
+    """MongoDB document -> model dict, exposing ``_id`` as the hex ``id`` when there is no legacy id"""
+    data = dict(document)
+    object_id = data.pop("_id", None)
+    if "id" not in data and object_id is not None:
+        data["id"] = str(object_id)
+    return data
+
+
+async def ensure_legacy_id_indexes(collection):
+    """Create the legacy id indexes on a repository collection"""
+    for keys, options in LEGACY_ID_INDEXES:
+        await collection.create_index(keys, **options)
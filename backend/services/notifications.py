@@ -0,0 +1,323 @@
+"""Email and webhook notifications for new contact messages, off the request path.
+
+Submitting the contact form only enqueues one job per configured channel in
+the ``notification_jobs`` collection. A pool of async workers claims jobs by
+taking a time-limited lease (so a crashed worker's jobs are picked up again
+once the lease expires), and when several jobs for the same tenant and
+channel are waiting they are sent as one digest. Failed sends are retried
+with exponential backoff and jitter; jobs that exhaust their attempts are
+moved to ``notification_dead_letters`` for inspection and replay.
+"""
+import asyncio
+import json
+import logging
+import os
+import random
+import smtplib
+import urllib.request
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from typing import Any, Dict, List, Optional
+
+from pymongo import ASCENDING
+
+from repositories.base import Repository
+
+logger = logging.getLogger(__name__)
+
+EMAIL = "email"
+WEBHOOK = "webhook"
+PENDING = "pending"
+LEASED = "leased"
+LEASE_FIELDS = ("lease_owner", "lease_token", "lease_expires_at")
+PREVIEW_CHARS = 500
+
+
+@dataclass
+class NotifierConfig:
+    smtp_host: Optional[str] = None
+    smtp_port: int = 25
+    smtp_user: Optional[str] = None
+    smtp_password: Optional[str] = None
+    smtp_starttls: bool = False
+    email_from: str = "portfolio@localhost"
+    email_to: List[str] = field(default_factory=list)
+    webhook_url: Optional[str] = None
+    timeout: float = 10.0
+
+    @classmethod
+    def from_env(cls) -> "NotifierConfig":
+        return cls(
+            smtp_host=os.environ.get("NOTIFY_SMTP_HOST") or None,
+            smtp_port=int(os.environ.get("NOTIFY_SMTP_PORT", 25)),
+            smtp_user=os.environ.get("NOTIFY_SMTP_USER") or None,
+            smtp_password=os.environ.get("NOTIFY_SMTP_PASSWORD") or None,
+            smtp_starttls=os.environ.get("NOTIFY_SMTP_STARTTLS", "false").lower() == "true",
+            email_from=os.environ.get("NOTIFY_EMAIL_FROM", "portfolio@localhost"),
+            email_to=[a.strip() for a in os.environ.get("NOTIFY_EMAIL_TO", "").split(",") if a.strip()],
+            webhook_url=os.environ.get("NOTIFY_WEBHOOK_URL") or None,
+            timeout=float(os.environ.get("NOTIFY_TIMEOUT_SECONDS", 10)),
+        )
+
+    @property
+    def channels(self) -> List[str]:
+        channels = []
+        if self.smtp_host and self.email_to:
+            channels.append(EMAIL)
+        if self.webhook_url:
+            channels.append(WEBHOOK)
+        return channels
+
+
+def _summary(payloads: List[Dict[str, Any]]) -> str:
+    if len(payloads) == 1:
+        p = payloads[0]
+        return f"From: {p['name']} <{p['email']}>\n\n{p['message']}"
+    blocks = [f"{i}. {p['name']} <{p['email']}>\n{p['message']}"
+              for i, p in enumerate(payloads, 1)]
+    return "\n\n".join(blocks)
+
+
+def send_email(config: NotifierConfig, tenant: str, payloads: List[Dict[str, Any]]):
+    """Blocking SMTP send; run in a worker thread"""
+    message = EmailMessage()
+    if len(payloads) == 1:
+        message["Subject"] = f"[{tenant}] New contact message from {payloads[0]['name']}"
+        message["Reply-To"] = payloads[0]["email"]
+    else:
+        message["Subject"] = f"[{tenant}] {len(payloads)} new contact messages"
+    message["From"] = config.email_from
+    message["To"] = ", ".join(config.email_to)
+    message.set_content(_summary(payloads))
+    with smtplib.SMTP(config.smtp_host, config.smtp_port, timeout=config.timeout) as smtp:
+        if config.smtp_starttls:
+            smtp.starttls()
+        if config.smtp_user:
+            smtp.login(config.smtp_user, config.smtp_password or "")
+        smtp.send_message(message)
+
+
+def send_webhook(config: NotifierConfig, tenant: str, payloads: List[Dict[str, Any]]):
+    """Blocking JSON POST; run in a worker thread. Non-2xx responses raise"""
+    body = json.dumps(
+        {"tenant": tenant, "count": len(payloads), "messages": payloads},
+        default=lambda value: value.isoformat(),
+    ).encode("utf-8")
+    request = urllib.request.Request(
+        config.webhook_url, data=body, method="POST",
+        headers={"Content-Type": "application/json", "User-Agent": "portfolio-notifier"},
+    )
+    with urllib.request.urlopen(request, timeout=config.timeout) as response:
+        response.read()
+
+
+SENDERS = {EMAIL: send_email, WEBHOOK: send_webhook}
+
+
+@dataclass
+class DispatcherStats:
+    enqueued: int = 0
+    sent: int = 0
+    digests: int = 0
+    retried: int = 0
+    dead_lettered: int = 0
+
+
+class NotificationDispatcher:
+    def __init__(self, db: Repository, config: NotifierConfig, workers: int = 2,
+                 lease_seconds: float = 60, poll_seconds: float = 5, digest_max: int = 20,
+                 max_attempts: int = 6, backoff_base: float = 5, backoff_max: float = 900):
+        self.db = db
+        self.config = config
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.poll_seconds = poll_seconds
+        self.digest_max = digest_max
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.stats = DispatcherStats()
+        self.owner = uuid.uuid4().hex
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    @classmethod
+    def from_env(cls, db: Repository) -> "NotificationDispatcher":
+        return cls(
+            db, NotifierConfig.from_env(),
+            workers=int(os.environ.get("NOTIFY_WORKERS", 2)),
+            lease_seconds=float(os.environ.get("NOTIFY_LEASE_SECONDS", 60)),
+            poll_seconds=float(os.environ.get("NOTIFY_POLL_SECONDS", 5)),
+            digest_max=int(os.environ.get("NOTIFY_DIGEST_MAX", 20)),
+            max_attempts=int(os.environ.get("NOTIFY_MAX_ATTEMPTS", 6)),
+            backoff_base=float(os.environ.get("NOTIFY_BACKOFF_BASE_SECONDS", 5)),
+            backoff_max=float(os.environ.get("NOTIFY_BACKOFF_MAX_SECONDS", 900)),
+        )
+
+    async def ensure_indexes(self):
+        await self.db.notification_jobs.create_index([("status", ASCENDING), ("available_at", ASCENDING)])
+        await self.db.notification_jobs.create_index([("lease_expires_at", ASCENDING)])
+
+    async def enqueue(self, tenant: str, message: Dict[str, Any]):
+        """Queue one job per configured channel; failures are logged so they never fail the submit"""
+        if not self.config.channels:
+            return
+        try:
+            now = datetime.utcnow()
+            payload = {
+                "id": message["id"],
+                "name": message["name"],
+                "email": message["email"],
+                "message": message["message"][:PREVIEW_CHARS],
+                "created_at": message["created_at"],
+            }
+            jobs = [{
+                "tenant": tenant,
+                "channel": channel,
+                "payload": payload,
+                "status": PENDING,
+                "attempts": 0,
+                "available_at": now,
+                "created_at": now,
+            } for channel in self.config.channels]
+            await self.db.notification_jobs.insert_many(jobs)
+            self.stats.enqueued += len(jobs)
+            self._wakeup.set()
+        except Exception:
+            logger.exception(f"Failed to enqueue notifications for contact message {message.get('id')}")
+
+    def start(self):
+        for index in range(self.workers if self.config.channels else 0):
+            self._tasks.append(asyncio.create_task(self._worker(index)))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def _claim(self, extra: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Lease the oldest due job, or one whose previous lease ran out"""
+        now = datetime.utcnow()
+        return await self.db.notification_jobs.find_one_and_update(
+            {
+                "$or": [
+                    {"status": PENDING, "available_at": {"$lte": now}},
+                    {"status": LEASED, "lease_expires_at": {"$lte": now}},
+                ],
+                **(extra or {}),
+            },
+            {"$set": {
+                "status": LEASED,
+                "lease_owner": self.owner,
+                # Fresh per claim: identifies this lease even if the same worker re-leases the job
+                "lease_token": uuid.uuid4().hex,
+                "lease_expires_at": now + timedelta(seconds=self.lease_seconds),
+            }},
+            return_after=True,
+            sort=[("available_at", ASCENDING)],
+        )
+
+    @staticmethod
+    def _leased(job: Dict[str, Any]) -> Dict[str, Any]:
+        """Matches ``job`` only while the lease it was claimed under is still current"""
+        return {"_id": job["_id"], "lease_owner": job["lease_owner"], "lease_token": job["lease_token"]}
+
+    async def _claim_batch(self) -> List[Dict[str, Any]]:
+        """Claim a job plus any others waiting for the same tenant and channel, for a digest"""
+        first = await self._claim()
+        if first is None:
+            return []
+        batch = [first]
+        scope = {"tenant": first["tenant"], "channel": first["channel"]}
+        while len(batch) < self.digest_max:
+            job = await self._claim(scope)
+            if job is None:
+                break
+            batch.append(job)
+        return batch
+
+    async def _worker(self, index: int):
+        while True:
+            try:
+                batch = await self._claim_batch()
+            except Exception:
+                logger.exception("Notification claim failed")
+                batch = []
+            if not batch:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._deliver(batch)
+
+    async def _deliver(self, batch: List[Dict[str, Any]]):
+        tenant, channel = batch[0]["tenant"], batch[0]["channel"]
+        sender = SENDERS[channel]
+        try:
+            await asyncio.to_thread(sender, self.config, tenant, [job["payload"] for job in batch])
+        except Exception as exc:
+            logger.warning(f"📭 {channel} notification for {tenant} failed: {exc!r}")
+            for job in batch:
+                await self._fail(job, repr(exc))
+            return
+        # A job whose lease expired mid-send belongs to its new holder, which will send it again
+        await self.db.notification_jobs.delete_many({"$or": [self._leased(job) for job in batch]})
+        self.stats.sent += len(batch)
+        if len(batch) > 1:
+            self.stats.digests += 1
+        logger.info(f"📬 Sent {channel} notification for {tenant} ({len(batch)} messages)")
+
+    def backoff(self, attempts: int) -> float:
+        """Exponential backoff with full jitter"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempts - 1)))
+
+    async def _fail(self, job: Dict[str, Any], error: str):
+        attempts = job["attempts"] + 1
+        if attempts >= self.max_attempts:
+            if not await self.db.notification_jobs.delete_many(self._leased(job)):
+                logger.warning(f"Lease on notification {job['_id']} lost before dead-lettering it")
+                return
+            dead = {k: v for k, v in job.items() if k not in ("status", *LEASE_FIELDS)}
+            dead.update(attempts=attempts, last_error=error, failed_at=datetime.utcnow())
+            await self.db.notification_dead_letters.insert_one(dead)
+            self.stats.dead_lettered += 1
+            return
+        await self.db.notification_jobs.update_one(
+            self._leased(job),
+            {
+                "$set": {
+                    "status": PENDING,
+                    "attempts": attempts,
+                    "last_error": error,
+                    "available_at": datetime.utcnow() + timedelta(seconds=self.backoff(attempts)),
+                },
+                "$unset": {name: "" for name in LEASE_FIELDS},
+            },
+        )
+        self.stats.retried += 1
+
+    async def replay_dead_letters(self, tenant: Optional[str] = None) -> int:
+        """Move dead-lettered jobs back onto the queue with a fresh attempt budget"""
+        query = {"tenant": tenant} if tenant else {}
+        dead = await self.db.notification_dead_letters.find(query)
+        if not dead:
+            return 0
+        now = datetime.utcnow()
+        jobs = [{
+            "_id": job["_id"],
+            "tenant": job["tenant"],
+            "channel": job["channel"],
+            "payload": job["payload"],
+            "status": PENDING,
+            "attempts": 0,
+            "available_at": now,
+            "created_at": job["created_at"],
+        } for job in dead]
+        replayed = await self.db.notification_jobs.insert_many(jobs, ordered=False)
+        await self.db.notification_dead_letters.delete_many({"_id": {"$in": [job["_id"] for job in dead]}})
+        return replayed
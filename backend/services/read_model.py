@@ -0,0 +1,112 @@
+"""Denormalized ``portfolio_view`` read model, one document per tenant.
+
+The public page needs every section at once, so instead of assembling five
+collections per request the view stores them pre-sorted in a single
+document keyed by tenant. Every portfolio write rebuilds it through the
+change listener; rebuilds are idempotent (the whole document is recomputed
+from the source collections) and versioned with the tenant's change-log
+sequence, so a slower rebuild can never overwrite a newer one. Concurrent
+writes to one tenant coalesce into a single follow-up rebuild.
+"""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from pymongo import ASCENDING
+
+from repositories.base import DuplicateKeyError, Repository
+
+logger = logging.getLogger(__name__)
+
+Snapshot = Dict[str, List[Dict[str, Any]]]
+VIEW_SECTIONS = ["personal_info", "skills", "experience", "education", "languages"]
+
+
+def assemble(tenant: str, version: int, snapshot: Snapshot) -> Dict[str, Any]:
+    """Snapshot of the source collections -> view document"""
+    document = {"tenant": tenant, "version": version, "built_at": datetime.utcnow()}
+    for section in VIEW_SECTIONS:
+        rows = snapshot.get(section, [])
+        document[section] = (rows[0] if rows else None) if section == "personal_info" else rows
+    return document
+
+
+class ReadModel:
+    def __init__(
+        self,
+        db: Repository,
+        load_snapshot: Callable[[str], Awaitable[Snapshot]],
+        load_version: Callable[[str], Awaitable[int]],
+    ):
+        self.db = db
+        self.load_snapshot = load_snapshot
+        self.load_version = load_version
+        self._running: Dict[str, asyncio.Future] = {}
+        self._dirty: Set[str] = set()
+
+    async def ensure_indexes(self):
+        await self.db.portfolio_view.create_index([("tenant", ASCENDING)], unique=True)
+
+    async def get(self, tenant: str, max_time_ms: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        return await self.db.portfolio_view.find_one({"tenant": tenant}, {"_id": 0}, max_time_ms=max_time_ms)
+
+    async def rebuild(self, tenant: str) -> Dict[str, Any]:
+        """Recompute the tenant's view from the source collections and store it unless a newer one exists"""
+        # Version first: a write racing the snapshot leaves the view looking older, never newer
+        version = await self.load_version(tenant)
+        document = assemble(tenant, version, await self.load_snapshot(tenant))
+        content = {k: v for k, v in document.items() if k != "tenant"}
+        try:
+            await self.db.portfolio_view.find_one_and_update(
+                {"tenant": tenant, "version": {"$lte": version}}, {"$set": content}, upsert=True
+            )
+        except DuplicateKeyError:
+            # The upsert lost to a view built at a newer version
+            pass
+        return document
+
+    async def refresh(self, tenant: str):
+        """Rebuild, folding writes that arrive mid-rebuild into one more pass"""
+        running = self._running.get(tenant)
+        if running is not None:
+            self._dirty.add(tenant)
+            await asyncio.shield(running)
+            return
+        task = asyncio.ensure_future(self._rebuild_until_clean(tenant))
+        self._running[tenant] = task
+        await asyncio.shield(task)
+
+    async def _rebuild_until_clean(self, tenant: str):
+        try:
+            while True:
+                self._dirty.discard(tenant)
+                await self.rebuild(tenant)
+                if tenant not in self._dirty:
+                    break
+        finally:
+            self._running.pop(tenant, None)
+
+    async def on_change(self, tenant: str, collection: str, op: str, doc_id: str, fields: Dict[str, Any]):
+        """Change listener; failures are logged so they never fail the write itself"""
+        if collection not in VIEW_SECTIONS:
+            return
+        try:
+            await self.refresh(tenant)
+        except Exception:
+            logger.exception(f"Failed to rebuild the portfolio view for {tenant}")
+
+    async def check(self, tenant: str) -> List[str]:
+        """Differences between the stored view and the source collections; empty when consistent"""
+        stored = await self.get(tenant)
+        if stored is None:
+            return ["view is missing"]
+        version = await self.load_version(tenant)
+        expected = assemble(tenant, version, await self.load_snapshot(tenant))
+        problems = []
+        if stored["version"] != version:
+            problems.append(f"version {stored['version']} != change log {version}")
+        for section in VIEW_SECTIONS:
+            if stored.get(section) != expected[section]:
+                problems.append(f"{section} differs from the source collection")
+        return problems
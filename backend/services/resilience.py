@@ -0,0 +1,323 @@
+"""Deadlines, a circuit breaker and stale-while-revalidate serving for reads.
+
+Every query runs under a deadline budget (``maxTimeMS`` on the server plus
+an ``asyncio`` timeout around the whole round trip). Consecutive failures or
+slow responses trip the breaker, after which reads are answered from the
+last-known-good payload with a stale marker instead of hanging on MongoDB.
+Concurrent identical reads are coalesced into one in-flight query, so a
+traffic spike costs one round trip per distinct query rather than per visitor.
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from pymongo.errors import PyMongoError
+
+from repositories.base import RepositoryError
+
+logger = logging.getLogger(__name__)
+
+STALE_HEADER = "X-Stale"
+STORAGE_ERRORS = (asyncio.TimeoutError, PyMongoError, RepositoryError)
+
+
+class BreakerOpenError(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__("MongoDB circuit breaker is open")
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Trips after consecutive failures or slow calls; probes once when the cooldown ends"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, slow_call_ms: float = 1000, reset_timeout: float = 15.0):
+        self.failure_threshold = failure_threshold
+        self.slow_call_ms = slow_call_ms
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.trips = 0
+        self._probe_in_flight = False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def allow_request(self) -> bool:
+        if self.state == self.OPEN:
+            if self.retry_after() > 0:
+                return False
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def release_probe(self):
+        self._probe_in_flight = False
+
+    def record_success(self, elapsed_ms: float):
+        if elapsed_ms >= self.slow_call_ms:
+            self.record_failure()
+            return
+        self._probe_in_flight = False
+        self.consecutive_failures = 0
+        if self.state != self.CLOSED:
+            logger.info("🟢 MongoDB circuit breaker closed")
+        self.state = self.CLOSED
+
+    def record_failure(self):
+        self._probe_in_flight = False
+        self.consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.trips += 1
+                logger.warning(f"🔴 MongoDB circuit breaker opened after {self.consecutive_failures} failures")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+class QueryGuard:
+    """Runs database calls under a deadline and feeds the outcome to the breaker"""
+
+    def __init__(self, breaker: CircuitBreaker, deadline_ms: int = 2000):
+        self.breaker = breaker
+        self.deadline_ms = deadline_ms
+
+    @classmethod
+    def from_env(cls) -> "QueryGuard":
+        breaker = CircuitBreaker(
+            failure_threshold=int(os.environ.get("BREAKER_FAILURE_THRESHOLD", 5)),
+            slow_call_ms=float(os.environ.get("BREAKER_SLOW_CALL_MS", 1000)),
+            reset_timeout=float(os.environ.get("BREAKER_RESET_SECONDS", 15)),
+        )
+        return cls(breaker, deadline_ms=int(os.environ.get("QUERY_DEADLINE_MS", 2000)))
+
+    async def run(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Await ``call()`` within the deadline; raises BreakerOpenError when tripped"""
+        if not self.breaker.allow_request():
+            raise BreakerOpenError(self.breaker.retry_after())
+        started = time.monotonic()
+        try:
+            result = await asyncio.wait_for(call(), timeout=self.deadline_ms / 1000)
+        except STORAGE_ERRORS:
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # Cancellations and caller bugs say nothing about MongoDB's health
+            self.breaker.release_probe()
+            raise
+        self.breaker.record_success((time.monotonic() - started) * 1000)
+        return result
+
+    async def run_or_unavailable(self, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Like ``run`` but answers a tripped breaker or blown deadline with a fast 503"""
+        try:
+            return await self.run(call)
+        except (BreakerOpenError, *STORAGE_ERRORS) as exc:
+            raise unavailable(exc)
+
+
+@dataclass
+class SingleFlightStats:
+    flights: int = 0  # queries actually issued
+    coalesced: int = 0  # callers that shared another caller's query
+    timeouts: int = 0
+    failures: int = 0
+
+
+class SingleFlight:
+    """Shares one in-flight call between concurrent callers asking for the same key
+
+    The call runs in its own task and every caller awaits it through
+    ``asyncio.shield``, so a caller that is cancelled or gives up never
+    cancels the query for the others. Results and errors are not kept once
+    the flight lands: the next caller after that starts a new one.
+    """
+
+    def __init__(self, timeout: float = 5.0):
+        self.timeout = timeout
+        self.stats = SingleFlightStats()
+        self._flights: Dict[Hashable, asyncio.Task] = {}
+
+    @classmethod
+    def from_env(cls) -> "SingleFlight":
+        return cls(timeout=float(os.environ.get("SINGLEFLIGHT_TIMEOUT_MS", 5000)) / 1000)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]], timeout: Optional[float] = None) -> Any:
+        """Await ``call()``, or the identical call already in flight for ``key``
+
+        ``timeout`` (default: the instance's) bounds the shared call itself, so a
+        hung query can't hold every caller that joins it.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            self.stats.flights += 1
+            flight = asyncio.ensure_future(self._run(call, timeout or self.timeout))
+            self._flights[key] = flight
+            flight.add_done_callback(lambda task: self._landed(key, task))
+        else:
+            self.stats.coalesced += 1
+        return await asyncio.shield(flight)
+
+    def snapshot(self) -> Dict[str, int]:
+        return {**vars(self.stats), "in_flight": len(self._flights)}
+
+    async def _run(self, call: Callable[[], Awaitable[Any]], timeout: float) -> Any:
+        try:
+            return await asyncio.wait_for(call(), timeout=timeout)
+        except asyncio.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        except asyncio.CancelledError:
+            raise
+        except BaseException:
+            self.stats.failures += 1
+            raise
+
+    def _landed(self, key: Hashable, task: asyncio.Task):
+        if self._flights.get(key) is task:
+            del self._flights[key]
+        # Retrieve the outcome so flights whose callers all gave up don't log "never retrieved"
+        if not task.cancelled():
+            task.exception()
+
+
+def unavailable(exc: Exception) -> HTTPException:
+    """Translate a guard failure into a fast 503"""
+    retry_after = exc.retry_after if isinstance(exc, BreakerOpenError) else 5
+    return HTTPException(
+        status_code=503,
+        detail="Portfolio data is temporarily unavailable",
+        headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+    )
+
+
+def mark_stale(response: Response, stale: bool):
+    if stale:
+        response.headers[STALE_HEADER] = "true"
+        response.headers["Warning"] = '110 - "Response is Stale"'
+
+
+@dataclass
+class _Entry:
+    value: Any
+    fetched_at: float
+    version: int = 0  # content version read before the fetch; the value is at least this new
+    valid: bool = True
+
+
+class StaleWhileRevalidateCache:
+    """Keeps last-known-good payloads and refreshes expired ones in the background
+
+    Entries live in partitions (one per section and tenant) so a write only
+    touches its own partition, however many tenants share the process. Each
+    partition is an LRU of at most ``max_entries`` keys (query parameters are
+    client-controlled), and entries past ``max_stale_age`` are dropped.
+    Callers may pass the content version they read before calling ``get``:
+    an entry fetched under an older version is refetched like an invalidated
+    one, so a write handled by another worker process can't leave this one
+    serving pre-write data under the new version's ETag.
+    """
+
+    def __init__(
+        self, guard: QueryGuard, max_stale_age: float = 86400.0, flights: Optional[SingleFlight] = None,
+        max_entries: int = 64,
+    ):
+        self.guard = guard
+        self.max_stale_age = max_stale_age
+        self.max_entries = max_entries
+        self.flights = flights or SingleFlight()
+        self._partitions: Dict[Hashable, "OrderedDict[Hashable, _Entry]"] = {}
+        self._generations: Dict[Hashable, int] = {}
+        self._refreshing: Dict[Tuple[Hashable, Hashable], asyncio.Task] = {}
+
+    async def get(
+        self, partition: Hashable, key: Hashable, fetch: Callable[[], Awaitable[Any]], ttl: float,
+        version: Optional[int] = None,
+    ) -> Tuple[Any, bool]:
+        """Return ``(value, stale)`` for ``key`` within ``partition``; a fresh value is at least ``version``"""
+        entries = self._partitions.get(partition)
+        entry = entries.get(key) if entries else None
+        now = time.monotonic()
+        if entry and now - entry.fetched_at > self.max_stale_age:
+            del entries[key]
+            entry = None
+        elif entry:
+            entries.move_to_end(key)
+        current = entry is not None and entry.valid and (version is None or entry.version >= version)
+        if current and now - entry.fetched_at < ttl:
+            return entry.value, False
+        if current:
+            # Expired but not invalidated by a write: serve it and refresh behind the scenes
+            self._schedule_refresh(partition, key, fetch, version)
+            return entry.value, True
+        try:
+            return await self._fetch(partition, key, fetch, version), False
+        except (BreakerOpenError, *STORAGE_ERRORS) as exc:
+            if entry is None:
+                raise unavailable(exc)
+            return entry.value, True
+
+    def invalidate(self, partition: Hashable):
+        """Force a synchronous refetch on next read while keeping the old payloads as a fallback"""
+        for entry in self._partitions.get(partition, {}).values():
+            entry.valid = False
+        self._generations[partition] = self._generations.get(partition, 0) + 1
+
+    async def _fetch(
+        self, partition: Hashable, key: Hashable, fetch: Callable[[], Awaitable[Any]], version: Optional[int]
+    ) -> Any:
+        generation = self._generations.get(partition, 0)
+
+        async def load():
+            value = await self.guard.run(fetch)
+            # Skip storing if a write landed mid-flight so an older read can't undo the invalidation,
+            # or if a read made under a newer version already landed
+            entries = self._partitions.setdefault(partition, OrderedDict())
+            previous = entries.get(key)
+            if generation == self._generations.get(partition, 0) and (
+                previous is None or not previous.valid or previous.version <= (version or 0)
+            ):
+                entries[key] = _Entry(value, time.monotonic(), version or 0)
+                entries.move_to_end(key)
+                self._evict(entries)
+            return value
+
+        # Generation and version are part of the flight key: a read that starts after a
+        # write never joins a query issued before it
+        return await self.flights.do((partition, key, generation, version), load)
+
+    def _evict(self, entries: "OrderedDict[Hashable, _Entry]"):
+        """Drop entries past the stale limit, then the least recently used beyond the cap"""
+        cutoff = time.monotonic() - self.max_stale_age
+        for key in [key for key, entry in entries.items() if entry.fetched_at < cutoff]:
+            del entries[key]
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+
+    def _schedule_refresh(
+        self, partition: Hashable, key: Hashable, fetch: Callable[[], Awaitable[Any]], version: Optional[int]
+    ):
+        task_key = (partition, key)
+        if task_key in self._refreshing:
+            return
+        task = asyncio.create_task(self._fetch(partition, key, fetch, version))
+        self._refreshing[task_key] = task
+
+        def _done(t: asyncio.Task):
+            self._refreshing.pop(task_key, None)
+            if not t.cancelled() and t.exception() is not None:
+                logger.warning(f"Background refresh of {task_key!r} failed: {t.exception()!r}")
+
+        task.add_done_callback(_done)
@@ -0,0 +1,276 @@
+"""Retention, TTL expiry and compressed archival for contact messages.
+
+Spam is expired by MongoDB's TTL monitor. Older read/replied messages are
+streamed into gzip-compressed NDJSON files partitioned by day
+(``<archive_dir>/contact_messages/YYYY/MM/YYYY-MM-DD.ndjson.gz``) and then
+handed to the same TTL index for deletion. All work runs in bounded batches
+with a pause between them so the event loop and the database never see a
+large write spike. With several worker processes, only the holder of the
+``retention`` lease runs the background loop.
+"""
+import asyncio
+import gzip
+import json
+import logging
+import os
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from pydantic import BaseModel
+from pymongo import ASCENDING, UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+from services.ids import from_document
+from services.tenancy import DEFAULT_TENANT
+
+logger = logging.getLogger(__name__)
+
+COLLECTION = "contact_messages"
+LEASE_ID = "retention"
+ARCHIVE_STATUSES = ["read", "replied"]
+DEFAULT_ARCHIVE_DIR = Path(__file__).parent.parent / "archive"
+
+
+class RetentionPolicy(BaseModel):
+    spam_ttl_days: int = 7
+    archive_after_days: int = 90
+    archive_unread: bool = False
+    archive_dir: str = str(DEFAULT_ARCHIVE_DIR)
+    batch_size: int = 500
+    batch_pause_ms: int = 50
+    interval_seconds: int = 3600  # 0 disables the background loop
+
+    @classmethod
+    def from_env(cls) -> "RetentionPolicy":
+        """Build the policy from RETENTION_* environment variables"""
+        defaults = cls()
+        return cls(
+            spam_ttl_days=int(os.environ.get("RETENTION_SPAM_TTL_DAYS", defaults.spam_ttl_days)),
+            archive_after_days=int(os.environ.get("RETENTION_ARCHIVE_AFTER_DAYS", defaults.archive_after_days)),
+            archive_unread=os.environ.get("RETENTION_ARCHIVE_UNREAD", "false").lower() in ("1", "true", "yes"),
+            archive_dir=os.environ.get("RETENTION_ARCHIVE_DIR", defaults.archive_dir),
+            batch_size=int(os.environ.get("RETENTION_BATCH_SIZE", defaults.batch_size)),
+            batch_pause_ms=int(os.environ.get("RETENTION_BATCH_PAUSE_MS", defaults.batch_pause_ms)),
+            interval_seconds=int(os.environ.get("RETENTION_INTERVAL_SECONDS", defaults.interval_seconds)),
+        )
+
+    @property
+    def archive_statuses(self) -> List[str]:
+        return ARCHIVE_STATUSES + (["unread"] if self.archive_unread else [])
+
+
+async def ensure_indexes(db):
+    """Create the TTL index and the index used by the archive scan"""
+    collection = db[COLLECTION]
+    await collection.create_index("expire_at", expireAfterSeconds=0, name="expire_at_ttl")
+    await collection.create_index(
+        [("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at"
+    )
+
+
+def spam_expiry(created_at: datetime, policy: RetentionPolicy) -> datetime:
+    """Return the TTL deadline for a message marked as spam"""
+    return created_at + timedelta(days=policy.spam_ttl_days)
+
+
+async def _pause(policy: RetentionPolicy):
+    await asyncio.sleep(policy.batch_pause_ms / 1000)
+
+
+async def expire_spam(db, policy: RetentionPolicy) -> int:
+    """Stamp ``expire_at`` on spam that predates the TTL index"""
+    collection = db[COLLECTION]
+    stamped = 0
+    while True:
+        batch = await collection.find(
+            {"status": "spam", "expire_at": {"$exists": False}},
+            {"_id": 1, "created_at": 1},
+        ).limit(policy.batch_size).to_list(policy.batch_size)
+        if not batch:
+            break
+        now = datetime.utcnow()
+        await collection.bulk_write(
+            [
+                UpdateOne(
+                    {"_id": doc["_id"]},
+                    {"$set": {"expire_at": spam_expiry(doc.get("created_at") or now, policy)}},
+                )
+                for doc in batch
+            ],
+            ordered=False,
+        )
+        stamped += len(batch)
+        if len(batch) < policy.batch_size:
+            break
+        await _pause(policy)
+    return stamped
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def partition_path(archive_dir: str, day: date) -> Path:
+    """Return the archive file holding messages created on ``day``"""
+    return (
+        Path(archive_dir) / COLLECTION / f"{day:%Y}" / f"{day:%m}" / f"{day.isoformat()}.ndjson.gz"
+    )
+
+
+def _append_partitions(archive_dir: str, partitions: Dict[date, List[dict]]):
+    """Append one gzip member per partition; concatenated members read back as one stream"""
+    for day, docs in partitions.items():
+        path = partition_path(archive_dir, day)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = "".join(json.dumps(doc, default=_json_default) + "\n" for doc in docs)
+        # One O_APPEND write per member, so a concurrent manual pass can't interleave with it
+        member = gzip.compress(payload.encode("utf-8"))
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, member)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+async def archive_messages(db, policy: RetentionPolicy, now: Optional[datetime] = None) -> int:
+    """Stream old messages into the archive, then hand them to the TTL index
+
+    Files are written before documents are marked, so a crash in between can
+    only duplicate lines in the archive (the reader de-duplicates by id),
+    never lose a message.
+    """
+    collection = db[COLLECTION]
+    now = now or datetime.utcnow()
+    cutoff = now - timedelta(days=policy.archive_after_days)
+    query = {
+        "status": {"$in": policy.archive_statuses},
+        "created_at": {"$lt": cutoff},
+        "archived_at": {"$exists": False},
+    }
+    archived = 0
+    while True:
+        batch = await collection.find(query).sort("created_at", 1).limit(
+            policy.batch_size
+        ).to_list(policy.batch_size)
+        if not batch:
+            break
+
+        partitions: Dict[date, List[dict]] = {}
+        for doc in batch:
+            record = {k: v for k, v in from_document(doc).items() if k != "expire_at"}
+            partitions.setdefault(doc["created_at"].date(), []).append(record)
+        await asyncio.to_thread(_append_partitions, policy.archive_dir, partitions)
+
+        await collection.update_many(
+            {"_id": {"$in": [doc["_id"] for doc in batch]}},
+            {"$set": {"archived_at": now, "expire_at": now}},
+        )
+        archived += len(batch)
+        if len(batch) < policy.batch_size:
+            break
+        await _pause(policy)
+    return archived
+
+
+async def run_retention(db, policy: RetentionPolicy) -> Dict[str, int]:
+    """Run one full retention pass"""
+    spam = await expire_spam(db, policy)
+    archived = await archive_messages(db, policy)
+    if spam or archived:
+        logger.info(f"🗄️ Retention pass: {spam} spam stamped for expiry, {archived} messages archived")
+    return {"spam_expiring": spam, "archived": archived}
+
+
+async def acquire_lease(db, owner: str, seconds: float) -> bool:
+    """Take or renew the retention lease; False while another process holds it"""
+    now = datetime.utcnow()
+    try:
+        await db.leases.find_one_and_update(
+            {"_id": LEASE_ID, "$or": [{"owner": owner}, {"expires_at": {"$lte": now}}]},
+            {"$set": {"owner": owner, "expires_at": now + timedelta(seconds=seconds)}},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        # No match means a live lease held by someone else, so the upsert collided with it
+        return False
+    return True
+
+
+async def release_lease(db, owner: str):
+    await db.leases.delete_one({"_id": LEASE_ID, "owner": owner})
+
+
+async def retention_loop(db, policy: RetentionPolicy):
+    """Run retention passes forever, every ``interval_seconds``, in whichever process holds the lease
+
+    The lease outlives two intervals, so if its holder dies another worker
+    takes over within a few passes.
+    """
+    owner = uuid.uuid4().hex
+    lease_seconds = max(2 * policy.interval_seconds, 60)
+    try:
+        while True:
+            try:
+                if await acquire_lease(db, owner, lease_seconds):
+                    await run_retention(db, policy)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Retention pass failed")
+            await asyncio.sleep(policy.interval_seconds)
+    finally:
+        # Hand over right away when this worker stops or is recycled
+        try:
+            await release_lease(db, owner)
+        except Exception:
+            logger.warning("Could not release the retention lease", exc_info=True)
+
+
+def _partition_day(path: Path) -> Optional[date]:
+    try:
+        return date.fromisoformat(path.name.split(".", 1)[0])
+    except ValueError:
+        return None
+
+
+def read_archive(
+    archive_dir: str,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    email: Optional[str] = None,
+    status: Optional[str] = None,
+    tenant: Optional[str] = None,
+) -> Iterator[dict]:
+    """Iterate archived messages between ``start`` and ``end`` (inclusive)
+
+    Only the partitions inside the date range are opened and every file is
+    decompressed as a stream, so queries never restore anything into MongoDB.
+    """
+    root = Path(archive_dir) / COLLECTION
+    if not root.exists():
+        return
+    seen = set()
+    for path in sorted(root.glob("*/*/*.ndjson.gz")):
+        day = _partition_day(path)
+        if day is None or (start and day < start) or (end and day > end):
+            continue
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record.get("id") in seen:
+                    continue
+                if email and record.get("email") != email:
+                    continue
+                if status and record.get("status") != status:
+                    continue
+                if tenant and record.get("tenant", DEFAULT_TENANT) != tenant:
+                    continue
+                seen.add(record.get("id"))
+                yield record
@@ -0,0 +1,49 @@
+"""Portfolio sections and the one-pass snapshot every derived view is built from.
+
+The ordered sections are declared once here so the API routes, the sync
+feed, exports, the read model and the maintenance scripts all agree on
+models, sort order and projections without importing the routes module
+(which opens the shared repository and starts wiring listeners).
+"""
+from typing import Any, Dict, List, Optional
+
+from models.portfolio import (
+    Education, EducationCreate, Experience, ExperienceCreate, Language, LanguageCreate,
+    PersonalInfo, Skill, SkillCreate,
+)
+from repositories.base import Repository
+from services.changelog import ChangeLog
+from services.crud import Resource
+from services.ids import from_document
+from services.read_model import ReadModel
+
+Snapshot = Dict[str, List[Dict[str, Any]]]
+
+# Ordered portfolio sections, served by the generic CRUD engine
+SECTION_RESOURCES = [
+    Resource("skills", "skills", SkillCreate, Skill, "Skill category"),
+    Resource("experience", "experience", ExperienceCreate, Experience, "Experience entry"),
+    Resource("education", "education", EducationCreate, Education, "Education record"),
+    Resource("languages", "languages", LanguageCreate, Language, "Language record"),
+]
+
+
+async def load_snapshot(db: Repository, tenant: str, max_time_ms: Optional[int] = None) -> Snapshot:
+    """Read every portfolio section for a tenant in one pass"""
+    snapshot = {}
+    personal_info = await db.personal_info.find_one({"tenant": tenant}, max_time_ms=max_time_ms)
+    snapshot["personal_info"] = (
+        [PersonalInfo(**from_document(personal_info)).dict()] if personal_info else []
+    )
+    for resource in SECTION_RESOURCES:
+        docs = await db[resource.collection].find(
+            {"tenant": tenant}, resource.policy.projection, sort=resource.sort,
+            limit=resource.policy.max_page_size, max_time_ms=max_time_ms,
+        )
+        snapshot[resource.collection] = [resource.model(**from_document(doc)).dict() for doc in docs]
+    return snapshot
+
+
+def offline_read_model(db: Repository) -> ReadModel:
+    """Read model for maintenance scripts: no request deadlines, versioned by the change log"""
+    return ReadModel(db, lambda tenant: load_snapshot(db, tenant), ChangeLog(db).current_seq)
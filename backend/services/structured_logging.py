@@ -0,0 +1,179 @@
+"""Non-blocking structured logging and sampled access logs.
+
+The event loop only ever puts records on an in-memory queue; a background
+``QueueListener`` thread formats them as JSON lines and writes them to
+stderr and, optionally, a size-rotated file. Access logs carry the request
+id and timing of every request, but successful fast requests are sampled so
+log volume stays flat as throughput grows; errors and slow requests are
+always kept.
+"""
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+REQUEST_ID_HEADER = b"x-request-id"
+
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+access_logger = logging.getLogger("access")
+
+# Attributes every LogRecord has; anything else came in through ``extra=``
+_RECORD_FIELDS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class RequestIdFilter(logging.Filter):
+    """Stamp records with the current request id while still on the logging thread"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not hasattr(record, "request_id"):
+            record.request_id = request_id.get()
+        return True
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Queue records unformatted so JSON encoding and tracebacks are rendered on the listener thread
+
+    The stock ``prepare`` formats every record on the calling thread (the
+    event loop) and drops ``exc_info``. Here only the message arguments are
+    merged, because they may be mutated after the call returns.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({k: v for k, v in vars(record).items() if k not in _RECORD_FIELDS})
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class AccessLogSampler:
+    """Keep every error and slow request, and ``sample_rate`` of the rest"""
+
+    def __init__(self, sample_rate: float = 1.0, slow_ms: float = 1000):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    def should_log(self, status: int, duration_ms: float) -> bool:
+        if status >= 400 or duration_ms >= self.slow_ms:
+            return True
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+
+class AccessLogMiddleware:
+    """Pure ASGI middleware assigning request ids and emitting sampled access logs"""
+
+    def __init__(self, app, sampler: AccessLogSampler):
+        self.app = app
+        self.sampler = sampler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        incoming = dict(scope.get("headers") or []).get(REQUEST_ID_HEADER)
+        rid = incoming.decode("latin-1")[:128] if incoming else uuid.uuid4().hex
+        token = request_id.set(rid)
+        status = [500]
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                message = dict(message, headers=[*message.get("headers", []),
+                                                 (REQUEST_ID_HEADER, rid.encode("latin-1"))])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if self.sampler.should_log(status[0], duration_ms):
+                access_logger.info(
+                    f"{scope['method']} {scope['path']} {status[0]}",
+                    extra={
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": status[0],
+                        "duration_ms": round(duration_ms, 2),
+                        "client": (scope.get("client") or ("", 0))[0],
+                    },
+                )
+            request_id.reset(token)
+
+
+def log_level() -> str:
+    return os.environ.get("LOG_LEVEL", "INFO").upper()
+
+
+def log_formatter() -> logging.Formatter:
+    """JSON lines unless LOG_FORMAT asks for plain text"""
+    if os.environ.get("LOG_FORMAT", "json") == "json":
+        return JsonFormatter()
+    return logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+
+def configure_logging() -> logging.handlers.QueueListener:
+    """Route all logging through a queue drained by a background thread; returns the started listener"""
+    level = log_level()
+    formatter = log_formatter()
+
+    sinks = [logging.StreamHandler(sys.stderr)]
+    log_file = os.environ.get("LOG_FILE")
+    if log_file:
+        sinks.append(logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=int(os.environ.get("LOG_FILE_MAX_BYTES", 50 * 1024 * 1024)),
+            backupCount=int(os.environ.get("LOG_FILE_BACKUPS", 5)),
+            encoding="utf-8",
+        ))
+    for sink in sinks:
+        sink.setFormatter(formatter)
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level)
+
+    # Uvicorn's own loggers go through the queue too; its access log is replaced by ours
+    for name in ("uvicorn", "uvicorn.error"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+        logging.getLogger(name).setLevel(level)
+    logging.getLogger("uvicorn.access").disabled = True
+
+    listener = logging.handlers.QueueListener(log_queue, *sinks, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+def access_sampler_from_env() -> AccessLogSampler:
+    return AccessLogSampler(
+        sample_rate=float(os.environ.get("ACCESS_LOG_SAMPLE_RATE", 1.0)),
+        slow_ms=float(os.environ.get("ACCESS_LOG_SLOW_MS", 1000)),
+    )
@@ -0,0 +1,176 @@
+"""Tenant resolution, per-tenant rate limiting and tenant-scoped indexes.
+
+A request belongs to a tenant either through a path prefix
+(``/t/<slug>/api/...``) or through its Host header; anything else is served
+as ``DEFAULT_TENANT``. Resolution is a couple of dict lookups against an
+in-memory directory refreshed in the background, so per-request cost stays
+flat no matter how many tenants are provisioned.
+"""
+import asyncio
+import json
+import logging
+import os
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from dotenv import load_dotenv
+from pymongo import ASCENDING, DESCENDING
+
+from repositories.base import Repository
+from services.ids import ensure_legacy_id_indexes
+
+load_dotenv(Path(__file__).parent.parent / '.env')
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TENANT = os.environ.get("DEFAULT_TENANT", "default")
+TENANT_PREFIX = "/t/"
+TENANT_COLLECTIONS = ["personal_info", "skills", "experience", "education", "languages", "contact_messages"]
+
+current_tenant: ContextVar[str] = ContextVar("current_tenant", default=DEFAULT_TENANT)
+
+
+def get_tenant() -> str:
+    return current_tenant.get()
+
+
+class TenantDirectory:
+    """In-memory slug and host lookup over the ``tenants`` collection"""
+
+    def __init__(self, db: Repository, refresh_seconds: float = 60.0):
+        self.db = db
+        self.refresh_seconds = refresh_seconds
+        self.slugs = {DEFAULT_TENANT}
+        self.hosts: Dict[str, str] = {}
+        self._loaded_at: Optional[float] = None
+        self._refreshing: Optional[asyncio.Task] = None
+
+    async def load(self):
+        slugs = {DEFAULT_TENANT}
+        hosts: Dict[str, str] = {}
+        for tenant in await self.db.tenants.find({}, {"_id": 0, "slug": 1, "hosts": 1}):
+            slugs.add(tenant["slug"])
+            for host in tenant.get("hosts", []):
+                hosts[host.lower()] = tenant["slug"]
+        self.slugs, self.hosts = slugs, hosts
+        self._loaded_at = time.monotonic()
+
+    async def ensure_fresh(self):
+        """Load once synchronously, afterwards refresh behind the scenes"""
+        if self._loaded_at is None:
+            try:
+                await self.load()
+            except Exception as exc:
+                # Keep serving the default tenant; the next refresh window retries
+                logger.warning(f"Tenant directory load failed: {exc!r}")
+                self._loaded_at = time.monotonic()
+        elif time.monotonic() - self._loaded_at > self.refresh_seconds and not self._refreshing:
+            self._refreshing = asyncio.create_task(self.load())
+            self._refreshing.add_done_callback(self._refresh_done)
+
+    def _refresh_done(self, task: asyncio.Task):
+        self._refreshing = None
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Tenant directory refresh failed: {task.exception()!r}")
+
+    def resolve(self, path: str, host: str) -> Tuple[Optional[str], str]:
+        """Return ``(tenant, path without prefix)``; tenant is None for an unknown prefix"""
+        if path.startswith(TENANT_PREFIX):
+            slug, _, rest = path[len(TENANT_PREFIX):].partition("/")
+            return (slug if slug in self.slugs else None), "/" + rest
+        return self.hosts.get(host.split(":", 1)[0].lower(), DEFAULT_TENANT), path
+
+
+class TenantRateLimiter:
+    """Token bucket per tenant so one noisy portfolio can't starve the others"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    @classmethod
+    def from_env(cls) -> "TenantRateLimiter":
+        rate = float(os.environ.get("TENANT_RATE_LIMIT_RPS", 0))
+        return cls(rate, float(os.environ.get("TENANT_RATE_LIMIT_BURST", rate * 2)))
+
+    def acquire(self, tenant: str) -> float:
+        """Take a token; returns 0 on success or the seconds until one is available"""
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(tenant, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        if tokens < 1:
+            self._buckets[tenant] = (tokens, now)
+            return (1 - tokens) / self.rate
+        self._buckets[tenant] = (tokens - 1, now)
+        return 0.0
+
+
+class TenantMiddleware:
+    """Pure ASGI middleware so the tenant context variable reaches the endpoint"""
+
+    def __init__(self, app, directory: TenantDirectory, limiter: TenantRateLimiter):
+        self.app = app
+        self.directory = directory
+        self.limiter = limiter
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        await self.directory.ensure_fresh()
+        headers = dict(scope.get("headers") or [])
+        host = headers.get(b"host", b"").decode("latin-1")
+        tenant, path = self.directory.resolve(scope["path"], host)
+        if tenant is None:
+            return await send_json(send, 404, {"detail": "Portfolio not found"})
+
+        retry_after = self.limiter.acquire(tenant)
+        if retry_after:
+            return await send_json(
+                send, 429, {"detail": "Too many requests"},
+                [(b"retry-after", str(max(1, int(retry_after + 0.999))).encode())],
+            )
+
+        if path != scope["path"]:
+            scope = dict(scope, path=path, raw_path=path.encode("utf-8"))
+        token = current_tenant.set(tenant)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_tenant.reset(token)
+
+
+async def send_json(send, status: int, body: dict, headers=None):
+    payload = json.dumps(body).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"),
+                    (b"content-length", str(len(payload)).encode())] + (headers or []),
+    })
+    await send({"type": "http.response.body", "body": payload})
+
+
+async def ensure_indexes(db: Repository):
+    """Tenant-scoped indexes for the non-engine collections and the tenant registry"""
+    await db.tenants.create_index([("slug", ASCENDING)], unique=True)
+    await db.tenants.create_index([("hosts", ASCENDING)])
+    await db.personal_info.create_index([("tenant", ASCENDING)], unique=True)
+    await db.contact_messages.create_index([("tenant", ASCENDING), ("_id", DESCENDING)])
+    await ensure_legacy_id_indexes(db.personal_info)
+    await ensure_legacy_id_indexes(db.contact_messages)
+
+
+async def backfill_default_tenant(db: Repository) -> int:
+    """Assign documents written before multi-tenancy to the default tenant"""
+    assigned = 0
+    for collection in TENANT_COLLECTIONS:
+        assigned += await db[collection].update_many(
+            {"tenant": {"$exists": False}}, {"$set": {"tenant": DEFAULT_TENANT}}
+        )
+    return assigned
@@ -54,11 +54,30 @@ const Home = () => {
   const [loading, setLoading] = useState(true);
   const [errors, setErrors] = useState({});
 
+  const applyPortfolio = (view) => {
+    setPersonalInfo(view.personal_info);
+    setSkills(view.skills);
+    setExperience(view.experience);
+    setEducation(view.education);
+    setLanguages(view.languages);
+  };
+
   // Fetch all data on component mount
   useEffect(() => {
     const fetchData = async () => {
       try {
         setLoading(true);
+        // One pre-assembled document; per-section requests are the fallback
+        try {
+          const portfolioRes = await portfolioApi.getPortfolio();
+          if (portfolioRes.data.personal_info) {
+            applyPortfolio(portfolioRes.data);
+            setErrors({});
+            return;
+          }
+        } catch (error) {
+          // Fall through to the individual sections, which report errors per section
+        }
         const [personalRes, skillsRes, expRes, eduRes, langRes] = await Promise.all([
           portfolioApi.getPersonalInfo().catch(err => ({ error: err })),
           portfolioApi.getSkills().catch(err => ({ error: err })),
@@ -117,6 +136,19 @@ const Home = () => {
     fetchData();
   }, [toast]);
 
+  // Re-render when a background revalidation or another tab brings newer data
+  useEffect(() => {
+    const unsubscribers = [
+      portfolioApi.subscribe('/portfolio', undefined, applyPortfolio),
+      portfolioApi.subscribe('/personal-info', undefined, setPersonalInfo),
+      portfolioApi.subscribe('/skills', undefined, setSkills),
+      portfolioApi.subscribe('/experience', undefined, setExperience),
+      portfolioApi.subscribe('/education', undefined, setEducation),
+      portfolioApi.subscribe('/languages', undefined, setLanguages),
+    ];
+    return () => unsubscribers.forEach((unsubscribe) => unsubscribe());
+  }, []);
+
   const retryFetch = (section) => {
     // Retry specific section
     const fetchSection = async () => {
@@ -21,41 +21,206 @@ apiClient.interceptors.response.use(
   }
 );
 
+// Response cache for public GETs: memory first, then localStorage, revalidated
+// in the background with If-None-Match so repeat visits render instantly and
+// cost at most a 304. Tabs tell each other about writes over BroadcastChannel.
+const STORAGE_PREFIX = `portfolio-cache:v1:${API_BASE}`;
+const REVALIDATE_INTERVAL_MS = 5000;
+
+const memoryCache = new Map(); // key -> { data, etag, version, validatedAt }
+const inFlight = new Map(); // key -> Promise of fresh data
+const subscribers = new Map(); // key -> Set of (data) => void
+const channel = typeof BroadcastChannel !== 'undefined' ? new BroadcastChannel('portfolio-api') : null;
+
+const cacheKey = (path, params) => {
+  const query = new URLSearchParams(
+    Object.entries(params || {})
+      .filter(([, value]) => value !== undefined && value !== null)
+      .sort(([a], [b]) => a.localeCompare(b))
+  ).toString();
+  return query ? `${path}?${query}` : path;
+};
+
+const readEntry = (key) => {
+  if (memoryCache.has(key)) return memoryCache.get(key);
+  try {
+    const stored = window.localStorage.getItem(STORAGE_PREFIX + key);
+    if (stored) {
+      // Entries restored from storage are always revalidated on first use
+      const entry = { ...JSON.parse(stored), validatedAt: 0 };
+      memoryCache.set(key, entry);
+      return entry;
+    }
+  } catch (error) {
+    // Storage disabled or corrupt entry: fall back to the network
+  }
+  return null;
+};
+
+const writeEntry = (key, entry) => {
+  memoryCache.set(key, entry);
+  try {
+    const { data, etag, version } = entry;
+    window.localStorage.setItem(STORAGE_PREFIX + key, JSON.stringify({ data, etag, version }));
+  } catch (error) {
+    // Quota exceeded or storage disabled: the memory cache still works
+  }
+};
+
+const dropEntries = (pathPrefix) => {
+  const keys = new Set([...memoryCache.keys()].filter((key) => key.startsWith(pathPrefix)));
+  try {
+    for (let i = 0; i < window.localStorage.length; i += 1) {
+      const storageKey = window.localStorage.key(i);
+      if (storageKey.startsWith(STORAGE_PREFIX + pathPrefix)) keys.add(storageKey.slice(STORAGE_PREFIX.length));
+    }
+    keys.forEach((key) => window.localStorage.removeItem(STORAGE_PREFIX + key));
+  } catch (error) {
+    // Storage unavailable: only the memory cache needs clearing
+  }
+  keys.forEach((key) => memoryCache.delete(key));
+};
+
+const notify = (key, data) => {
+  (subscribers.get(key) || []).forEach((callback) => callback(data));
+};
+
+// One network request per key at a time; a cached ETag turns it into a conditional GET
+const fetchFresh = (path, params, key) => {
+  if (inFlight.has(key)) return inFlight.get(key);
+
+  const cached = readEntry(key);
+  const request = apiClient
+    .get(path, {
+      params,
+      headers: cached?.etag ? { 'If-None-Match': cached.etag } : {},
+      validateStatus: (status) => (status >= 200 && status < 300) || status === 304,
+    })
+    .then((response) => {
+      const current = readEntry(key);
+      if (response.status === 304) {
+        if (!current) {
+          // Invalidated while the request was in flight: the 304 has no body to use
+          return apiClient.get(path, { params }).then((fresh) => fresh.data);
+        }
+        current.validatedAt = Date.now();
+        return current.data;
+      }
+      const version = Number(response.headers['x-content-version'] ?? -1);
+      // An older response overtaken by a newer one must not overwrite it
+      if (current && version >= 0 && current.version > version) return current.data;
+      const etag = response.headers.etag;
+      if (etag && response.headers['x-stale'] !== 'true') {
+        writeEntry(key, { data: response.data, etag, version, validatedAt: Date.now() });
+        channel?.postMessage({ type: 'updated', key });
+      }
+      notify(key, response.data);
+      return response.data;
+    })
+    .finally(() => inFlight.delete(key));
+
+  inFlight.set(key, request);
+  return request;
+};
+
+// Resolves immediately from cache when possible and revalidates behind the scenes;
+// subscribers registered with subscribe() receive the fresh data if it changed
+const cachedGet = (path, params) => {
+  const key = cacheKey(path, params);
+  const cached = readEntry(key);
+  if (!cached) {
+    return fetchFresh(path, params, key).then((data) => ({ data }));
+  }
+  if (Date.now() - cached.validatedAt > REVALIDATE_INTERVAL_MS) {
+    fetchFresh(path, params, key).catch(() => {});
+  }
+  return Promise.resolve({ data: cached.data, cached: true });
+};
+
+const invalidate = (pathPrefix) => {
+  dropEntries(pathPrefix);
+  channel?.postMessage({ type: 'invalidate', pathPrefix });
+};
+
+// Writes clear the affected section, and the combined portfolio view, here and in every other open tab
+const mutate = (request, pathPrefix) => request.then((response) => {
+  invalidate(pathPrefix);
+  invalidate('/portfolio');
+  return response;
+});
+
+if (channel) {
+  channel.onmessage = ({ data: message }) => {
+    if (message.type === 'updated') {
+      // Another tab stored newer data: reload it from localStorage, no network needed
+      memoryCache.delete(message.key);
+      const entry = readEntry(message.key);
+      if (entry) notify(message.key, entry.data);
+    } else if (message.type === 'invalidate') {
+      const affected = [...subscribers.keys()].filter((key) => key.startsWith(message.pathPrefix));
+      dropEntries(message.pathPrefix);
+      affected.forEach((key) => {
+        const [path, query] = key.split('?');
+        fetchFresh(path, Object.fromEntries(new URLSearchParams(query)), key).catch(() => {});
+      });
+    }
+  };
+}
+
+// Call `callback(data)` whenever a cached GET for (path, params) gets new data; returns an unsubscribe
+const subscribe = (path, params, callback) => {
+  const key = cacheKey(path, params);
+  if (!subscribers.has(key)) subscribers.set(key, new Set());
+  subscribers.get(key).add(callback);
+  return () => {
+    subscribers.get(key)?.delete(callback);
+    if (!subscribers.get(key)?.size) subscribers.delete(key);
+  };
+};
+
+// GET helpers accept optional query params, e.g. { fields: 'name,role,avatar' }
 export const portfolioApi = {
+  // Every public section in one pre-assembled document
+  getPortfolio: () => cachedGet('/portfolio'),
+
   // Personal Information
-  getPersonalInfo: () => apiClient.get('/personal-info'),
-  updatePersonalInfo: (data) => apiClient.put('/personal-info', data),
-  
+  getPersonalInfo: (params) => cachedGet('/personal-info', params),
+  updatePersonalInfo: (data) => mutate(apiClient.put('/personal-info', data), '/personal-info'),
+
   // Skills
-  getSkills: () => apiClient.get('/skills'),
-  createSkill: (data) => apiClient.post('/skills', data),
-  updateSkill: (id, data) => apiClient.put(`/skills/${id}`, data),
-  deleteSkill: (id) => apiClient.delete(`/skills/${id}`),
-  
-  // Experience  
-  getExperience: () => apiClient.get('/experience'),
-  createExperience: (data) => apiClient.post('/experience', data),
-  updateExperience: (id, data) => apiClient.put(`/experience/${id}`, data),
-  deleteExperience: (id) => apiClient.delete(`/experience/${id}`),
-  
+  getSkills: (params) => cachedGet('/skills', params),
+  createSkill: (data) => mutate(apiClient.post('/skills', data), '/skills'),
+  updateSkill: (id, data) => mutate(apiClient.put(`/skills/${id}`, data), '/skills'),
+  deleteSkill: (id) => mutate(apiClient.delete(`/skills/${id}`), '/skills'),
+
+  // Experience
+  getExperience: (params) => cachedGet('/experience', params),
+  createExperience: (data) => mutate(apiClient.post('/experience', data), '/experience'),
+  updateExperience: (id, data) => mutate(apiClient.put(`/experience/${id}`, data), '/experience'),
+  deleteExperience: (id) => mutate(apiClient.delete(`/experience/${id}`), '/experience'),
+
   // Education
-  getEducation: () => apiClient.get('/education'),
-  createEducation: (data) => apiClient.post('/education', data),
-  updateEducation: (id, data) => apiClient.put(`/education/${id}`, data),
-  deleteEducation: (id) => apiClient.delete(`/education/${id}`),
-  
+  getEducation: (params) => cachedGet('/education', params),
+  createEducation: (data) => mutate(apiClient.post('/education', data), '/education'),
+  updateEducation: (id, data) => mutate(apiClient.put(`/education/${id}`, data), '/education'),
+  deleteEducation: (id) => mutate(apiClient.delete(`/education/${id}`), '/education'),
+
   // Languages
-  getLanguages: () => apiClient.get('/languages'),
-  createLanguage: (data) => apiClient.post('/languages', data),
-  updateLanguage: (id, data) => apiClient.put(`/languages/${id}`, data),
-  deleteLanguage: (id) => apiClient.delete(`/languages/${id}`),
-  
+  getLanguages: (params) => cachedGet('/languages', params),
+  createLanguage: (data) => mutate(apiClient.post('/languages', data), '/languages'),
+  updateLanguage: (id, data) => mutate(apiClient.put(`/languages/${id}`, data), '/languages'),
+  deleteLanguage: (id) => mutate(apiClient.delete(`/languages/${id}`), '/languages'),
+
   // Contact
   submitContact: (data) => apiClient.post('/contact', data),
-  getContactMessages: () => apiClient.get('/contact'),
-  
+  getContactMessages: (params) => apiClient.get('/contact', { params }),
+
+  // Cache
+  subscribe,
+  invalidate,
+
   // Health check
   healthCheck: () => apiClient.get('/'),
 };
 
-export default portfolioApi;
\ No newline at end of file
+export default portfolioApi;
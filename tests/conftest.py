@@ -0,0 +1,31 @@
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# The app builds its repository at import time: point it at a throwaway SQLite file
+os.environ["STORAGE_BACKEND"] = "sqlite"
+os.environ["SQLITE_PATH"] = os.path.join(tempfile.mkdtemp(prefix="portfolio-tests-"), "portfolio.db")
+os.environ["TENANT_RATE_LIMIT_RPS"] = "0"
+
+
+@pytest.fixture
+def sqlite_repository(tmp_path):
+    from repositories.sqlite import SqliteRepository
+    repository = SqliteRepository(str(tmp_path / "test.db"))
+    yield repository
+    repository.close()
+
+
+@pytest.fixture(scope="session")
+def client():
+    """The app with startup run once; shutdown closes the shared repository, so it is session-wide"""
+    from fastapi.testclient import TestClient
+    import server
+    with TestClient(server.app) as test_client:
+        yield test_client
@@ -0,0 +1,106 @@
+import asyncio
+
+from services.admission import (
+    ADMIN, CONTACT, PUBLIC, PUBLIC_CACHED, AdaptiveLimit, AdmissionController, ClassPolicy, classify
+)
+
+
+def controller(total_limit=2):
+    policies = {
+        PUBLIC: ClassPolicy(1, 250, 50, initial_limit=2),
+        CONTACT: ClassPolicy(3, 500, 50, initial_limit=2, max_queue=1),
+    }
+    return AdmissionController(policies, ClassPolicy(0, 500, 50, initial_limit=total_limit))
+
+
+def test_admits_until_the_limit_then_sheds_when_the_queue_budget_runs_out():
+    admission = controller()
+
+    async def scenario():
+        assert await admission.acquire(PUBLIC) is None
+        assert await admission.acquire(PUBLIC) is None
+        return await admission.acquire(PUBLIC)
+
+    assert asyncio.run(scenario()) == 1.0
+    assert admission.stats[PUBLIC].admitted == 2
+    assert admission.stats[PUBLIC].shed_timeout == 1
+
+
+def test_full_queue_is_shed_immediately():
+    admission = controller(total_limit=1)
+
+    async def scenario():
+        assert await admission.acquire(CONTACT) is None
+        waiting = asyncio.create_task(admission.acquire(CONTACT))
+        await asyncio.sleep(0)
+        shed = await admission.acquire(CONTACT)
+        admission.release(CONTACT, 1, False)
+        return shed, await waiting
+
+    assert asyncio.run(scenario()) == (1.0, None)
+    assert admission.stats[CONTACT].shed_queue_full == 1
+
+
+def test_released_slots_go_to_the_highest_priority_waiter():
+    admission = AdmissionController(
+        {PUBLIC: ClassPolicy(1, 250, 500), CONTACT: ClassPolicy(3, 500, 500)},
+        ClassPolicy(0, 500, 500, initial_limit=1),
+    )
+    order = []
+
+    async def request(route_class):
+        assert await admission.acquire(route_class) is None
+        order.append(route_class)
+
+    async def scenario():
+        await admission.acquire(PUBLIC)
+        contact = asyncio.create_task(request(CONTACT))
+        await asyncio.sleep(0)
+        public = asyncio.create_task(request(PUBLIC))
+        await asyncio.sleep(0)
+        admission.release(PUBLIC, 1, False)
+        await asyncio.sleep(0)
+        admission.release(PUBLIC, 1, False)
+        await asyncio.gather(contact, public)
+
+    asyncio.run(scenario())
+    assert order == [PUBLIC, CONTACT]
+
+
+def test_cancelled_waiter_leaves_the_queue():
+    admission = controller(total_limit=1)
+
+    async def scenario():
+        await admission.acquire(PUBLIC)
+        waiting = asyncio.create_task(admission.acquire(PUBLIC))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+        admission.release(PUBLIC, 1, False)
+        return admission.snapshot()
+
+    snapshot = asyncio.run(scenario())
+    assert snapshot["waiting"] == 0 and snapshot["in_flight"] == 0
+    assert snapshot["classes"][PUBLIC]["shed_timeout"] == 0
+
+
+def test_adaptive_limit_backs_off_on_slow_calls_and_grows_when_saturated():
+    limit = AdaptiveLimit(ClassPolicy(0, target_ms=100, queue_budget_ms=50, initial_limit=10, min_limit=2))
+    limit.record(500, overloaded=False)
+    assert limit.limit == 9
+    limit.record(500, overloaded=False)  # within one target window: counted once
+    assert limit.limit == 9
+    limit.in_flight = 8
+    limit.record(10, overloaded=False)
+    assert 9 < limit.limit < 9.2
+
+
+def test_classify_routes():
+    assert classify("GET", "/api/skills") == PUBLIC_CACHED
+    assert classify("GET", "/t/acme/api/portfolio") == PUBLIC_CACHED
+    assert classify("GET", "/api/portfolio/changes") == PUBLIC
+    assert classify("POST", "/api/contact") == CONTACT
+    assert classify("GET", "/api/contact") == ADMIN
+    assert classify("PUT", "/api/skills/1") == ADMIN
+    assert classify("GET", "/api/metrics") is None
+    assert classify("OPTIONS", "/api/skills") is None
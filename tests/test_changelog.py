@@ -0,0 +1,122 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import APIRouter
+
+from repositories.base import RepositoryError
+from services.changelog import CREATE, DELETE, UPDATE, ChangeLog, changed_fields, compact
+from services.crud import CrudEngine
+
+
+def entry(seq, op, doc_id, fields=None, collection="skills"):
+    return {"seq": seq, "op": op, "collection": collection, "id": doc_id, "fields": fields or {}}
+
+
+def test_updates_fold_into_their_create():
+    folded = compact([
+        entry(1, CREATE, "a", {"category": "Data", "order": 1}),
+        entry(2, UPDATE, "a", {"order": 2}),
+    ])
+    assert folded == [entry(2, CREATE, "a", {"category": "Data", "order": 2})]
+
+
+def test_update_on_update_merges_fields_and_delete_wins():
+    folded = compact([
+        entry(1, UPDATE, "a", {"order": 1}),
+        entry(2, UPDATE, "b", {"category": "Cloud"}),
+        entry(3, UPDATE, "a", {"category": "Data"}),
+        entry(4, UPDATE, "b", {"order": 9}),
+        entry(5, DELETE, "b", {"order": 9}),
+    ])
+    assert folded == [
+        entry(3, UPDATE, "a", {"order": 1, "category": "Data"}),
+        entry(5, DELETE, "b"),
+    ]
+
+
+def test_same_id_in_different_collections_is_kept_apart_and_order_follows_last_change():
+    folded = compact([
+        entry(1, CREATE, "x", {"n": 1}, collection="skills"),
+        entry(2, CREATE, "x", {"n": 2}, collection="languages"),
+        entry(3, UPDATE, "x", {"n": 3}, collection="skills"),
+    ])
+    assert [(e["collection"], e["seq"]) for e in folded] == [("languages", 2), ("skills", 3)]
+
+
+def test_changed_fields_reports_only_differences():
+    assert changed_fields({"order": 1, "category": "Data"}, {"order": 2, "category": "Data"}) == {"order": 2}
+
+
+def test_cursor_waits_for_seqs_committed_out_of_order(sqlite_repository):
+    log = ChangeLog(sqlite_repository, gap_seconds=60)
+
+    async def scenario():
+        await log.append("acme", "skills", CREATE, "a", {"order": 1})
+        late = await log._next_seq("acme")  # allocated, insert still in flight
+        await log.append("acme", "skills", CREATE, "c", {"order": 3})
+        blocked = await log.changes_since("acme", 0, 100)
+
+        await sqlite_repository.change_log.insert_one({
+            "tenant": "acme", "seq": late, "collection": "skills", "op": CREATE, "id": "b",
+            "fields": {"order": 2}, "ts": datetime.utcnow(),
+        })
+        caught_up = await log.changes_since("acme", blocked["cursor"], 100)
+        return blocked, caught_up
+
+    blocked, caught_up = asyncio.run(scenario())
+    assert blocked["cursor"] == 1 and [c["id"] for c in blocked["changes"]] == ["a"]
+    assert caught_up["cursor"] == 3 and [c["id"] for c in caught_up["changes"]] == ["b", "c"]
+
+
+def test_abandoned_gaps_are_skipped_after_the_timeout(sqlite_repository):
+    async def scenario():
+        log = ChangeLog(sqlite_repository, gap_seconds=60)
+        await log.append("acme", "skills", CREATE, "a", {})
+        await log._next_seq("acme")  # writer died between allocating and inserting
+        await log.append("acme", "skills", CREATE, "c", {})
+        await log._next_seq("acme")  # and another at the tail
+        fresh = await log.changes_since("acme", 1, 100)
+        log.gap_seconds = 0
+        expired = await log.changes_since("acme", 1, 100)
+        return fresh, expired
+
+    fresh, expired = asyncio.run(scenario())
+    assert fresh == {"cursor": 1, "has_more": False, "changes": []}
+    assert expired["cursor"] == 4 and [c["id"] for c in expired["changes"]] == ["c"]
+
+
+class BrokenCollection:
+    async def find_one_and_update(self, *args, **kwargs):
+        raise RepositoryError("counter unavailable")
+
+    async def insert_one(self, *args, **kwargs):
+        raise RepositoryError("log unavailable")
+
+
+def test_failed_version_bump_propagates_but_a_lost_entry_does_not(sqlite_repository):
+    broken_counter = ChangeLog(SimpleNamespace(counters=BrokenCollection(), change_log=sqlite_repository.change_log))
+    with pytest.raises(RepositoryError):
+        asyncio.run(broken_counter.append("acme", "skills", UPDATE, "a", {}))
+
+    broken_log = ChangeLog(SimpleNamespace(counters=sqlite_repository.counters, change_log=BrokenCollection()))
+    asyncio.run(broken_log.append("acme", "skills", UPDATE, "a", {}))
+    assert asyncio.run(broken_log.current_seq("acme")) == 1
+
+
+def test_every_listener_runs_before_a_failure_is_raised():
+    engine = CrudEngine(APIRouter(), None, None, None)
+    seen = []
+
+    async def failing(*change):
+        raise RepositoryError("counter unavailable")
+
+    async def invalidate(*change):
+        seen.append(change)
+
+    engine.on_change(failing)
+    engine.on_change(invalidate)
+    with pytest.raises(RepositoryError):
+        asyncio.run(engine.notify("acme", "skills", UPDATE, "a", {}))
+    assert seen == [("acme", "skills", UPDATE, "a", {})]
@@ -0,0 +1,92 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from models.portfolio import Skill, SkillCreate
+from repositories.base import RepositoryError
+from services.changelog import CREATE, DELETE, UPDATE
+from services.crud import CrudEngine, Resource
+from services.resilience import CircuitBreaker, QueryGuard, StaleWhileRevalidateCache
+
+
+@pytest.fixture
+def engine(sqlite_repository):
+    """A standalone engine serving skills from a private database, recording every change"""
+    guard = QueryGuard(CircuitBreaker(), deadline_ms=2000)
+    router = APIRouter(prefix="/api")
+    crud = CrudEngine(router, sqlite_repository, guard, StaleWhileRevalidateCache(guard))
+    crud.register(Resource("skills", "skills", SkillCreate, Skill, "Skill category"))
+    changes = []
+
+    async def record(*change):
+        changes.append(change)
+
+    crud.on_change(record)
+    app = FastAPI()
+    app.include_router(router)
+    with TestClient(app) as client:
+        yield client, crud, changes
+
+
+def test_create_update_delete_notify_listeners_with_changed_fields(engine):
+    client, _, changes = engine
+    created = client.post("/api/skills", json={"category": "Data", "items": ["SQL"], "order": 1})
+    assert created.status_code == 200
+    skill_id = created.json()["id"]
+
+    updated = client.put(f"/api/skills/{skill_id}", json={"category": "Data", "items": ["SQL", "dbt"], "order": 1})
+    assert updated.status_code == 200 and updated.json()["items"] == ["SQL", "dbt"]
+    assert client.delete(f"/api/skills/{skill_id}").json() == {"message": "Skill category deleted successfully"}
+
+    assert [(op, doc_id) for _, _, op, doc_id, _ in changes] == [
+        (CREATE, skill_id), (UPDATE, skill_id), (DELETE, skill_id)
+    ]
+    tenant, collection, _, _, fields = changes[1]
+    assert (tenant, collection) == ("default", "skills")
+    assert set(fields) == {"items", "updated_at"}
+    assert changes[0][4]["category"] == "Data" and changes[2][4] == {}
+
+
+def test_missing_documents_are_404_and_notify_nobody(engine):
+    client, _, changes = engine
+    for item_id in (str(uuid.uuid4()), "0" * 24):
+        body = {"category": "x", "items": []}
+        assert client.put(f"/api/skills/{item_id}", json=body).json() == {"detail": "Skill category not found"}
+        assert client.delete(f"/api/skills/{item_id}").status_code == 404
+    assert changes == []
+
+
+def test_legacy_uuid_documents_can_be_updated_and_deleted(engine, sqlite_repository):
+    client, _, _ = engine
+    legacy = str(uuid.uuid4())
+    asyncio.run(sqlite_repository.skills.insert_one({"id": legacy, "tenant": "default", "category": "Old", "items": []}))
+    response = client.put(f"/api/skills/{legacy}", json={"category": "Renamed", "items": []})
+    assert response.status_code == 200 and response.json()["id"] == legacy
+    assert client.delete(f"/api/skills/{legacy}").status_code == 200
+
+
+def test_writes_invalidate_the_cached_list(engine):
+    client, _, _ = engine
+    assert client.get("/api/skills").json() == []
+    created = client.post("/api/skills", json={"category": "Cloud", "items": ["AWS"]}).json()
+    assert [s["category"] for s in client.get("/api/skills").json()] == ["Cloud"]
+    client.put(f"/api/skills/{created['id']}", json={"category": "Cloud native", "items": ["k8s"]})
+    assert [s["category"] for s in client.get("/api/skills").json()] == ["Cloud native"]
+    client.delete(f"/api/skills/{created['id']}")
+    assert client.get("/api/skills").json() == []
+
+
+def test_failed_version_bump_answers_503_after_the_write(engine):
+    client, crud, _ = engine
+
+    async def failing(*change):
+        raise RepositoryError("counter unavailable")
+
+    crud.on_change(failing)
+    response = client.post("/api/skills", json={"category": "Data", "items": []})
+    assert response.status_code == 503 and "Retry-After" in response.headers
+    # The write itself landed and the cached list was still invalidated
+    assert [s["category"] for s in client.get("/api/skills").json()] == ["Data"]
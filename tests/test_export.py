@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from repositories.base import RepositoryError
+from services.export import ExportService, render_vcard
+from services.resilience import BreakerOpenError, CircuitBreaker, QueryGuard
+
+
+def test_memoized_renders_do_not_reset_the_breaker_but_snapshot_reads_are_guarded():
+    guard = QueryGuard(CircuitBreaker(failure_threshold=2), deadline_ms=1000)
+    snapshots = [{"personal_info": [{"name": "Ada"}]}]
+
+    async def load_snapshot(tenant):
+        if not snapshots:
+            raise RepositoryError("read failed")
+        return snapshots.pop()
+
+    exports = ExportService(load_snapshot, lambda tenant: asyncio.sleep(0, result=1), guard=guard)
+
+    async def failing_read():
+        raise RepositoryError("read failed")
+
+    async def scenario():
+        await exports.render("acme", "markdown")
+        for _ in range(2):
+            with pytest.raises(RepositoryError):
+                await guard.run(failing_read)
+            await exports.render("acme", "markdown")  # memoized: no storage read
+        assert guard.breaker.state == CircuitBreaker.OPEN
+        # A format that needs the snapshot fails fast on the open breaker
+        with pytest.raises(BreakerOpenError):
+            await exports.render("acme", "vcard")
+
+    asyncio.run(scenario())
+
+
+def test_vcard_escapes_text_values_and_folds_long_lines_at_75_octets():
+    about = "Data engineer; builds pipelines, dashboards\nand tooling — " + "ü" * 80
+    card = render_vcard({"personal_info": [{"name": "Ada, Countess Lovelace", "about_summary": about}]})
+    physical = card.decode("utf-8").split("\r\n")
+    assert all(len(line.encode("utf-8")) <= 75 for line in physical)
+    assert any(line.startswith(" ") for line in physical)
+
+    unfolded = card.decode("utf-8").replace("\r\n ", "").split("\r\n")
+    assert "FN:Ada\\, Countess Lovelace" in unfolded
+    assert "N:Lovelace;Ada\\, Countess;;;" in unfolded
+    assert "NOTE:Data engineer\\; builds pipelines\\, dashboards\\nand tooling — " + "ü" * 80 in unfolded
+
+
+def test_export_etag_answers_304_until_a_write_changes_the_content(client):
+    first = client.get("/api/export/markdown")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert client.get("/api/export/markdown", headers={"If-None-Match": etag}).status_code == 304
+
+    created = client.post("/api/skills", json={"category": "Exported category", "items": ["Rust"]})
+    after = client.get("/api/export/markdown", headers={"If-None-Match": etag})
+    assert after.status_code == 200 and after.headers["ETag"] != etag
+    assert "Exported category" in after.text
+    client.delete(f"/api/skills/{created.json()['id']}")
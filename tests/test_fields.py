@@ -0,0 +1,41 @@
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from models.portfolio import Skill
+from services.fields import encode, projection, select_fields
+
+
+def test_fields_are_trimmed_deduplicated_and_put_in_model_order():
+    assert select_fields(Skill, " items , category,items,") == ("category", "items", "id")
+    assert select_fields(Skill, None) is None
+    assert select_fields(Skill, " , ") is None
+
+
+def test_id_is_always_selected_and_projected():
+    selected = select_fields(Skill, "category")
+    assert selected == ("category", "id")
+    assert projection(selected, {"tenant": 0}) == {"category": 1, "id": 1}
+    assert projection(None, {"tenant": 0}) == {"tenant": 0}
+
+
+def test_unknown_fields_are_rejected_with_the_allowed_list():
+    with pytest.raises(HTTPException) as excinfo:
+        select_fields(Skill, "category,password,secret")
+    assert excinfo.value.status_code == 400
+    assert excinfo.value.detail.startswith("Unknown fields: password, secret; allowed: category, items")
+
+
+def test_encode_serializes_only_the_selected_fields():
+    body = encode(Skill, ("category", "id"), [{"id": "a", "category": "Data", "items": ["SQL"]}, {"id": "b"}])
+    assert json.loads(body) == [{"id": "a", "category": "Data"}, {"id": "b", "category": None}]
+
+
+def test_sparse_fieldset_on_a_list_endpoint(client):
+    created = client.post("/api/skills", json={"category": "Sparse", "items": ["x"], "order": 99}).json()
+    rows = client.get("/api/skills?fields=category").json()
+    assert {"id": created["id"], "category": "Sparse"} in rows
+    assert all(set(row) == {"id", "category"} for row in rows)
+    assert client.get("/api/skills?fields=nope").status_code == 400
+    client.delete(f"/api/skills/{created['id']}")
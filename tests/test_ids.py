@@ -0,0 +1,122 @@
+import asyncio
+import uuid
+from datetime import datetime
+from unittest import mock
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from migrate_ids import compact_document, migrate_collection
+from services.ids import from_document, id_filter, id_for_legacy, new_id, to_document
+
+
+def test_id_filter_matches_compact_ids_on_id_and_uuids_on_either_legacy_field():
+    compact = new_id()
+    assert id_filter(compact) == {"_id": ObjectId(compact)}
+    legacy = str(uuid.uuid4())
+    assert id_filter(legacy) == {"$or": [{"id": legacy}, {"legacy_id": legacy}]}
+
+
+def test_both_id_kinds_are_found_in_storage(sqlite_repository):
+    compact, unmigrated, migrated = new_id(), str(uuid.uuid4()), str(uuid.uuid4())
+
+    async def scenario():
+        skills = sqlite_repository.skills
+        await skills.insert_one(to_document({"id": compact, "tenant": "acme", "category": "compact"}))
+        await skills.insert_one({"id": unmigrated, "tenant": "acme", "category": "unmigrated"})
+        await skills.insert_one({"legacy_id": migrated, "tenant": "acme", "category": "migrated"})
+        return [
+            from_document(await skills.find_one({"tenant": "acme", **id_filter(value)}))
+            for value in (compact, unmigrated, migrated)
+        ]
+
+    found = asyncio.run(scenario())
+    assert [doc["category"] for doc in found] == ["compact", "unmigrated", "migrated"]
+    assert found[0]["id"] == compact and found[1]["id"] == unmigrated
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def limit(self, count):
+        return FakeCursor(self.docs[:count])
+
+    async def to_list(self, length):
+        return [dict(doc) for doc in self.docs]
+
+
+class FakeCollection:
+    """The slice of a Motor collection migrate_ids uses, keyed by _id"""
+
+    def __init__(self):
+        self.docs = {}
+
+    def find(self, query=None, sort=None):
+        docs = sorted(self.docs.values(), key=lambda doc: str(doc["_id"]))
+        if query:  # {"id": {"$type": "string"}}
+            docs = [doc for doc in docs if isinstance(doc.get("id"), str)]
+        return FakeCursor(docs)
+
+    async def insert_many(self, docs, ordered=True):
+        errors = []
+        for index, doc in enumerate(docs):
+            if doc["_id"] in self.docs:
+                errors.append({"index": index, "code": 11000})
+            else:
+                self.docs[doc["_id"]] = dict(doc)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+    async def delete_many(self, query):
+        for key in query["_id"]["$in"]:
+            self.docs.pop(key, None)
+
+    async def drop(self):
+        self.docs.clear()
+
+
+class FakeDatabase(dict):
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+
+def legacy_repository(count):
+    repository = mock.MagicMock()
+    repository.__getitem__.return_value.create_index = mock.AsyncMock()
+    repository.database = FakeDatabase()
+    for n in range(count):
+        doc = {"_id": ObjectId(), "id": str(uuid.uuid4()), "tenant": "acme",
+               "category": f"c{n}", "created_at": datetime(2023, 1, n + 1)}
+        repository.database["skills"].docs[doc["_id"]] = doc
+    return repository
+
+
+def test_migration_is_deterministic_and_idempotent():
+    repository = legacy_repository(5)
+    skills = repository.database["skills"]
+    expected = {id_for_legacy(doc["created_at"], doc["id"]): doc["id"] for doc in skills.docs.values()}
+
+    assert asyncio.run(migrate_collection(repository, "skills", 2, dry_run=False)) == (5, {"acme"})
+    assert {key: doc["legacy_id"] for key, doc in skills.docs.items()} == expected
+    assert not any("id" in doc for doc in skills.docs.values())
+
+    before = {key: dict(doc) for key, doc in skills.docs.items()}
+    assert asyncio.run(migrate_collection(repository, "skills", 2, dry_run=False)) == (0, set())
+    assert skills.docs == before
+
+
+def test_rerun_recovers_a_batch_interrupted_between_delete_and_insert():
+    repository = legacy_repository(3)
+    skills = repository.database["skills"]
+    staging = repository.database["_migrate_ids_skills"]
+    crashed = list(skills.docs.values())[:2]
+    for doc in crashed:  # staged and deleted, replacements never inserted
+        replacement = compact_document(doc)
+        staging.docs[replacement["_id"]] = replacement
+        del skills.docs[doc["_id"]]
+
+    assert asyncio.run(migrate_collection(repository, "skills", 10, dry_run=False)) == (1, {"acme"})
+    assert len(skills.docs) == 3 and not staging.docs
+    assert all("legacy_id" in doc and "id" not in doc for doc in skills.docs.values())
@@ -0,0 +1,162 @@
+import asyncio
+import json
+import threading
+from dataclasses import replace
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from routes.portfolio import db, notifications
+from services.notifications import (
+    EMAIL, LEASED, PENDING, WEBHOOK, NotificationDispatcher, NotifierConfig, send_email
+)
+
+
+@pytest.fixture
+def webhook_sink():
+    """Local HTTP endpoint recording every JSON body posted to it"""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    sink = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{sink.server_port}/hook", received
+    sink.shutdown()
+    sink.server_close()
+
+
+def test_contact_submit_delivers_webhook(client, monkeypatch, webhook_sink):
+    url, received = webhook_sink
+    # Configure the channel after startup so no background worker races the test
+    monkeypatch.setattr(notifications, "config", replace(notifications.config, webhook_url=url))
+    response = client.post("/api/contact", json={"name": "Ada", "email": "ada@example.com", "message": "Hello"})
+    assert response.status_code == 200
+    message_id = response.json()["id"]
+
+    async def deliver():
+        batch = await notifications._claim_batch()
+        await notifications._deliver(batch)
+        return batch
+
+    batch = asyncio.run(deliver())
+
+    assert [job["payload"]["id"] for job in batch] == [message_id]
+    assert received[0]["count"] == 1
+    assert received[0]["messages"][0]["name"] == "Ada"
+    assert received[0]["messages"][0]["message"] == "Hello"
+    assert asyncio.run(db.notification_jobs.count({"payload.id": message_id})) == 0
+
+
+def test_enqueue_failure_never_raises(sqlite_repository):
+    dispatcher = NotificationDispatcher(sqlite_repository, NotifierConfig(webhook_url="http://127.0.0.1:9"))
+    asyncio.run(dispatcher.enqueue("default", {"id": "broken"}))
+    assert dispatcher.stats.enqueued == 0
+
+
+def test_email_subject_and_body(monkeypatch):
+    sent = []
+
+    class FakeSMTP:
+        def __init__(self, host, port, timeout):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def send_message(self, message):
+            sent.append(message)
+
+    monkeypatch.setattr("smtplib.SMTP", FakeSMTP)
+    config = NotifierConfig(smtp_host="localhost", email_to=["me@example.com"])
+    assert config.channels == [EMAIL]
+    send_email(config, "acme", [{"name": "Ada", "email": "ada@example.com", "message": "Hello"}])
+    assert sent[0]["Subject"] == "[acme] New contact message from Ada"
+    assert sent[0]["Reply-To"] == "ada@example.com"
+    assert "Hello" in sent[0].get_content()
+    assert NotifierConfig(webhook_url="http://x").channels == [WEBHOOK]
+
+
+def queued_job(sqlite_repository, dispatcher):
+    async def scenario():
+        await dispatcher.enqueue("acme", {
+            "id": "m1", "name": "Ada", "email": "ada@example.com", "message": "Hi", "created_at": datetime.utcnow(),
+        })
+        return await dispatcher._claim()
+
+    return asyncio.run(scenario())
+
+
+def test_failed_delivery_is_retried_with_backoff(sqlite_repository):
+    dispatcher = NotificationDispatcher(
+        sqlite_repository, NotifierConfig(webhook_url="http://127.0.0.1:9"), max_attempts=3, backoff_base=60
+    )
+    job = queued_job(sqlite_repository, dispatcher)
+    assert job["status"] == LEASED and job["lease_owner"] == dispatcher.owner
+
+    asyncio.run(dispatcher._fail(job, "HTTP 500"))
+    stored = asyncio.run(sqlite_repository.notification_jobs.find_one({"_id": job["_id"]}))
+    assert stored["status"] == PENDING
+    assert stored["attempts"] == 1 and stored["last_error"] == "HTTP 500"
+    assert "lease_owner" not in stored and "lease_expires_at" not in stored
+    assert datetime.utcnow() <= stored["available_at"] <= datetime.utcnow() + timedelta(seconds=60)
+    assert dispatcher.stats.retried == 1
+
+
+def test_exhausted_job_is_dead_lettered_and_can_be_replayed(sqlite_repository):
+    dispatcher = NotificationDispatcher(sqlite_repository, NotifierConfig(webhook_url="http://127.0.0.1:9"),
+                                        max_attempts=2)
+    job = queued_job(sqlite_repository, dispatcher)
+    job["attempts"] = 1
+    asyncio.run(dispatcher._fail(job, "refused"))
+    assert asyncio.run(sqlite_repository.notification_jobs.count({})) == 0
+    dead = asyncio.run(sqlite_repository.notification_dead_letters.find_one({}))
+    assert dead["attempts"] == 2 and dead["last_error"] == "refused" and "lease_owner" not in dead
+    assert dispatcher.stats.dead_lettered == 1
+
+    assert asyncio.run(dispatcher.replay_dead_letters("acme")) == 1
+    replayed = asyncio.run(sqlite_repository.notification_jobs.find_one({}))
+    assert replayed["status"] == PENDING and replayed["attempts"] == 0
+
+
+def test_expired_lease_is_claimed_by_another_worker(sqlite_repository):
+    config = NotifierConfig(webhook_url="http://127.0.0.1:9")
+    crashed = NotificationDispatcher(sqlite_repository, config, lease_seconds=-1)
+    job = queued_job(sqlite_repository, crashed)
+    survivor = NotificationDispatcher(sqlite_repository, config)
+    reclaimed = asyncio.run(survivor._claim())
+    assert reclaimed["_id"] == job["_id"] and reclaimed["lease_owner"] == survivor.owner
+    assert asyncio.run(NotificationDispatcher(sqlite_repository, config)._claim()) is None
+
+
+def test_expired_lease_holder_cannot_remove_a_re_leased_job(sqlite_repository, webhook_sink):
+    url, received = webhook_sink
+    config = NotifierConfig(webhook_url=url)
+    slow = NotificationDispatcher(sqlite_repository, config, lease_seconds=-1, max_attempts=1)
+    stale_job = queued_job(sqlite_repository, slow)
+    stale_retry = dict(stale_job)
+    # The lease ran out mid-send; the same worker and then another re-lease the job
+    assert asyncio.run(slow._claim())["lease_token"] != stale_job["lease_token"]
+    survivor = NotificationDispatcher(sqlite_repository, config)
+    current = asyncio.run(survivor._claim())
+
+    asyncio.run(slow._deliver([stale_job]))  # sent, but no longer ours to delete
+    asyncio.run(slow._fail(stale_retry, "timeout"))  # nor to dead-letter
+    assert len(received) == 1
+    assert asyncio.run(sqlite_repository.notification_dead_letters.count({})) == 0
+    stored = asyncio.run(sqlite_repository.notification_jobs.find_one({"_id": current["_id"]}))
+    assert stored["lease_token"] == current["lease_token"] and stored["status"] == LEASED
+
+    asyncio.run(survivor._deliver([current]))
+    assert asyncio.run(sqlite_repository.notification_jobs.count({})) == 0
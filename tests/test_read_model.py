@@ -0,0 +1,77 @@
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+from unittest import mock
+
+import pytest
+from pymongo.errors import DuplicateKeyError as MongoDuplicateKeyError
+
+from repositories.base import DuplicateKeyError
+from repositories.mongo import MongoCollection
+from routes.portfolio import guard, section_cache
+import seed_data
+from seed_data import build_seed_documents
+from services.read_model import ReadModel
+from services.resilience import CircuitBreaker
+from services.sections import offline_read_model
+
+
+def test_mongo_upsert_race_surfaces_as_repository_duplicate_key():
+    motor_collection = mock.Mock()
+    motor_collection.find_one_and_update = mock.AsyncMock(side_effect=MongoDuplicateKeyError("E11000"))
+    with pytest.raises(DuplicateKeyError):
+        asyncio.run(MongoCollection(motor_collection).find_one_and_update({"tenant": "t"}, {"$set": {}}, upsert=True))
+
+
+def test_rebuild_that_loses_to_a_newer_view_is_not_an_error(sqlite_repository):
+    async def load_snapshot(tenant):
+        return {"skills": [{"category": "old"}]}
+
+    async def scenario():
+        await sqlite_repository.portfolio_view.insert_one({"tenant": "acme", "version": 9, "skills": []})
+        model = ReadModel(sqlite_repository, load_snapshot, lambda tenant: asyncio.sleep(0, result=3))
+        await model.ensure_indexes()
+        await model.rebuild("acme")
+        return await model.get("acme")
+
+    assert asyncio.run(scenario())["version"] == 9
+
+
+def test_portfolio_view_rebuilds_on_read(client):
+    response = client.get("/api/portfolio")
+    assert response.status_code == 200
+    assert response.headers["ETag"] == f'W/"v{response.json()["version"]}"'
+    assert client.get("/api/portfolio", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+
+def test_maintenance_scripts_build_the_read_model_without_the_routes(sqlite_repository):
+    script = "import sys, seed_data, manage_read_model; sys.exit('routes.portfolio' in sys.modules)"
+    assert subprocess.run([sys.executable, "-c", script], cwd=Path(seed_data.__file__).parent).returncode == 0
+
+    async def scenario():
+        for collection, docs in build_seed_documents("acme").items():
+            await sqlite_repository[collection].insert_many(docs)
+        model = offline_read_model(sqlite_repository)
+        await model.ensure_indexes()
+        await model.rebuild("acme")
+        return await model.check("acme"), await model.get("acme")
+
+    problems, view = asyncio.run(scenario())
+    assert problems == []
+    assert view["personal_info"]["name"] == "Sarath M Warrier" and view["skills"]
+
+
+def test_portfolio_is_served_stale_while_the_breaker_is_open(client, monkeypatch):
+    fresh = client.get("/api/portfolio")
+    assert fresh.status_code == 200
+
+    tripped = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    tripped.record_failure()
+    monkeypatch.setattr(guard, "breaker", tripped)
+    section_cache.invalidate(("portfolio_view", "default"))  # force a read that can't reach storage
+
+    stale = client.get("/api/portfolio")
+    assert stale.status_code == 200 and stale.headers["X-Stale"] == "true"
+    assert "ETag" not in stale.headers
+    assert stale.json() == fresh.json()
@@ -0,0 +1,238 @@
+import asyncio
+import time
+
+import pytest
+from fastapi import APIRouter
+
+from repositories.base import RepositoryError
+from services.crud import CrudEngine
+from services.export import ExportService
+from services.resilience import (
+    BreakerOpenError, CircuitBreaker, QueryGuard, SingleFlight, StaleWhileRevalidateCache
+)
+
+
+def make_cache(**kwargs):
+    return StaleWhileRevalidateCache(QueryGuard(CircuitBreaker()), **kwargs)
+
+
+def test_entry_behind_requested_version_is_refetched():
+    # Another worker handled a write: this process was never invalidated but sees the newer version
+    cache = make_cache()
+    rows = ["before"]
+
+    async def fetch():
+        return list(rows)
+
+    async def scenario():
+        assert await cache.get("skills", "all", fetch, ttl=30, version=1) == (["before"], False)
+        rows[0] = "after"
+        assert await cache.get("skills", "all", fetch, ttl=30, version=1) == (["before"], False)
+        assert await cache.get("skills", "all", fetch, ttl=30, version=2) == (["after"], False)
+        # An older version reading afterwards keeps the newer entry
+        assert await cache.get("skills", "all", fetch, ttl=30, version=1) == (["after"], False)
+
+    asyncio.run(scenario())
+
+
+def test_invalidate_forces_refetch_and_read_after_write():
+    cache = make_cache()
+    calls = []
+
+    async def fetch():
+        calls.append(None)
+        number = len(calls)
+        await asyncio.sleep(0.02)
+        return number
+
+    async def scenario():
+        before = asyncio.create_task(cache.get("p", "k", fetch, ttl=30))
+        await asyncio.sleep(0.005)
+        cache.invalidate("p")
+        after = asyncio.create_task(cache.get("p", "k", fetch, ttl=30))
+        assert (await before, await after) == ((1, False), (2, False))
+        assert await cache.get("p", "k", fetch, ttl=30) == (2, False)
+
+    asyncio.run(scenario())
+
+
+def test_partitions_are_bounded_lru():
+    cache = make_cache(max_entries=3)
+
+    async def scenario():
+        for skip in range(10):
+            async def fetch(skip=skip):
+                return skip
+            await cache.get("skills", skip, fetch, ttl=30)
+        # Touch the oldest survivor so it outlives the next insert
+        await cache.get("skills", 7, None, ttl=30)
+        await cache.get("skills", 10, lambda: asyncio.sleep(0, result=10), ttl=30)
+        return list(cache._partitions["skills"])
+
+    assert asyncio.run(scenario()) == [9, 7, 10]
+
+
+def test_entries_past_max_stale_age_are_dropped():
+    cache = make_cache(max_stale_age=0.01)
+
+    async def scenario():
+        await cache.get("p", "old", lambda: asyncio.sleep(0, result=1), ttl=30)
+        await asyncio.sleep(0.02)
+        await cache.get("p", "new", lambda: asyncio.sleep(0, result=2), ttl=30)
+        return list(cache._partitions["p"])
+
+    assert asyncio.run(scenario()) == ["new"]
+
+
+def test_client_controlled_skip_cannot_grow_the_cache(client):
+    from routes.portfolio import section_cache
+    for skip in range(section_cache.max_entries + 20):
+        assert client.get(f"/api/skills?skip={skip}").status_code == 200
+    assert len(section_cache._partitions[("skills", "default")]) <= section_cache.max_entries
+
+
+def test_single_flight_coalesces_identical_calls():
+    flights = SingleFlight()
+    calls = []
+
+    async def query():
+        calls.append(None)
+        await asyncio.sleep(0.01)
+        return "rows"
+
+    async def scenario():
+        results = await asyncio.gather(*(flights.do("skills", query) for _ in range(50)))
+        return results, await flights.do("skills", query)
+
+    results, later = asyncio.run(scenario())
+    assert results == ["rows"] * 50 and later == "rows"
+    assert len(calls) == 2
+    assert flights.snapshot() == {"flights": 2, "coalesced": 49, "timeouts": 0, "failures": 0, "in_flight": 0}
+
+
+def test_single_flight_cancelled_caller_does_not_cancel_the_others():
+    flights = SingleFlight()
+
+    async def query():
+        await asyncio.sleep(0.02)
+        return 42
+
+    async def scenario():
+        leader = asyncio.create_task(flights.do("k", query))
+        follower = asyncio.create_task(flights.do("k", query))
+        await asyncio.sleep(0.005)
+        leader.cancel()
+        return await asyncio.gather(leader, follower, return_exceptions=True)
+
+    leader, follower = asyncio.run(scenario())
+    assert isinstance(leader, asyncio.CancelledError)
+    assert follower == 42
+
+
+def test_single_flight_failures_reach_every_caller_but_are_not_cached():
+    flights = SingleFlight()
+    outcomes = [ValueError("down"), "ok"]
+
+    async def query():
+        await asyncio.sleep(0.01)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def scenario():
+        failed = await asyncio.gather(*(flights.do("k", query) for _ in range(3)), return_exceptions=True)
+        return failed, await flights.do("k", query)
+
+    failed, retried = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in failed)
+    assert retried == "ok"
+    assert flights.stats.failures == 1
+
+
+def test_single_flight_timeout_bounds_the_shared_call():
+    flights = SingleFlight(timeout=0.01)
+
+    async def scenario():
+        results = await asyncio.gather(
+            *(flights.do("k", lambda: asyncio.sleep(1)) for _ in range(3)), return_exceptions=True
+        )
+        fast = await flights.do("k", lambda: asyncio.sleep(0, result="fast"), timeout=1)
+        return results, fast
+
+    results, fast = asyncio.run(scenario())
+    assert all(isinstance(result, asyncio.TimeoutError) for result in results)
+    assert fast == "fast"
+    assert flights.snapshot()["timeouts"] == 1 and flights.snapshot()["in_flight"] == 0
+
+
+def test_breaker_opens_after_consecutive_failures_and_probes_once():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=0.02)
+    for _ in range(2):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and breaker.trips == 1
+    assert not breaker.allow_request()
+
+    time.sleep(0.03)
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()  # only one probe at a time
+    breaker.record_success(elapsed_ms=1)
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.consecutive_failures == 0
+
+
+def test_breaker_failed_probe_reopens_and_slow_calls_count_as_failures():
+    breaker = CircuitBreaker(failure_threshold=1, slow_call_ms=100, reset_timeout=0.01)
+    breaker.record_success(elapsed_ms=150)
+    assert breaker.state == CircuitBreaker.OPEN
+    time.sleep(0.02)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and breaker.trips == 2
+
+
+def test_guard_cancellation_releases_the_probe():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    guard = QueryGuard(breaker, deadline_ms=1000)
+
+    async def scenario():
+        task = asyncio.create_task(guard.run(lambda: asyncio.sleep(1)))
+        await asyncio.sleep(0.005)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return await guard.run(lambda: asyncio.sleep(0, result="probe"))
+
+    assert asyncio.run(scenario()) == "probe"
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_guard_deadline_counts_as_failure():
+    guard = QueryGuard(CircuitBreaker(failure_threshold=1), deadline_ms=10)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(guard.run(lambda: asyncio.sleep(1)))
+    with pytest.raises(BreakerOpenError):
+        asyncio.run(guard.run(lambda: asyncio.sleep(0)))
+
+
+def test_cached_version_lookups_do_not_reset_the_breaker():
+    guard = QueryGuard(CircuitBreaker(failure_threshold=3), deadline_ms=1000)
+    exports = ExportService(None, lambda tenant: asyncio.sleep(0, result=7), guard=guard)
+    engine = CrudEngine(APIRouter(), None, guard, None)
+    engine.content_version = exports.version
+
+    async def failing_read():
+        raise RepositoryError("read failed")
+
+    async def scenario():
+        assert await engine.version_tag("acme") == (7, 'W/"v7"')
+        for _ in range(3):
+            with pytest.raises(RepositoryError):
+                await guard.run(failing_read)
+            assert await engine.version_tag("acme") == (7, 'W/"v7"')  # served from the 5 s cache
+
+    asyncio.run(scenario())
+    assert guard.breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,43 @@
+import asyncio
+import threading
+from datetime import date
+from unittest import mock
+
+from pymongo.errors import DuplicateKeyError
+
+from services.retention import _append_partitions, acquire_lease, read_archive
+
+
+def test_concurrent_appends_produce_a_readable_archive(tmp_path):
+    day = date(2024, 3, 1)
+
+    def append(worker):
+        for batch in range(20):
+            docs = [{"id": f"{worker}-{batch}-{n}", "message": "x" * 500, "created_at": "2024-03-01T00:00:00"}
+                    for n in range(10)]
+            _append_partitions(str(tmp_path), {day: docs})
+
+    threads = [threading.Thread(target=append, args=(worker,)) for worker in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(list(read_archive(str(tmp_path)))) == 4 * 20 * 10
+
+
+def test_lease_held_elsewhere_is_not_acquired():
+    db = mock.Mock()
+    db.leases.find_one_and_update = mock.AsyncMock(side_effect=DuplicateKeyError("E11000"))
+    assert asyncio.run(acquire_lease(db, "worker-2", 60)) is False
+
+    db.leases.find_one_and_update = mock.AsyncMock(return_value=None)
+    assert asyncio.run(acquire_lease(db, "worker-1", 60)) is True
+    query = db.leases.find_one_and_update.call_args.args[0]
+    assert query["_id"] == "retention"
+    assert {"owner": "worker-1"} in query["$or"]
+
+
+def test_archive_query_validates_limit(client):
+    assert client.get("/api/contact/archive?limit=-1").status_code == 422
+    assert client.get("/api/contact/archive?limit=1001").status_code == 422
+    assert client.get("/api/contact/archive?limit=5").status_code == 200
@@ -0,0 +1,76 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+import serve
+from serve import listen_socket
+
+
+def test_listen_socket_is_tcp():
+    sock = listen_socket("127.0.0.1", 0, 16)
+    try:
+        assert sock.proto == socket.IPPROTO_TCP
+    finally:
+        sock.close()
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+@pytest.fixture
+def served(tmp_path):
+    """One supervised worker on the plain asyncio loop, whose accept path honours the socket proto"""
+    port = free_port()
+    env = dict(os.environ, SQLITE_PATH=str(tmp_path / "serve.db"))
+    process = subprocess.Popen(
+        [sys.executable, serve.__file__, "--workers", "1", "--port", str(port),
+         "--host", "127.0.0.1", "--loop", "asyncio", "--http", "h11", "--bench"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 30
+    while True:
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=1).close()
+            break
+        except OSError:
+            if time.monotonic() > deadline or process.poll() is not None:
+                process.kill()
+                pytest.fail("serve.py did not start listening")
+            time.sleep(0.1)
+    yield port
+    process.terminate()
+    process.wait(timeout=40)
+
+
+def read_response(conn):
+    data = b""
+    while b"\r\n\r\n" not in data:
+        data += conn.recv(65536)
+    head, body = data.split(b"\r\n\r\n", 1)
+    length = next(int(line.split(b":")[1]) for line in head.split(b"\r\n")
+                  if line.lower().startswith(b"content-length:"))
+    while len(body) < length:
+        body += conn.recv(65536)
+    return head
+
+
+def test_keep_alive_requests_are_not_delayed(served):
+    request = b"GET /api/ HTTP/1.1\r\nHost: localhost\r\n\r\n"
+    with socket.create_connection(("127.0.0.1", served)) as conn:
+        conn.sendall(request)
+        assert read_response(conn).startswith(b"HTTP/1.1 200")
+        timings = []
+        for _ in range(5):
+            started = time.perf_counter()
+            conn.sendall(request)
+            assert read_response(conn).startswith(b"HTTP/1.1 200")
+            timings.append(time.perf_counter() - started)
+    # Nagle plus delayed ACK holds each response back ~40 ms; without it these take a few ms
+    assert sorted(timings)[len(timings) // 2] < 0.03
@@ -0,0 +1,90 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from repositories.base import CollectionRepository, RepositoryError
+from repositories.sqlite import _decode, apply_update, compile_filter
+
+
+def test_date_shaped_strings_stay_strings(sqlite_repository):
+    collection = sqlite_repository.contact_messages
+    created = datetime(2024, 5, 1, 12, 30, 15, 123456)
+    asyncio.run(collection.insert_one({"message": "2024-01-01T00:00:00.000000", "created_at": created}))
+    stored = asyncio.run(collection.find_one({}))
+    assert stored["message"] == "2024-01-01T00:00:00.000000"
+    assert stored["created_at"] == created
+
+
+def test_datetimes_filter_and_sort_chronologically(sqlite_repository):
+    collection = sqlite_repository.events
+    start = datetime(2024, 1, 1)
+    asyncio.run(collection.insert_many([{"n": n, "at": start + timedelta(days=n)} for n in (2, 0, 1)]))
+    later = asyncio.run(collection.find({"at": {"$gte": start + timedelta(days=1)}}, sort=[("at", -1)]))
+    assert [doc["n"] for doc in later] == [2, 1]
+
+
+def test_decode_only_unwraps_date_tags():
+    assert _decode({"$date": "2024-01-01T00:00:00.000000"}) == datetime(2024, 1, 1)
+    assert _decode({"a": ["2024-01-01T00:00:00.000000"]}) == {"a": ["2024-01-01T00:00:00.000000"]}
+    assert _decode({"$date": "x", "other": 1}) == {"$date": "x", "other": 1}
+
+
+def test_compile_filter_parameterizes_values():
+    params = []
+    sql = compile_filter({"tenant": "acme", "order": {"$gte": 2, "$lt": 5}, "archived_at": {"$exists": False}}, params)
+    assert params == ["acme", 2, 5]
+    assert sql.count("?") == 3
+    assert "json_type(doc, '$.archived_at') IS NOT NULL" in sql
+
+
+def test_date_shaped_contact_message_keeps_admin_list_working(client):
+    body = {"name": "Eve", "email": "eve@example.com", "message": "2024-01-01T00:00:00.000000"}
+    assert client.post("/api/contact", json=body).status_code == 200
+    response = client.get("/api/contact")
+    assert response.status_code == 200
+    assert body["message"] in [message["message"] for message in response.json()]
+
+
+def test_compile_filter_operators_match_mongo_semantics(sqlite_repository):
+    collection = sqlite_repository.items
+    asyncio.run(collection.insert_many([
+        {"tenant": "acme", "n": 1, "tag": "a"},
+        {"tenant": "acme", "n": 2},
+        {"tenant": "acme", "n": 3, "tag": "c"},
+        {"tenant": "other", "n": 4, "tag": "a"},
+    ]))
+
+    def numbers(filter):
+        return sorted(doc["n"] for doc in asyncio.run(collection.find(filter)))
+
+    assert numbers({"tenant": "acme", "n": {"$in": [1, 3, 5]}}) == [1, 3]
+    assert numbers({"n": {"$in": []}}) == []
+    assert numbers({"tenant": "acme", "tag": {"$ne": "a"}}) == [2, 3]
+    assert numbers({"tag": {"$exists": False}}) == [2]
+    assert numbers({"tag": None}) == [2]
+    assert numbers({"$or": [{"n": {"$lt": 2}}, {"tenant": "other"}]}) == [1, 4]
+    assert numbers({"tag": {"$type": "string"}, "n": {"$gt": 1, "$lte": 4}}) == [3, 4]
+
+
+def test_compile_filter_rejects_unsupported_operators_and_fields():
+    with pytest.raises(RepositoryError):
+        compile_filter({"n": {"$regex": "x"}}, [])
+    with pytest.raises(RepositoryError):
+        compile_filter({"n') OR 1=1 --": 1}, [])
+
+
+def test_apply_update_operators():
+    doc = {"a": {"b": 1}, "n": 1, "gone": True, "at": datetime(2024, 1, 1)}
+    updated = apply_update(doc, {"$set": {"a.c": 2}, "$inc": {"n": 2, "m": 1}, "$unset": {"gone": ""}})
+    assert updated == {"a": {"b": 1, "c": 2}, "n": 3, "m": 1, "at": datetime(2024, 1, 1)}
+    assert doc["n"] == 1  # the input is not mutated
+
+
+def test_both_backends_implement_the_whole_interface():
+    from repositories.mongo import MongoCollection, MongoRepository
+    from repositories.sqlite import SqliteCollection, SqliteRepository
+    for implementation in (MongoCollection, MongoRepository, SqliteCollection, SqliteRepository):
+        assert not implementation.__abstractmethods__, implementation
+    with pytest.raises(TypeError):
+        CollectionRepository()
@@ -0,0 +1,59 @@
+import io
+import json
+import logging
+import sys
+import threading
+
+from services.structured_logging import AccessLogSampler, DeferredQueueHandler, JsonFormatter, configure_logging
+
+
+def test_exceptions_are_formatted_on_the_listener_thread(monkeypatch):
+    stream = io.StringIO()
+    monkeypatch.setattr("sys.stderr", stream)
+    monkeypatch.setenv("LOG_FORMAT", "json")
+    formatting_threads = []
+    original_format = JsonFormatter.format
+
+    def tracking_format(self, record):
+        formatting_threads.append(threading.current_thread())
+        return original_format(self, record)
+
+    monkeypatch.setattr(JsonFormatter, "format", tracking_format)
+    root = logging.getLogger()
+    saved_handlers, saved_level = root.handlers, root.level
+    listener = configure_logging()
+    try:
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            logging.getLogger("tests").exception("failed for %s", "acme")
+    finally:
+        listener.stop()
+        root.handlers, root.level = saved_handlers, saved_level
+
+    entry = json.loads(stream.getvalue().strip().splitlines()[-1])
+    assert entry["message"] == "failed for acme"
+    assert "Traceback" not in entry["message"]
+    assert entry["exc_info"].endswith("ValueError: boom")
+    assert formatting_threads and threading.main_thread() not in formatting_threads
+
+
+def test_prepare_merges_arguments_but_keeps_exc_info():
+    handler = DeferredQueueHandler(None)
+    try:
+        raise KeyError("x")
+    except KeyError:
+        record = logging.getLogger("tests").makeRecord(
+            "tests", logging.ERROR, "f", 1, "%d items", (3,), sys.exc_info()
+        )
+    prepared = handler.prepare(record)
+    assert (prepared.msg, prepared.args) == ("3 items", None)
+    assert prepared.exc_info is record.exc_info
+    assert record.args == (3,)
+
+
+def test_access_sampler_keeps_errors_and_slow_requests():
+    sampler = AccessLogSampler(sample_rate=0, slow_ms=100)
+    assert sampler.should_log(500, 1)
+    assert sampler.should_log(200, 150)
+    assert not sampler.should_log(200, 5)
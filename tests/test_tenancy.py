@@ -0,0 +1,61 @@
+import asyncio
+import time
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import server
+from routes.portfolio import db
+from services.tenancy import DEFAULT_TENANT, TenantDirectory, TenantMiddleware, TenantRateLimiter, get_tenant
+
+
+def register_tenant(slug, hosts=()):
+    asyncio.run(db.tenants.insert_one({"slug": slug, "hosts": list(hosts)}))
+    asyncio.run(server.tenant_directory.load())
+
+
+def test_other_tenants_cannot_update_or_delete_a_document(client):
+    register_tenant("isolated")
+    created = client.post("/t/isolated/api/skills", json={"category": "Data", "items": ["SQL"]})
+    assert created.status_code == 200
+    skill_id = created.json()["id"]
+
+    update = {"category": "Hijacked", "items": []}
+    assert client.put(f"/api/skills/{skill_id}", json=update).status_code == 404
+    assert client.delete(f"/api/skills/{skill_id}").status_code == 404
+    assert [s["category"] for s in client.get("/t/isolated/api/skills").json()] == ["Data"]
+    assert client.delete(f"/t/isolated/api/skills/{skill_id}").status_code == 200
+
+
+def test_host_header_selects_the_tenant(client):
+    register_tenant("hosted", hosts=["portfolio.example.com"])
+    client.post("/t/hosted/api/languages", json={"name": "Finnish", "level": 40})
+
+    by_host = client.get("/api/languages", headers={"Host": "Portfolio.Example.com:8443"}).json()
+    assert [lang["name"] for lang in by_host] == ["Finnish"]
+    assert "Finnish" not in [lang["name"] for lang in client.get("/api/languages").json()]
+    assert client.get("/t/unknown/api/languages").status_code == 404
+
+
+def tenant_app(limiter):
+    app = FastAPI()
+
+    @app.get("/api/whoami")
+    async def whoami():
+        return {"tenant": get_tenant()}
+
+    directory = TenantDirectory(db=None)
+    directory.slugs = {DEFAULT_TENANT, "noisy", "quiet"}
+    directory._loaded_at = time.monotonic()
+    app.add_middleware(TenantMiddleware, directory=directory, limiter=limiter)
+    return TestClient(app)
+
+
+def test_rate_limit_is_per_tenant():
+    client = tenant_app(TenantRateLimiter(rate=0.5, burst=2))
+    assert client.get("/t/noisy/api/whoami").json() == {"tenant": "noisy"}
+    assert client.get("/t/noisy/api/whoami").status_code == 200
+    limited = client.get("/t/noisy/api/whoami")
+    assert limited.status_code == 429 and int(limited.headers["Retry-After"]) >= 1
+    assert client.get("/t/quiet/api/whoami").json() == {"tenant": "quiet"}
+    assert client.get("/api/whoami").json() == {"tenant": DEFAULT_TENANT}